@@ -0,0 +1,518 @@
+"""
+Performance benchmarks for the career matching pipeline
+
+Usage: python benchmarks.py [name ...]   (runs every benchmark when no name is given)
+"""
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict
+
+import numpy as np
+
+import careers
+import onet_import
+from catalog import CatalogSnapshot, build_snapshot, process_memory
+from catalog_compiler import compile_catalog
+from catalog_diff import diff_catalogs
+from catalog_index import CatalogIndex, tokens, top_interest
+from llm_cache import LLMCache, cache_key, fill_in
+from llm_client import sent_prompt
+from response_cache import ResponseCache
+from similarity import JobSimilarityIndex
+from scoring import (BACKENDS, DEFAULT_REQUIRED_SKILL_LEVEL, DEFAULT_SKILL_LEVEL, JobMatrix, PERSONALITY_TRAITS,
+                     PROFILE_SKILLS, INTERESTS, WORK_VALUES, Profile, ScoreCache, ScoringEngine, ScoringProfile,
+                     sample_profiles, skill_key_for, top_k_indexes, top_k_rows)
+
+
+def scaled_catalog(onet_jobs: Dict, size: int, jitter: float = 0.0, seed: int = 0) -> Dict:
+    """
+    Repeat the catalog under numbered names to simulate a full O*NET sized catalog
+    With jitter, the copies' importances are perturbed by up to +/- jitter so they are distinct occupations
+    """
+    rng = random.Random(seed)
+    jobs = {}
+    names = list(onet_jobs)
+    for i in range(size):
+        name = names[i % len(names)]
+        job = onet_jobs[name]
+        if jitter and i >= len(names):
+            job = dict(job)
+            for field in ("skills", "work_values", "work_styles", "interests"):
+                job[field] = {k: min(5.0, max(0.5, round(v + rng.uniform(-jitter, jitter), 1)))
+                              for k, v in job[field].items()}
+        jobs[name if i < len(names) else f"{name} #{i // len(names)}"] = job
+    return jobs
+
+
+def profile_matrix(profiles) -> np.ndarray:
+    """Compact array form of sample profiles (see scoring.PROFILE_COLUMNS)"""
+    return np.array([
+        [p.personality[k] for k in PERSONALITY_TRAITS] + [7 - p.work_values[k] for k in WORK_VALUES] +
+        [p.skills[k] for k in PROFILE_SKILLS] + [int(k in p.interests) for k in INTERESTS]
+        for p in profiles
+    ])
+
+
+def _timed(func, repeats: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def bench_scoring():
+    """Single-profile ranking latency and batch throughput for every scoring backend"""
+    # Skip the hand-made edge cases at the front, they leave dimensions unrated
+    profiles = sample_profiles(1005, seed=1)[5:]
+    matrix = profile_matrix(profiles)
+
+    for size in (len(careers.onet_jobs), 1000):
+        catalog = scaled_catalog(careers.onet_jobs, size)
+        print(f"\nCatalog of {size} jobs")
+        print(f"{'backend':<10} {'top-3 per profile':>20} {'batch of 1000':>16}")
+        for name in BACKENDS:
+            engine = ScoringEngine(catalog, backend=name)
+            sample = profiles[:20] if name == "python" else profiles[:200]
+            single = _timed(lambda: [engine.top_job_matches(p, 3) for p in sample]) / len(sample)
+            batch = _timed(lambda: engine.rank_batch(matrix if name != "python" else matrix[:50], 3))
+            if name == "python":
+                batch *= len(matrix) / 50
+            print(f"{name:<10} {single * 1e6:>17.0f} us {batch * 1e3:>13.1f} ms")
+
+
+def bench_topk():
+    """Full stable sort vs partial top-k selection over precomputed overall scores"""
+    profiles = sample_profiles(1005, seed=1)[5:]
+    for size in (len(careers.onet_jobs), 1000, 10000):
+        engine = ScoringEngine(scaled_catalog(careers.onet_jobs, size))
+        overall = engine.overall_scores(engine.backend.score_profiles(profiles[:200]))
+        print(f"\nCatalog of {size} jobs, 200 profiles")
+        print(f"{'k':>5} {'argsort rows':>14} {'top_k_rows':>12} {'argsort 1-d':>13} {'top_k_indexes':>15}")
+        for k in (3, 10, 50):
+            full_rows = _timed(lambda: np.argsort(-overall, axis=1, kind="stable")[:, :k], 5)
+            partial_rows = _timed(lambda: top_k_rows(overall, k), 5)
+            full_single = _timed(lambda: [np.argsort(-row, kind="stable")[:k] for row in overall]) / len(overall)
+            partial_single = _timed(lambda: [top_k_indexes(row, k) for row in overall]) / len(overall)
+            print(f"{k:>5} {full_rows * 1e3:>11.2f} ms {partial_rows * 1e3:>9.2f} ms "
+                  f"{full_single * 1e6:>10.1f} us {partial_single * 1e6:>12.1f} us")
+
+
+def bench_pruning():
+    """Top-3 per profile: exact scoring of every job vs bound-based pruning"""
+    profiles = sample_profiles(205, seed=1)[5:]
+    print(f"{'jobs':>6} {'score all':>12} {'pruned':>12} {'jobs pruned':>12}")
+    for size in (len(careers.onet_jobs), 300, 1000, 10000):
+        engine = ScoringEngine(scaled_catalog(careers.onet_jobs, size, jitter=0.8))
+        full = _timed(lambda: [engine.rank(p).page_indexes(0, 3) for p in profiles]) / len(profiles)
+        pruned = _timed(lambda: [engine.top_k(p, 3) for p in profiles]) / len(profiles)
+        rate = engine.pruning.stats()["prune_rate"]
+        print(f"{size:>6} {full * 1e6:>9.0f} us {pruned * 1e6:>9.0f} us {rate:>11.1%}")
+
+
+def bench_what_if():
+    """One-answer change: full re-score vs incremental re-score of the affected jobs"""
+    profiles = sample_profiles(205, seed=1)[5:]
+    changed = [ScoringProfile(p.personality, p.work_values, {**p.skills, "programming": min(5, p.skills["programming"] + 2)},
+                              p.interests) for p in profiles]
+    print(f"{'jobs':>6} {'full':>10} {'incremental':>12} {'jobs re-scored':>15}")
+    for size in (len(careers.onet_jobs), 1000):
+        engine = ScoringEngine(scaled_catalog(careers.onet_jobs, size, jitter=0.8))
+        rankings = [engine.rank(p) for p in profiles]
+        full = _timed(lambda: [engine.rank(c) for c in changed]) / len(profiles)
+        incremental = _timed(lambda: [engine.rescore(r, c, engine.affected_jobs(p, c))
+                                      for p, c, r in zip(profiles, changed, rankings)]) / len(profiles)
+        rescored = np.mean([len(engine.affected_jobs(p, c)) for p, c in zip(profiles, changed)])
+        print(f"{size:>6} {full * 1e6:>7.0f} us {incremental * 1e6:>9.0f} us {rescored:>15.1f}")
+
+
+def bench_similarity():
+    """Neighbour lists: full rebuild vs incremental sync after one job entry changes"""
+    print(f"{'jobs':>6} {'full build':>12} {'sync one job':>14}")
+    for size in (len(careers.onet_jobs), 1000, 3000):
+        catalog = scaled_catalog(careers.onet_jobs, size, jitter=0.8)
+        index = JobSimilarityIndex(catalog)
+        build = _timed(lambda: JobSimilarityIndex(catalog))
+        edited = []
+        for i, name in enumerate(list(catalog)[:20]):
+            job = dict(catalog[name])
+            job["skills"] = {k: min(5.0, v + 0.5 + i * 0.01) for k, v in job["skills"].items()}
+            edited.append({**catalog, name: job})
+        sync = _timed(lambda: [index.sync(c) for c in edited]) / len(edited)
+        print(f"{size:>6} {build * 1e3:>9.1f} ms {sync * 1e3:>11.1f} ms")
+
+
+def bench_snapshot():
+    """Worker catalog startup: executing the dict literal and compiling it vs mapping a snapshot"""
+    print(f"{'jobs':>6} {'dict literal':>14} {'heap':>9} {'snapshot':>11} {'heap':>9} {'file':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (len(careers.onet_jobs), 1000, 10000):
+            catalog = scaled_catalog(careers.onet_jobs, size, jitter=0.8)
+            # Precompiled, like importing careers.py from its .pyc
+            code = compile(f"onet_jobs = {catalog!r}", "careers_scaled.py", "exec")
+            pickled = pickle.dumps(catalog)
+            path = os.path.join(directory, f"catalog_{size}.snapshot")
+            build_snapshot(catalog, path)
+
+            def from_literal():
+                namespace = {}
+                exec(code, namespace)
+                return namespace["onet_jobs"], JobMatrix(namespace["onet_jobs"])
+
+            def from_snapshot():
+                snapshot = CatalogSnapshot(path)
+                return snapshot, snapshot.job_matrix()
+
+            def heap(load) -> int:
+                tracemalloc.start()
+                loaded = load()
+                allocated = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+                del loaded
+                return allocated
+
+            # tracemalloc slows exec of one huge literal quadratically; unpickling builds the same objects
+            literal_heap = heap(lambda: JobMatrix(pickle.loads(pickled)))
+            snapshot_heap = heap(from_snapshot)
+            print(f"{size:>6} {_timed(from_literal, 3) * 1e3:>11.1f} ms {literal_heap / 2**20:>6.1f} MB "
+                  f"{_timed(from_snapshot, 3) * 1e3:>8.1f} ms {snapshot_heap / 2**20:>6.1f} MB "
+                  f"{os.path.getsize(path) / 2**20:>6.1f} MB")
+
+
+def _worker_memory(source: str) -> Dict[str, float]:
+    """Child process: load the catalog the way a formai worker does and report the resident memory added"""
+    before = process_memory()
+    if source.endswith(".pickle"):
+        with open(source, "rb") as f:
+            onet_jobs = pickle.load(f)
+    else:
+        onet_jobs = CatalogSnapshot(source)
+    engine = ScoringEngine(onet_jobs)
+    index = JobSimilarityIndex(onet_jobs)
+    # Serve a few requests so the pages scoring touches are resident
+    for profile in sample_profiles(20, seed=3):
+        engine.top_job_matches(profile, 3)
+    index.neighbours(engine.job_names[0])
+    after = process_memory()
+    return {key: after[key] - before[key] for key in ("private_mb", "file_mapped_mb")}
+
+
+def bench_workers():
+    """Resident memory each extra worker adds: private copy of the catalog vs the shared snapshot mapping"""
+    if not process_memory():
+        print("Needs /proc/self/status (Linux)")
+        return
+    context = multiprocessing.get_context("spawn")
+    print(f"{'jobs':>6} {'source':<10} {'private':>10} {'file mapped':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (len(careers.onet_jobs), 1000, 3000):
+            catalog = scaled_catalog(careers.onet_jobs, size, jitter=0.8)
+            pickled = os.path.join(directory, f"catalog_{size}.pickle")
+            with open(pickled, "wb") as f:
+                pickle.dump(catalog, f)
+            snapshot = os.path.join(directory, f"catalog_{size}.snapshot")
+            build_snapshot(catalog, snapshot)
+            for label, source in (("dict", pickled), ("snapshot", snapshot)):
+                with context.Pool(1) as pool:
+                    memory = pool.apply(_worker_memory, (source,))
+                print(f"{size:>6} {label:<10} {memory['private_mb']:>7.1f} MB {memory['file_mapped_mb']:>9.1f} MB")
+
+
+def write_onet_release(directory: str, occupations: int, seed: int = 0):
+    """
+    Synthetic O*NET text release with the real files' columns and element counts per occupation
+    Mapped elements are padded with unmapped ones (O*NET lists 35 skills, 33 knowledge areas, 52 abilities)
+    """
+    rng = random.Random(seed)
+    needed = {}
+    for sources, _ in onet_import.FIELD_SOURCES.values():
+        for dimension_sources in sources.values():
+            for file_name, element in dimension_sources:
+                needed.setdefault(file_name, set()).add(element)
+    element_counts = {"Skills": 35, "Knowledge": 33, "Abilities": 52, "Work Styles": 16, "Work Values": 6,
+                      "Interests": 6}
+    # Rows per element: importance and level, or extent and its high-point companion
+    scales = {"Skills": ["IM", "LV"], "Knowledge": ["IM", "LV"], "Abilities": ["IM", "LV"], "Work Styles": ["IM"],
+              "Work Values": ["EX", "VH"], "Interests": ["OI", "IH"]}
+    codes = [f"{11 + i // 9000:02d}-{1000 + i % 9000:04d}.00" for i in range(occupations)]
+    header = ["O*NET-SOC Code", "Element ID", "Element Name", "Scale ID", "Data Value", "N", "Standard Error",
+              "Lower CI Bound", "Upper CI Bound", "Recommend Suppress", "Not Relevant", "Date", "Domain Source"]
+    with open(os.path.join(directory, "Occupation Data.txt"), "w") as f:
+        f.write("O*NET-SOC Code\tTitle\tDescription\n")
+        for i, code in enumerate(codes):
+            f.write(f"{code}\tSample Occupation {i} Specialists\tSynthetic occupation {i}\n")
+    for file_name, count in element_counts.items():
+        elements = sorted(needed[file_name]) + [f"Other {file_name} {j}" for j in range(count - len(needed[file_name]))]
+        high = 5.0 if onet_import.FILE_SCALES[file_name] == "IM" else 7.0
+        with open(os.path.join(directory, f"{file_name}.txt"), "w") as f:
+            f.write("\t".join(header) + "\n")
+            for code in codes:
+                for j, element in enumerate(elements):
+                    for scale in scales[file_name]:
+                        value = rng.uniform(1.0, high)
+                        suppress = "Y" if rng.random() < 0.01 else "N"
+                        f.write(f"{code}\t1.A.{j}\t{element}\t{scale}\t{value:.2f}\t15\t0.2\t{value - 0.4:.2f}\t"
+                                f"{value + 0.4:.2f}\t{suppress}\tn/a\t08/2023\tAnalyst\n")
+    with open(os.path.join(directory, "Related Occupations.txt"), "w") as f:
+        f.write("O*NET-SOC Code\tRelated O*NET-SOC Code\tRelatedness Tier\tIndex\n")
+        for i, code in enumerate(codes):
+            for index in range(1, 11):
+                f.write(f"{code}\t{codes[rng.randrange(occupations)]}\tPrimary-Short\t{index}\n")
+
+
+def bench_onet_import():
+    """O*NET release import: streamed chunked read vs whole-file read, time and peak traced memory"""
+    print(f"{'jobs':>6} {'release':>9} {'chunk rows':>11} {'time':>9} {'rows/s':>10} {'peak':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (1000, 5000):
+            release = os.path.join(directory, f"release_{size}")
+            os.makedirs(release)
+            write_onet_release(release, size)
+            release_mb = sum(os.path.getsize(os.path.join(release, name)) for name in os.listdir(release)) / 2**20
+            # A chunk larger than any file reads each file whole
+            for chunk_rows in (onet_import.DEFAULT_CHUNK_ROWS, 10**9):
+                tracemalloc.start()
+                start = time.perf_counter()
+                catalog, report = onet_import.import_release(release, chunk_rows)
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                label = "whole file" if chunk_rows == 10**9 else str(chunk_rows)
+                print(f"{len(catalog):>6} {release_mb:>6.1f} MB {label:>11} {seconds:>7.2f} s "
+                      f"{report['rows_read'] / seconds:>10,.0f} {peak / 2**20:>6.1f} MB")
+
+
+def bench_job_search():
+    """Filtered /jobs: scanning every job vs intersecting the catalog index posting lists"""
+    print(f"{'jobs':>6} {'index build':>12} {'scan':>10} {'index':>10} {'matches':>8}")
+    for size in (len(careers.onet_jobs), 1000, 10000):
+        catalog = scaled_catalog(careers.onet_jobs, size, jitter=0.8)
+        start = time.perf_counter()
+        index = CatalogIndex(catalog)
+        build = time.perf_counter() - start
+
+        def scan():
+            return [name for name, job in catalog.items()
+                    if top_interest(job) == "investigative" and "Research" in job["required_skills"]
+                    and any(word.startswith("data") for word in tokens(" ".join([name] + job.get("job_keywords", []))))]
+
+        matches = len(index.search(interest="investigative", skill="Research", q="data"))
+        print(f"{size:>6} {build * 1e3:>9.1f} ms {_timed(scan, 5) * 1e3:>7.2f} ms "
+              f"{_timed(lambda: index.search(interest='investigative', skill='Research', q='data'), 50) * 1e3:>7.3f} ms "
+              f"{matches:>8}")
+
+
+def bench_responses():
+    """Unfiltered /jobs page: building and encoding it on every hit vs the ETag response cache"""
+    from fastapi import Request
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    def request(headers=()) -> Request:
+        return Request({"type": "http", "method": "GET", "path": "/jobs", "query_string": b"",
+                        "headers": [(k.encode(), v.encode()) for k, v in headers]})
+
+    print(f"{'jobs':>6} {'page':>5} {'rebuild':>10} {'cached':>10} {'304':>10} {'body':>9}")
+    for size, limit in ((len(careers.onet_jobs), 50), (1000, 50), (1000, 500)):
+        catalog = scaled_catalog(careers.onet_jobs, size, jitter=0.8)
+        index, similarity = CatalogIndex(catalog), JobSimilarityIndex(catalog)
+
+        def listing():
+            positions = index.search()[:limit]
+            return {"total_jobs": len(index),
+                    "job_details": {index.job_names[p]: {**index.summaries[p],
+                                                         "similar_catalog_jobs": similarity.neighbours(index.job_names[p])}
+                                    for p in positions}}
+
+        cache = ResponseCache()
+        body = cache.respond(request(), ("v", "/jobs"), listing).body
+        etag = cache.respond(request(), ("v", "/jobs"), listing).headers["etag"]
+        rebuild = _timed(lambda: JSONResponse(content=jsonable_encoder(listing())).body, 20)
+        cached = _timed(lambda: cache.respond(request(), ("v", "/jobs"), listing), 200)
+        not_modified = _timed(lambda: cache.respond(request([("if-none-match", etag)]), ("v", "/jobs"), listing), 200)
+        print(f"{size:>6} {limit:>5} {rebuild * 1e3:>7.2f} ms {cached * 1e3:>7.3f} ms {not_modified * 1e3:>7.3f} ms "
+              f"{len(body) / 1024:>6.0f} KB")
+
+
+def _request_payloads(count: int, seed: int = 0):
+    """Distinct PersonProfileRequest payloads, so every request misses the score cache"""
+    import form
+
+    rng = random.Random(seed)
+    return [form.PersonProfileRequest(
+        name=f"Student {i}", email=f"student{i}@example.edu", university="Example University",
+        preferred_career=rng.choice(list(careers.onet_jobs)),
+        **{trait: rng.randint(1, 5) for trait in PERSONALITY_TRAITS},
+        **{f"{value}_importance": rank for value, rank in zip(WORK_VALUES, rng.sample(range(1, 7), 6))},
+        **{skill: rng.randint(1, 5) for skill in PROFILE_SKILLS},
+        interests=rng.sample(INTERESTS, rng.randint(0, 3))) for i in range(count)]
+
+
+def _survey_rows(count: int, seed: int = 0):
+    """Survey CSV rows in the column layout insights_generator_new.parse_csv_row reads"""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = [f"2024-01-{i % 28 + 1:02d}", f"Student {i}", f"student{i}@example.edu", "Example University"]
+        row += [f"{rng.randint(1, 5)} - Agree" for _ in range(10)]
+        row += rng.sample(range(1, 7), 6) + ["", ""]
+        row += [rng.randint(1, 5) for _ in range(21)]
+        row += [", ".join(rng.sample(["Investigative", "Social", "Artistic", "Enterprising"], 2)), "Data Scientist"]
+        rows.append(pd.Series(row))
+    return rows
+
+
+def bench_allocations():
+    """Per-request traced allocations: API profile -> top 3 analysis, and the survey CSV batch path"""
+    import form
+    import insights_generator_new
+
+    matcher, engine_cache = form.matcher, form.matcher.scoring_engine.cache
+    matcher.scoring_engine.cache = None
+    payloads = _request_payloads(200)
+    tracemalloc.start()
+    peaks = []
+    for payload in payloads:
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        profile = matcher.create_profile_from_request(payload)
+        result = matcher.analyze_person(profile, top_n=3)
+        peaks.append(tracemalloc.get_traced_memory()[1] - start)
+        del profile, result
+    start = tracemalloc.get_traced_memory()[0]
+    held = [matcher.create_profile_from_request(payload) for payload in payloads]
+    per_profile = (tracemalloc.get_traced_memory()[0] - start) / len(held)
+    tracemalloc.stop()
+    matcher.scoring_engine.cache = engine_cache
+    print(f"API request (form.py analyze_person, top 3): {np.mean(peaks) / 1024:.1f} KB peak, "
+          f"{per_profile:.0f} B per held profile")
+
+    csv_matcher = insights_generator_new.CareerMatcher()
+    rows = _survey_rows(200)
+    tracemalloc.start()
+    start = time.perf_counter()
+    profiles = [csv_matcher.parse_csv_row(row) for row in rows]
+    parsed = tracemalloc.get_traced_memory()[0]
+    results = [csv_matcher.analyze_person(profile) for profile in profiles]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"CSV batch ({len(rows)} rows, every job analysed): {parsed / len(rows):.0f} B per parsed profile, "
+          f"{current / len(rows) / 1024:.1f} KB held per result, {peak / 2**20:.1f} MB peak, "
+          f"{time.perf_counter() - start:.2f} s")
+
+
+def bench_compile():
+    """Catalog validation at load, and required-skill levels per request: resolved per call vs compiled once"""
+    print(f"{'jobs':>6} {'compile':>10} {'per call':>10} {'compiled':>10}")
+    profiles = [Profile(personality=p.personality, work_values=p.work_values, skills=p.skills, interests=p.interests)
+                for p in sample_profiles(50, seed=0)]
+    for size in (len(careers.onet_jobs), 1000, 10000):
+        catalog = scaled_catalog(careers.onet_jobs, size, jitter=0.8)
+        start = time.perf_counter()
+        compiled = compile_catalog(catalog)
+        build = time.perf_counter() - start
+        names = list(catalog)[:200]
+        jobs = compiled.jobs[:200]
+
+        def per_call():
+            # What every strengths/improvements call did before: munge names, then look up both sides
+            for profile in profiles:
+                for name in names:
+                    job = catalog[name]
+                    [(profile.level("skills", skill_key_for(s), DEFAULT_SKILL_LEVEL),
+                      job["skills"].get(skill_key_for(s), DEFAULT_REQUIRED_SKILL_LEVEL)) for s in job["required_skills"]]
+
+        def precompiled():
+            for profile in profiles:
+                for job in jobs:
+                    job.user_levels(profile)
+
+        calls = len(profiles) * len(names)
+        print(f"{size:>6} {build * 1e3:>7.1f} ms {_timed(per_call, 3) / calls * 1e6:>7.2f} us "
+              f"{_timed(precompiled, 3) / calls * 1e6:>7.2f} us")
+
+
+def bench_catalog_diff():
+    """Reload after fixing one job: diffing the catalogs, and score cache entries kept vs dropped"""
+    print(f"{'jobs':>6} {'diff':>10} {'carry over':>11} {'kept':>6} {'dropped':>8}")
+    profiles = sample_profiles(20, seed=0)
+    for size in (len(careers.onet_jobs), 1000, 10000):
+        catalog = scaled_catalog(careers.onet_jobs, size, jitter=0.8)
+        changed = dict(catalog)
+        name = next(iter(changed))
+        changed[name] = {**changed[name], "skills": {**changed[name]["skills"], "math": 1.0}}
+
+        cache = ScoreCache(maxsize=len(profiles) * 52)
+        engine = ScoringEngine(catalog, cache=cache)
+        for profile in profiles:
+            engine.top_k(profile, 3)
+            for job_name in list(catalog)[:50]:
+                engine.calculate_job_match(profile, job_name)
+        new_version = ScoringEngine(changed).catalog_version
+        start = time.perf_counter()
+        diff = diff_catalogs(catalog, changed, engine.catalog_version, new_version)
+        diffed = time.perf_counter() - start
+        start = time.perf_counter()
+        carried = cache.carry_over(diff)
+        print(f"{size:>6} {diffed * 1e3:>7.1f} ms {(time.perf_counter() - start) * 1e3:>8.2f} ms "
+              f"{carried['kept']:>6} {carried['dropped']:>8}")
+
+
+def bench_llm_cache():
+    """Insight prompt lookups in the persistent LLM cache: hashing, fill-in and SQLite hit/miss latency"""
+    prompt = ("Create a focused action plan for {{name}} to become a competitive candidate for Data Scientist. "
+              "Current gaps to address: - Programming: Gap of 1.4 points ") * 4
+    identifiers = {"name": "Alice Moreau"}
+    print(f"{'entries':>8} {'key':>9} {'hit':>9} {'miss':>9} {'store':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (1000, 10000, 100000):
+            cache = LLMCache(os.path.join(directory, f"cache{size}.sqlite3"), max_entries=size * 2)
+            for i in range(size):
+                cache.put(f"{i:064x}", "reply for {{name}} " * 50, jobs=["Data Scientist"])
+            key_seconds = _timed(lambda: cache_key(sent_prompt(prompt, identifiers), "gpt-4o-mini", 0.6, 300,
+                                                   None, "1"), repeats=1000)
+            keys = [f"{random.randrange(size):064x}" for _ in range(1000)]
+            start = time.perf_counter()
+            for key in keys:
+                fill_in(cache.get(key), identifiers)
+            hit = (time.perf_counter() - start) / len(keys)
+            miss = _timed(lambda: cache.get("missing"), repeats=1000)
+            start = time.perf_counter()
+            for i in range(200):
+                cache.put(f"new{i}", "reply", jobs=["Data Scientist"])
+            store = (time.perf_counter() - start) / 200
+            print(f"{size:>8} {key_seconds * 1e6:>6.1f} us {hit * 1e6:>6.1f} us {miss * 1e6:>6.1f} us "
+                  f"{store * 1e6:>6.1f} us")
+            cache.close()
+
+
+BENCHMARKS = {
+    "scoring": bench_scoring,
+    "topk": bench_topk,
+    "pruning": bench_pruning,
+    "what_if": bench_what_if,
+    "similarity": bench_similarity,
+    "snapshot": bench_snapshot,
+    "workers": bench_workers,
+    "onet_import": bench_onet_import,
+    "job_search": bench_job_search,
+    "responses": bench_responses,
+    "allocations": bench_allocations,
+    "compile": bench_compile,
+    "catalog_diff": bench_catalog_diff,
+    "llm_cache": bench_llm_cache
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        print(f"=== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
@@ -0,0 +1,466 @@
+"""
+Versioned binary snapshots of the job catalog
+
+careers.py holds the catalog as a Python dict literal, which every worker executes and keeps as nested
+dicts. `python catalog.py build` compiles it once into a snapshot file: the JobMatrix arrays scoring
+needs, per-job dimension slots and string lists as integer ids into one interned string table, the
+content hash of the source catalog, and the derived state of the lookup backend and the similarity
+index. CatalogSnapshot memory-maps that file read-only, so loading it costs a header parse whatever the
+catalog size and job dicts are only built when a job is looked up.
+
+Every worker (uvicorn --workers, gunicorn) maps the same file, so the catalog arrays live once in the
+OS page cache instead of once per worker. footprint_report() shows what a worker holds privately.
+CatalogWatcher polls the snapshot (or careers.py) so a running worker can pick up a rebuilt catalog.
+
+File layout: MAGIC, a little-endian uint64 header length, the JSON header, then every array at a
+64-byte aligned offset listed in the header.
+
+Usage: python catalog.py build [path] | check [path] | info [path]
+"""
+import importlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scoring import BACKENDS, JobMatrix, LookupTableBackend, ScoringEngine, catalog_version, sample_profiles
+from similarity import JobSimilarityIndex
+
+SNAPSHOT_MAGIC = b"ONETSNAP"
+SNAPSHOT_FORMAT = 3
+ARRAY_ALIGNMENT = 64
+
+DEFAULT_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                   "catalog.snapshot"))
+
+# Job fields stored as importance slots, in the JobMatrix vocabulary they index
+DIMENSION_FIELDS = {"skills": "skill", "work_values": "value", "interests": "interest", "work_styles": "work_style"}
+
+# Components whose derived state is precomputed into the snapshot, built from the catalog dict
+STORED_COMPONENTS = {
+    LookupTableBackend.name: LookupTableBackend,
+    "similarity": JobSimilarityIndex
+}
+
+
+class SnapshotError(ValueError):
+    """Raised for unreadable, incompatible or unrepresentable catalog snapshots"""
+
+
+def _field_kinds(onet_jobs: Dict) -> Dict[str, str]:
+    """Storage kind of each job field, taken from the first job (every job must follow it)"""
+    first = next(iter(onet_jobs.values()), {})
+    kinds = {}
+    for field, value in first.items():
+        if field in DIMENSION_FIELDS:
+            kinds[field] = "dimensions"
+        elif isinstance(value, str):
+            kinds[field] = "string"
+        elif isinstance(value, list):
+            kinds[field] = "strings"
+        else:
+            raise SnapshotError(f"Job field '{field}' has unsupported type {type(value).__name__}")
+    return kinds
+
+
+def build_snapshot(onet_jobs: Dict, path: str = DEFAULT_SNAPSHOT_PATH) -> Dict:
+    """
+    Compile a catalog into a snapshot file, written atomically next to path
+    Raises SnapshotError if the catalog does not survive the round trip unchanged. Returns the header summary.
+    """
+    if not onet_jobs:
+        raise SnapshotError("Cannot snapshot an empty catalog")
+    matrix = JobMatrix(onet_jobs)
+    kinds = _field_kinds(onet_jobs)
+    jobs = list(onet_jobs.values())
+
+    strings = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    arrays = {f"matrix.{name}": getattr(matrix, name) for name in JobMatrix.ARRAYS}
+    arrays["job_names"] = np.array([intern(name) for name in matrix.job_names], dtype=np.int32)
+    keys = {attribute: [intern(key) for key in getattr(matrix, attribute)] for attribute in JobMatrix.VOCABULARIES}
+    for field, kind in kinds.items():
+        if kind == "dimensions":
+            arrays[f"{field}.counts"] = np.array([len(job.get(field, {})) for job in jobs], dtype=np.int32)
+        elif kind == "string":
+            arrays[f"{field}.ids"] = np.array([intern(job[field]) for job in jobs], dtype=np.int32)
+        else:
+            lengths = [len(job[field]) for job in jobs]
+            arrays[f"{field}.offsets"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            arrays[f"{field}.ids"] = np.array([intern(value) for job in jobs for value in job[field]],
+                                              dtype=np.int32)
+
+    state = {}
+    for component, build in STORED_COMPONENTS.items():
+        component_arrays, state[component] = build(onet_jobs).snapshot_state()
+        arrays.update({f"{component}.{name}": array for name, array in component_arrays.items()})
+
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "content_hash": catalog_version(onet_jobs),
+        "created_at": datetime.now().isoformat(),
+        "jobs": len(jobs),
+        "fields": kinds,
+        "strings": list(strings),
+        "keys": keys,
+        "state": state,
+        "arrays": {}
+    }
+    payload = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype == np.intp:
+            array = array.astype(np.int64)
+        offset += -offset % ARRAY_ALIGNMENT
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        payload.append((offset, array))
+        offset += array.nbytes
+
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = len(SNAPSHOT_MAGIC) + 8 + len(encoded)
+    data_start += -data_start % ARRAY_ALIGNMENT
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<Q", data_start - len(SNAPSHOT_MAGIC) - 8))
+        f.write(encoded.ljust(data_start - len(SNAPSHOT_MAGIC) - 8, b" "))
+        for array_offset, array in payload:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+
+    try:
+        snapshot = CatalogSnapshot(temporary)
+        round_trip = catalog_version(dict(snapshot.items()))
+        snapshot.close()
+        if round_trip != header["content_hash"]:
+            raise SnapshotError("Catalog does not round-trip through a snapshot (non-float importances, "
+                                "or jobs with differing fields?)")
+    except Exception:
+        os.remove(temporary)
+        raise
+    os.replace(temporary, path)
+    return {key: header[key] for key in ("format", "content_hash", "created_at", "jobs")}
+
+
+class CatalogSnapshot(Mapping):
+    """
+    Read-only, memory-mapped job catalog with the same job name -> job dict interface as careers.onet_jobs
+    Job dicts are built on lookup, so edits to them never reach the catalog.
+    """
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"{path} is not a catalog snapshot")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(SNAPSHOT_MAGIC))
+        data_start = len(SNAPSHOT_MAGIC) + 8 + header_length
+        header = json.loads(self._mmap[len(SNAPSHOT_MAGIC) + 8:data_start])
+        if header["format"] != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"{path} has snapshot format {header['format']}, expected {SNAPSHOT_FORMAT}")
+
+        self.content_hash = header["content_hash"]
+        self.created_at = header["created_at"]
+        self.fields = header["fields"]
+        self.state = header["state"]
+        # Interned, so job names and dimension keys from any snapshot lookup share one object each
+        self.strings = [sys.intern(value) for value in header["strings"]]
+        self.arrays = {
+            name: np.frombuffer(self._mmap, dtype=spec["dtype"], count=int(np.prod(spec["shape"])),
+                                offset=data_start + spec["offset"]).reshape(spec["shape"])
+            for name, spec in header["arrays"].items()
+        }
+        self.job_names = [self.strings[i] for i in self.arrays["job_names"]]
+        self.job_index = {name: i for i, name in enumerate(self.job_names)}
+        self.vocabularies = {attribute: [self.strings[i] for i in ids] for attribute, ids in header["keys"].items()}
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def __getitem__(self, job_name: str) -> Dict:
+        return self.job(self.job_index[job_name])
+
+    def __iter__(self):
+        return iter(self.job_names)
+
+    def __len__(self) -> int:
+        return len(self.job_names)
+
+    def __contains__(self, job_name) -> bool:
+        return job_name in self.job_index
+
+    def job(self, index: int) -> Dict:
+        """Build the job dict for one catalog position"""
+        arrays = self.arrays
+        job = {}
+        for field, kind in self.fields.items():
+            if kind == "dimensions":
+                prefix = DIMENSION_FIELDS[field]
+                count = arrays[f"{field}.counts"][index]
+                columns = arrays[f"matrix.{prefix}_slots"][index, :count]
+                weights = arrays[f"matrix.{prefix}_slot_weights"][index, :count]
+                keys = self.vocabularies[f"{prefix}_keys"]
+                job[field] = {keys[column]: float(weight) for column, weight in zip(columns, weights)}
+            elif kind == "string":
+                job[field] = self.strings[arrays[f"{field}.ids"][index]]
+            else:
+                offsets = arrays[f"{field}.offsets"]
+                ids = arrays[f"{field}.ids"][offsets[index]:offsets[index + 1]]
+                job[field] = [self.strings[i] for i in ids]
+        return job
+
+    def job_matrix(self) -> JobMatrix:
+        """The compiled scoring arrays, as views into the mapped file"""
+        with self._lock:
+            if self._matrix is None:
+                onet_codes = ([self.strings[i] for i in self.arrays["onet_code.ids"]]
+                              if "onet_code.ids" in self.arrays else [None] * len(self))
+                self._matrix = JobMatrix.from_arrays(
+                    self.job_names, onet_codes, self.vocabularies,
+                    {name: self.arrays[f"matrix.{name}"] for name in JobMatrix.ARRAYS})
+            return self._matrix
+
+    def stored_state(self, component: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict]]:
+        """A component's precomputed arrays (read-only views into the mapped file) and metadata"""
+        if component not in self.state:
+            return None
+        prefix = f"{component}."
+        arrays = {name[len(prefix):]: array for name, array in self.arrays.items() if name.startswith(prefix)}
+        return arrays, self.state[component]
+
+    def info(self) -> Dict:
+        """Version details for health checks and result provenance"""
+        return {
+            "source": "snapshot",
+            "path": self.path,
+            "content_hash": self.content_hash,
+            "created_at": self.created_at,
+            "jobs": len(self),
+            "file_bytes": len(self._mmap)
+        }
+
+    def close(self):
+        """Release the mapping (only once no arrays from it are in use)"""
+        self.arrays = {}
+        self._matrix = None
+        self._mmap.close()
+
+
+def load_catalog(path: Optional[str] = None, reload_module: bool = False) -> Dict:
+    """
+    The job catalog for this process: the snapshot at path (CATALOG_SNAPSHOT, default catalog.snapshot
+    next to this module) when one exists, otherwise careers.onet_jobs
+    With reload_module, careers.py is re-executed first so edits to the file are picked up.
+    """
+    path = path or DEFAULT_SNAPSHOT_PATH
+    if os.path.exists(path):
+        try:
+            return CatalogSnapshot(path)
+        except SnapshotError as e:
+            print(f"Warning: ignoring catalog snapshot ({e}), run `python catalog.py build` to rebuild it")
+    import careers
+    if reload_module:
+        careers = importlib.reload(careers)
+    return careers.onet_jobs
+
+
+def source_signature(path: Optional[str] = None) -> Tuple:
+    """
+    Cheap fingerprint of whichever catalog source load_catalog would read: the file's stat, plus for
+    careers.py the identity of careers.onet_jobs so a reassignment in this process also counts
+    """
+    path = path or DEFAULT_SNAPSHOT_PATH
+    try:
+        # Snapshots are replaced atomically, so a new build always shows up as a new inode
+        stat = os.stat(path)
+        return "snapshot", stat.st_ino, stat.st_size, stat.st_mtime_ns, None
+    except FileNotFoundError:
+        pass
+    careers = sys.modules.get("careers")
+    source = careers.__file__ if careers is not None else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                        "careers.py")
+    stat = os.stat(source)
+    return "careers.py", stat.st_ino, stat.st_size, stat.st_mtime_ns, id(getattr(careers, "onet_jobs", None))
+
+
+class CatalogWatcher:
+    """
+    Daemon thread polling the catalog source every interval seconds (0 disables it)
+    On a change it calls on_change(reload_module), where reload_module says the careers.py file changed
+    (rather than careers.onet_jobs being reassigned in process).
+    """
+
+    def __init__(self, on_change: Callable[[bool], object], interval: float, path: Optional[str] = None):
+        self.on_change = on_change
+        self.interval = interval
+        self.path = path
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._signature = source_signature(self.path)
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                signature = source_signature(self.path)
+            except OSError as e:
+                self.last_error = f"Cannot read catalog source: {e}"
+                continue
+            if signature == self._signature:
+                continue
+            reload_module = signature[0] == "careers.py" and signature[:4] != self._signature[:4]
+            try:
+                self.on_change(reload_module)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"Catalog reload failed, keeping the live catalog: {e}"
+                print(self.last_error)
+            # Taken after the rebuild (a reload reassigns careers.onet_jobs) and kept even if it failed,
+            # so a broken edit is retried once it is saved again
+            try:
+                self._signature = source_signature(self.path)
+            except OSError:
+                self._signature = signature
+
+
+def catalog_info(onet_jobs: Dict) -> Dict:
+    """Where a loaded catalog came from and which version it is"""
+    if isinstance(onet_jobs, CatalogSnapshot):
+        return onet_jobs.info()
+    return {"source": "careers.py", "content_hash": catalog_version(onet_jobs), "jobs": len(onet_jobs)}
+
+
+def _mapped(array: np.ndarray) -> bool:
+    """Whether an array's memory is a file mapping (shared between processes) rather than private heap"""
+    while isinstance(array, np.ndarray) and array.base is not None:
+        array = array.base
+    if isinstance(array, memoryview):
+        array = array.obj
+    return isinstance(array, mmap.mmap)
+
+
+def array_footprint(component, depth: int = 2) -> Dict[str, float]:
+    """MB of NumPy arrays reachable through a component's attributes, split into mapped and private"""
+    totals = {"mapped_mb": 0.0, "private_mb": 0.0}
+    seen = set()
+
+    def visit(value, level: int):
+        if id(value) in seen:
+            return
+        seen.add(id(value))
+        if isinstance(value, np.ndarray):
+            totals["mapped_mb" if _mapped(value) else "private_mb"] += value.nbytes / 2**20
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, np.ndarray):
+                    visit(item, level)
+        elif level > 0 and hasattr(value, "__dict__") and not isinstance(value, type):
+            for attribute in vars(value).values():
+                visit(attribute, level - 1)
+
+    visit(component, depth)
+    return {key: round(mb, 2) for key, mb in totals.items()}
+
+
+def process_memory() -> Dict[str, float]:
+    """Resident memory of this process in MB, split by kind (Linux /proc only, empty elsewhere)"""
+    fields = {"VmRSS": "rss_mb", "RssAnon": "private_mb", "RssFile": "file_mapped_mb", "RssShmem": "shared_memory_mb"}
+    memory = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    memory[fields[name]] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return memory
+
+
+def footprint_report(onet_jobs: Dict, components: Dict[str, object]) -> Dict:
+    """Per-worker memory picture: catalog source, array memory per component and process resident memory"""
+    return {
+        "catalog": catalog_info(onet_jobs),
+        "components": {name: array_footprint(component) for name, component in components.items()},
+        "process": process_memory()
+    }
+
+
+def check_snapshot(onet_jobs: Dict, snapshot: CatalogSnapshot) -> List[str]:
+    """Compare a snapshot with the catalog it should hold: job dicts, hash, compiled arrays and scores"""
+    problems = []
+    if snapshot.content_hash != catalog_version(onet_jobs):
+        problems.append(f"snapshot hash {snapshot.content_hash} != catalog hash {catalog_version(onet_jobs)}")
+    if list(snapshot) != list(onet_jobs):
+        problems.append("job names or order differ")
+        return problems
+    for name, job in onet_jobs.items():
+        if snapshot[name] != job:
+            problems.append(f"job entry differs: {name}")
+    compiled = JobMatrix(onet_jobs)
+    stored = snapshot.job_matrix()
+    for attribute in JobMatrix.VOCABULARIES:
+        if getattr(stored, attribute) != getattr(compiled, attribute):
+            problems.append(f"vocabulary differs: {attribute}")
+    for name in JobMatrix.ARRAYS:
+        if not np.array_equal(getattr(stored, name), getattr(compiled, name)):
+            problems.append(f"compiled array differs: {name}")
+    for component, build in STORED_COMPONENTS.items():
+        arrays, meta = build(onet_jobs).snapshot_state()
+        stored_arrays, stored_meta = snapshot.stored_state(component)
+        if stored_meta != meta:
+            problems.append(f"{component} metadata differs")
+        for name, array in arrays.items():
+            if not np.array_equal(stored_arrays[name], array):
+                problems.append(f"{component} array differs: {name}")
+
+    profiles = sample_profiles(200, seed=0)
+    for backend in BACKENDS:
+        expected = ScoringEngine(onet_jobs, backend=backend).backend.score_profiles(profiles)
+        got = ScoringEngine(snapshot, backend=backend).backend.score_profiles(profiles)
+        if not np.array_equal(got, expected):
+            problems.append(f"{backend} backend scores differ on the snapshot")
+    return problems
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SNAPSHOT_PATH
+    if command == "build":
+        import careers
+
+        summary = build_snapshot(careers.onet_jobs, target)
+        print(f"Wrote {target}: {summary['jobs']} jobs, catalog version {summary['content_hash']}")
+    elif command == "check":
+        import careers
+
+        issues = check_snapshot(careers.onet_jobs, CatalogSnapshot(target))
+        if issues:
+            print("\n".join(issues))
+            raise SystemExit(1)
+        print(f"{target} matches careers.onet_jobs")
+    elif command == "info":
+        print(json.dumps(CatalogSnapshot(target).info(), indent=2))
+    else:
+        raise SystemExit(__doc__)
@@ -0,0 +1,159 @@
+"""
+Load-time validation and compilation of the job catalog
+
+compile_catalog() checks every job once when a catalog is loaded and compiles the scoring.Job views
+ScoringEngine reads on each request (required skills resolved to Profile level positions and required
+levels), so no request munges skill names or falls back through dicts. What it finds is returned as
+diagnostics rather than left as silent defaults:
+
+- errors (missing or malformed fields, weights that are not numbers in (0, 5]) mean the catalog cannot be
+  scored and raise CatalogError, so a hot reload keeps the previous generation live
+- warnings mark what scores with fixed defaults: canonical work values or interests a job omits,
+  dimensions no profile answer covers, required skills mapping to no survey skill (rated
+  DEFAULT_SKILL_LEVEL for every API profile) or without a weight in the job (required at
+  DEFAULT_REQUIRED_SKILL_LEVEL), and O*NET codes shared by several jobs
+
+Run `python catalog_compiler.py [-v]` to print the diagnostics summary of the configured catalog
+(-v lists every diagnostic).
+"""
+import re
+from collections import Counter
+from typing import Dict, List
+
+from scoring import (DEFAULT_REQUIRED_SKILL_LEVEL, DEFAULT_SKILL_LEVEL, INTERESTS, PROFILE_SKILLS, WORK_STYLE_TRAITS,
+                     WORK_VALUES, Job, skill_key_for)
+
+ONET_CODE_PATTERN = re.compile(r"^\d{2}-\d{4}\.\d{2}$")
+
+# Scoring normalises importances by 5, so weights must lie in (0, 5]
+MAX_IMPORTANCE = 5.0
+
+# Job fields every entry needs and their types (work_styles is optional)
+REQUIRED_FIELDS = {"onet_code": str, "skills": dict, "work_values": dict, "interests": dict, "required_skills": list}
+
+# Weighted job fields and the dimension keys profile answers cover
+ANSWERED_KEYS = {
+    "skills": set(PROFILE_SKILLS),
+    "work_values": set(WORK_VALUES),
+    "interests": set(INTERESTS),
+    "work_styles": set(WORK_STYLE_TRAITS)
+}
+
+# Fields every job is expected to rate on the full canonical vocabulary
+COMPLETE_FIELDS = {"work_values": WORK_VALUES, "interests": INTERESTS}
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog has jobs that cannot be scored"""
+
+
+def diagnostic(severity: str, code: str, job_name: str, message: str) -> Dict:
+    return {"severity": severity, "code": code, "job": job_name, "message": message}
+
+
+def check_job(job_name: str, job: Dict) -> List[Dict]:
+    """Diagnostics for one catalog entry"""
+    if not isinstance(job, dict):
+        return [diagnostic("error", "missing_field", job_name, f"Entry is a {type(job).__name__}, not a dict")]
+    found = [diagnostic("error", "missing_field", job_name, f"'{field}' is missing or not a {kind.__name__}")
+             for field, kind in REQUIRED_FIELDS.items() if not isinstance(job.get(field), kind)]
+    if not isinstance(job.get("work_styles", {}), dict):
+        found.append(diagnostic("error", "missing_field", job_name, "'work_styles' is not a dict"))
+    if found:
+        return found
+
+    if not ONET_CODE_PATTERN.match(job["onet_code"]):
+        found.append(diagnostic("warning", "onet_code", job_name, f"O*NET code '{job['onet_code']}' is not NN-NNNN.NN"))
+
+    for field, answered in ANSWERED_KEYS.items():
+        for key, importance in job.get(field, {}).items():
+            if (isinstance(importance, bool) or not isinstance(importance, (int, float))
+                    or not 0 < importance <= MAX_IMPORTANCE):
+                found.append(diagnostic("error", "bad_weight", job_name,
+                                        f"{field}.{key} weight {importance!r} is not a number in (0, {MAX_IMPORTANCE:g}]"))
+            elif key not in answered:
+                found.append(diagnostic("warning", "unanswered_dimension", job_name,
+                                        f"{field}.{key} matches no profile answer, so it always scores the default level"))
+
+    for field, keys in COMPLETE_FIELDS.items():
+        missing = [key for key in keys if key not in job[field]]
+        if missing:
+            found.append(diagnostic("warning", "missing_dimension", job_name,
+                                    f"{field} omits {', '.join(missing)}, which is never scored for this job"))
+
+    for skill_name in job["required_skills"]:
+        if not isinstance(skill_name, str):
+            found.append(diagnostic("error", "missing_field", job_name, f"Required skill {skill_name!r} is not a string"))
+            continue
+        key = skill_key_for(skill_name)
+        if key not in ANSWERED_KEYS["skills"]:
+            found.append(diagnostic("warning", "unmapped_required_skill", job_name,
+                                    f"Required skill '{skill_name}' maps to no survey skill ('{key}'), "
+                                    f"so API profiles are always rated {DEFAULT_SKILL_LEVEL}"))
+        if key not in job["skills"]:
+            found.append(diagnostic("warning", "unweighted_required_skill", job_name,
+                                    f"Required skill '{skill_name}' has no skills.{key} weight, "
+                                    f"so it is required at level {DEFAULT_REQUIRED_SKILL_LEVEL}"))
+    return found
+
+
+class CompiledCatalog:
+    """Job views compiled for ScoringEngine, in catalog order, plus the diagnostics found compiling them"""
+
+    def __init__(self, jobs: List[Job], diagnostics: List[Dict]):
+        self.jobs = jobs
+        self.diagnostics = diagnostics
+
+    def count(self, severity: str) -> int:
+        return sum(1 for d in self.diagnostics if d["severity"] == severity)
+
+    def report(self) -> Dict:
+        """Diagnostic counts per code plus every diagnostic, for /catalog/diagnostics"""
+        return {
+            "jobs": len(self.jobs),
+            "errors": self.count("error"),
+            "warnings": self.count("warning"),
+            "codes": dict(sorted(Counter(d["code"] for d in self.diagnostics).items())),
+            "diagnostics": self.diagnostics
+        }
+
+    def summary(self) -> str:
+        """One line for startup and reload logs"""
+        codes = ", ".join(f"{code} {count}" for code, count in self.report()["codes"].items())
+        return f"{len(self.jobs)} jobs, {self.count('error')} errors, {self.count('warning')} warnings" + (
+            f" ({codes})" if codes else "")
+
+
+def compile_catalog(onet_jobs: Dict) -> CompiledCatalog:
+    """Validate every job and compile its scoring.Job view, raising CatalogError if any job cannot be scored"""
+    diagnostics, jobs, codes = [], [], {}
+    for job_name, job in onet_jobs.items():
+        found = check_job(job_name, job)
+        diagnostics += found
+        if any(d["severity"] == "error" for d in found):
+            continue
+        first = codes.setdefault(job["onet_code"], job_name)
+        if first != job_name:
+            diagnostics.append(diagnostic("warning", "duplicate_onet_code", job_name,
+                                          f"O*NET code {job['onet_code']} is also used by '{first}'"))
+        jobs.append(Job(job_name, job))
+
+    errors = [d for d in diagnostics if d["severity"] == "error"]
+    if errors:
+        raise CatalogError(f"{len(errors)} catalog errors, first in '{errors[0]['job']}': {errors[0]['message']}")
+    return CompiledCatalog(jobs, diagnostics)
+
+
+if __name__ == "__main__":
+    import sys
+    from catalog import load_catalog
+
+    try:
+        compiled = compile_catalog(load_catalog())
+    except CatalogError as e:
+        print(e)
+        raise SystemExit(1)
+    verbose = "-v" in sys.argv[1:]
+    for entry in compiled.diagnostics if verbose else []:
+        print(f"{entry['severity']:8} {entry['code']:26} {entry['job']}: {entry['message']}")
+    print(compiled.summary())
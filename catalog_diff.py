@@ -0,0 +1,171 @@
+"""
+Job-level differences between two catalog versions
+
+diff_catalogs() compares two catalogs job by job: the jobs added, removed and updated, and for each updated
+job the dimensions ("skills.math", "work_values.impact") and other fields that changed. On a reload the
+matchers hand the diff to their caches, which keep every entry that only read unchanged jobs under the new
+catalog version (ScoreCache.carry_over) instead of dropping everything, so fixing one job does not send every
+returning profile back through scoring or the LLM.
+
+Usage: python catalog_diff.py OLD NEW | check
+OLD and NEW are catalog snapshots or Python files defining onet_jobs (such as careers.py); check verifies on
+careers.onet_jobs that carried-over score cache entries equal freshly computed ones.
+"""
+import copy
+import runpy
+import sys
+from typing import Dict, List, Optional, Set
+
+from scoring import ScoreCache, ScoringEngine, catalog_version, sample_profiles
+
+# Job fields holding dimension weights, whose changes are listed per dimension
+DIMENSION_FIELDS = ["skills", "work_values", "interests", "work_styles"]
+
+
+def job_changes(old_job: Dict, new_job: Dict) -> List[str]:
+    """
+    What changed in one job: "field.key" for each added, removed or re-weighted dimension, "field (order)" for
+    reordered dimensions (score sums follow dict order) and the field name for any other field
+    """
+    changes = []
+    for field in dict.fromkeys(list(old_job) + list(new_job)):
+        old_value, new_value = old_job.get(field), new_job.get(field)
+        is_dimensions = field in DIMENSION_FIELDS and isinstance(old_value or {}, dict) and isinstance(new_value or {}, dict)
+        if old_value == new_value:
+            if is_dimensions and list(old_value or {}) != list(new_value or {}):
+                changes.append(f"{field} (order)")
+        elif is_dimensions:
+            old_value, new_value = old_value or {}, new_value or {}
+            changes += [f"{field}.{key}" for key in dict.fromkeys(list(old_value) + list(new_value))
+                        if old_value.get(key) != new_value.get(key)]
+        else:
+            changes.append(field)
+    return changes
+
+
+class CatalogDiff:
+    """Jobs added, removed and updated between two catalog versions, with what changed in each updated job"""
+
+    def __init__(self, old_version: str, new_version: str, added: List[str], removed: List[str],
+                 changes: Dict[str, List[str]], reordered: bool):
+        self.old_version = old_version
+        self.new_version = new_version
+        self.added = added
+        self.removed = removed
+        self.updated = list(changes)
+        self.changes = changes
+        # Surviving jobs in a different order, which moves them in rankings on ties
+        self.reordered = reordered
+
+    @property
+    def changed_jobs(self) -> Set[str]:
+        """Jobs whose entries are gone or different; results that read any other single job still hold"""
+        return set(self.updated) | set(self.removed)
+
+    @property
+    def changes_rankings(self) -> bool:
+        """Whether results over the whole catalog (rankings, top k) can differ"""
+        return bool(self.added or self.removed or self.updated or self.reordered)
+
+    def dimensions(self) -> List[str]:
+        """Every changed dimension or field, across updated jobs"""
+        return sorted({change for changes in self.changes.values() for change in changes})
+
+    def to_dict(self) -> Dict:
+        return {
+            "old_version": self.old_version,
+            "new_version": self.new_version,
+            "added": self.added,
+            "removed": self.removed,
+            "updated": self.changes,
+            "reordered": self.reordered
+        }
+
+    def summary(self) -> str:
+        """One line for reload logs"""
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.updated)} updated"
+                + (", reordered" if self.reordered else ""))
+
+
+def diff_catalogs(old_jobs: Dict, new_jobs: Dict, old_version: Optional[str] = None,
+                  new_version: Optional[str] = None) -> CatalogDiff:
+    """Job-level diff from old_jobs to new_jobs (versions default to their content hashes)"""
+    added = [name for name in new_jobs if name not in old_jobs]
+    removed = [name for name in old_jobs if name not in new_jobs]
+    changes = {}
+    for name in new_jobs:
+        if name in old_jobs:
+            found = job_changes(old_jobs[name], new_jobs[name])
+            if found:
+                changes[name] = found
+    reordered = [name for name in old_jobs if name in new_jobs] != [name for name in new_jobs if name in old_jobs]
+    return CatalogDiff(old_version or catalog_version(old_jobs), new_version or catalog_version(new_jobs),
+                       added, removed, changes, reordered)
+
+
+def load_jobs(path: str) -> Dict:
+    """A catalog from a snapshot file or a Python file defining onet_jobs"""
+    if path.endswith(".py"):
+        return runpy.run_path(path)["onet_jobs"]
+    from catalog import CatalogSnapshot
+    return CatalogSnapshot(path)
+
+
+def check_carry_over(onet_jobs: Dict, samples: int = 50) -> List[str]:
+    """Score cache entries carried over a one-job change must equal results computed on the new catalog"""
+    problems = []
+    changed = copy.deepcopy(onet_jobs)
+    job_name = next(iter(changed))
+    skill = next(iter(changed[job_name]["skills"]))
+    changed[job_name]["skills"][skill] = round(5.5 - changed[job_name]["skills"][skill], 1)
+
+    cache = ScoreCache(maxsize=samples * (len(onet_jobs) + 2))
+    old_engine = ScoringEngine(onet_jobs, cache=cache)
+    profiles = sample_profiles(samples, seed=1)
+    for profile in profiles:
+        old_engine.rank(profile)
+        for name in onet_jobs:
+            old_engine.calculate_job_match(profile, name)
+
+    new_engine = ScoringEngine(changed, cache=cache)
+    diff = diff_catalogs(onet_jobs, changed, old_engine.catalog_version, new_engine.catalog_version)
+    if diff.updated != [job_name] or diff.changes[job_name] != [f"skills.{skill}"]:
+        problems.append(f"diff reports {diff.to_dict()['updated']}, expected {job_name}: skills.{skill}")
+    carried = cache.carry_over(diff)
+    if carried != {"kept": samples * (len(onet_jobs) - 1), "dropped": samples * 2}:
+        problems.append(f"carried over {carried}")
+
+    fresh = ScoringEngine(changed)
+    hits = cache.hits
+    for profile in profiles:
+        for name in onet_jobs:
+            if new_engine.calculate_job_match(profile, name) != fresh.calculate_job_match(profile, name):
+                problems.append(f"carried-over match for {name} differs from the new catalog")
+                break
+        if new_engine.rank(profile).page() != fresh.rank(profile).page():
+            problems.append("ranking differs from the new catalog")
+    if cache.hits - hits != samples * (len(onet_jobs) - 1):
+        problems.append(f"{cache.hits - hits} cache hits after the change, expected {samples * (len(onet_jobs) - 1)}")
+    return problems
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["check"]:
+        import careers
+
+        issues = check_carry_over(careers.onet_jobs)
+        if issues:
+            print("\n".join(issues))
+            raise SystemExit(1)
+        print(f"Carried-over score cache entries match the changed catalog ({len(careers.onet_jobs)} jobs)")
+    elif len(sys.argv) == 3:
+        diff = diff_catalogs(load_jobs(sys.argv[1]), load_jobs(sys.argv[2]))
+        for name in diff.added:
+            print(f"+ {name}")
+        for name in diff.removed:
+            print(f"- {name}")
+        for name, changes in diff.changes.items():
+            print(f"~ {name}: {', '.join(changes)}")
+        print(f"{diff.old_version} -> {diff.new_version}: {diff.summary()}")
+    else:
+        raise SystemExit(__doc__)
@@ -0,0 +1,150 @@
+"""
+Inverted indexes over the job catalog for filtered job listings and search
+
+CatalogIndex is built once per catalog load. Every job gets a position (catalog order) and each index
+maps a value to the sorted positions of the jobs carrying it: O*NET major group (first two digits of the
+onet_code), top RIASEC interest, required skill (as a profile skill key) and keyword (job_keywords plus
+the words of the job name). A search intersects the posting lists of the given filters, so a filtered
+/jobs page never walks the catalog. The per-job summary /jobs returns is also computed here once.
+
+Run `python catalog_index.py` to check searches against a plain scan of the catalog.
+"""
+import bisect
+import random
+import re
+import numpy as np
+from typing import Dict, List, Optional
+
+from scoring import skill_key_for
+
+# Top work values and interests listed per job
+SUMMARY_SIZE = 3
+
+# /jobs page size when none is requested, and the largest page a request may ask for
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+EMPTY = np.zeros(0, dtype=np.intp)
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercase word tokens used for keyword indexing and queries"""
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def top_interest(job: Dict) -> Optional[str]:
+    """A job's highest rated RIASEC interest (first listed on ties)"""
+    interests = job.get("interests", {})
+    return max(interests, key=interests.get) if interests else None
+
+
+class CatalogIndex:
+    """Posting lists by major group, top interest, required skill and keyword, plus per-job summaries"""
+
+    def __init__(self, onet_jobs: Dict):
+        self.job_names = list(onet_jobs.keys())
+        self.summaries = []
+        postings = {"group": {}, "interest": {}, "skill": {}, "keyword": {}}
+        for position, (job_name, job) in enumerate(onet_jobs.items()):
+            self.summaries.append({
+                "onet_code": job["onet_code"],
+                "required_skills": job["required_skills"],
+                "similar_roles": job.get("similar_roles", []),
+                "keywords": job.get("job_keywords", []),
+                "top_work_values": sorted(job["work_values"].items(), key=lambda x: x[1], reverse=True)[:SUMMARY_SIZE],
+                "top_interests": sorted(job["interests"].items(), key=lambda x: x[1], reverse=True)[:SUMMARY_SIZE]
+            })
+            values = {
+                "group": [job["onet_code"][:2]],
+                "interest": [top_interest(job)] if job.get("interests") else [],
+                "skill": [skill_key_for(skill) for skill in job["required_skills"]],
+                "keyword": tokens(" ".join([job_name] + list(job.get("job_keywords", []))))
+            }
+            for field, field_values in values.items():
+                for value in dict.fromkeys(field_values):
+                    postings[field].setdefault(value, []).append(position)
+        # Positions are appended in catalog order, so every posting list is already sorted
+        self.postings = {field: {value: np.array(positions, dtype=np.intp) for value, positions in index.items()}
+                         for field, index in postings.items()}
+        # Sorted keyword vocabulary, so query words match by prefix with a binary search
+        self.vocabulary = sorted(self.postings["keyword"])
+
+    def __len__(self) -> int:
+        return len(self.job_names)
+
+    def _keyword_positions(self, word: str) -> np.ndarray:
+        """Jobs with a keyword starting with word"""
+        start = bisect.bisect_left(self.vocabulary, word)
+        end = bisect.bisect_left(self.vocabulary, word + "\uffff")
+        matches = [self.postings["keyword"][keyword] for keyword in self.vocabulary[start:end]]
+        if not matches:
+            return EMPTY
+        return matches[0] if len(matches) == 1 else np.unique(np.concatenate(matches))
+
+    def search(self, interest: Optional[str] = None, skill: Optional[str] = None, group: Optional[str] = None,
+               q: Optional[str] = None) -> np.ndarray:
+        """
+        Positions (catalog order) of the jobs matching every given filter
+        skill takes a profile skill key or a required-skill display name; each word of q must prefix a keyword.
+        """
+        lists = []
+        if interest:
+            lists.append(self.postings["interest"].get(interest.lower(), EMPTY))
+        if skill:
+            lists.append(self.postings["skill"].get(skill_key_for(skill), EMPTY))
+        if group:
+            lists.append(self.postings["group"].get(group[:2], EMPTY))
+        if q:
+            lists += [self._keyword_positions(word) for word in tokens(q)]
+        if not lists:
+            return np.arange(len(self.job_names), dtype=np.intp)
+        # Smallest first keeps every intersection as cheap as possible
+        lists.sort(key=len)
+        positions = lists[0]
+        for other in lists[1:]:
+            if len(positions) == 0:
+                break
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        return positions
+
+    def filter_values(self) -> Dict[str, Dict[str, int]]:
+        """Job counts per major group, top interest and required skill, for building filter menus"""
+        return {field: {value: len(positions) for value, positions in sorted(self.postings[field].items())}
+                for field in ("group", "interest", "skill")}
+
+
+def check_search(onet_jobs: Dict, queries: int = 300, seed: int = 0) -> List[str]:
+    """Random filter combinations: index search vs a scan over the catalog"""
+    rng = random.Random(seed)
+    index = CatalogIndex(onet_jobs)
+    jobs = list(onet_jobs.items())
+    mismatches = []
+    for _ in range(queries):
+        name, job = rng.choice(jobs)
+        interest = top_interest(job) if rng.random() < 0.5 else None
+        skill = rng.choice(job["required_skills"]) if rng.random() < 0.5 else None
+        group = job["onet_code"][:2] if rng.random() < 0.3 else None
+        q = rng.choice(tokens(name))[:rng.randint(2, 6)] if rng.random() < 0.5 else None
+
+        expected = []
+        for position, (job_name, candidate) in enumerate(jobs):
+            words = tokens(" ".join([job_name] + list(candidate.get("job_keywords", []))))
+            if ((interest is None or top_interest(candidate) == interest)
+                    and (skill is None or skill_key_for(skill) in {skill_key_for(s) for s in candidate["required_skills"]})
+                    and (group is None or candidate["onet_code"][:2] == group)
+                    and (q is None or all(any(w.startswith(t) for w in words) for t in tokens(q)))):
+                expected.append(position)
+        got = index.search(interest=interest, skill=skill, group=group, q=q).tolist()
+        if got != expected:
+            mismatches.append(f"interest={interest} skill={skill} group={group} q={q}: {got} != {expected}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import careers
+
+    problems = check_search(careers.onet_jobs)
+    if problems:
+        print("\n".join(problems[:20]))
+        raise SystemExit(1)
+    print(f"Index searches match catalog scans over {len(careers.onet_jobs)} jobs")
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Form
+from fastapi import FastAPI, HTTPException, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
@@ -7,7 +7,13 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
-from dataclasses import dataclass, asdict
+import os
+from scoring import (DEFAULT_BACKEND, PERSONALITY_TRAITS, PROFILE_SKILLS, WORK_VALUES, BatchAnalysisRequest,
+                     CourseMatcher, Profile, RankedScores, ScoreCache, ScoringEngine)
+from catalog_compiler import compile_catalog
+from catalog_index import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, CatalogIndex
+from name_resolver import JobNameResolver
+from response_cache import STATIC_VERSION, ResponseCache
 
 # Pydantic models for request/response
 class PersonProfileRequest(BaseModel):
@@ -58,18 +64,10 @@ class AnalysisResponse(BaseModel):
     result: Optional[Dict] = None
     analysis_date: Optional[str] = None
 
-@dataclass
-class PersonProfile:
-    name: str
-    email: str
-    university: str
-    personality: Dict[str, float]
-    work_values: Dict[str, float]
-    skills: Dict[str, float]
-    interests: List[str]
-    preferred_career: str
-
-class CareerMatcher:
+# Slotted profile with fixed dimension order; dicts are built only for prompts, reports and responses
+PersonProfile = Profile
+
+class CareerMatcher(CourseMatcher):
     def __init__(self):
         # O*NET Job Database with detailed metrics
         self.onet_jobs = {
@@ -259,241 +257,33 @@ class CareerMatcher:
             }
         }
 
+        # Catalog compiled once into NumPy matrices; repeat submissions are served from the score cache
+        self.score_cache = ScoreCache(maxsize=int(os.getenv("SCORE_CACHE_SIZE", "4096")))
+        # /, /form-fields, /jobs and /form: encoded once per catalog version and query, revalidated by ETag
+        self.response_cache = ResponseCache(maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+                                            max_age=int(os.getenv("RESPONSE_MAX_AGE", "60")))
+        # Jobs validated and compiled once; the diagnostics show what scores with default levels
+        self.compiled_catalog = compile_catalog(self.onet_jobs)
+        self.scoring_engine = ScoringEngine(self.onet_jobs, backend=os.getenv("SCORING_BACKEND", DEFAULT_BACKEND),
+                                            cache=self.score_cache, jobs=self.compiled_catalog.jobs)
+        # Filter and keyword indexes behind /jobs, and typed career names -> catalog jobs
+        self.catalog_index = CatalogIndex(self.onet_jobs)
+        self.name_resolver = JobNameResolver(self.onet_jobs)
+
     def create_profile_from_request(self, request: PersonProfileRequest) -> PersonProfile:
-        """Create PersonProfile from API request"""
-        # Convert personality traits
-        personality = {
-            "openness": request.openness,
-            "conscientiousness": request.conscientiousness,
-            "extraversion": request.extraversion,
-            "agreeableness": request.agreeableness,
-            "neuroticism": request.neuroticism
-        }
-        
-        # Convert work values (rankings to scores: 1=most important becomes 6, 6=least becomes 1)
-        work_values = {
-            "income": 7 - request.income_importance,
-            "impact": 7 - request.impact_importance,
-            "stability": 7 - request.stability_importance,
-            "variety": 7 - request.variety_importance,
-            "recognition": 7 - request.recognition_importance,
-            "autonomy": 7 - request.autonomy_importance
-        }
-        
-        # Skills mapping
-        skills = {
-            "math": request.math,
-            "problem_solving": request.problem_solving,
-            "public_speaking": request.public_speaking,
-            "creative": request.creative,
-            "working_with_people": request.working_with_people,
-            "writing": request.writing,
-            "tech_savvy": request.tech_savvy,
-            "leadership": request.leadership,
-            "networking": request.networking,
-            "programming": request.programming,
-            "empathy": request.empathy,
-            "time_management": request.time_management,
-            "attention_to_detail": request.attention_to_detail,
-            "project_management": request.project_management,
-            "research": request.research,
-            "teamwork": request.teamwork
-        }
-        
-        return PersonProfile(
+        """Create PersonProfile from API request (work value rankings become levels: 1=most important -> 6)"""
+        levels = (tuple(getattr(request, trait) for trait in PERSONALITY_TRAITS) +
+                  tuple(7 - getattr(request, f"{value}_importance") for value in WORK_VALUES) +
+                  tuple(getattr(request, skill) for skill in PROFILE_SKILLS))
+        return PersonProfile.from_levels(
+            levels,
+            interests=request.interests,
             name=request.name,
             email=request.email,
             university=request.university,
-            personality=personality,
-            work_values=work_values,
-            skills=skills,
-            interests=request.interests,
             preferred_career=request.preferred_career
         )
 
-    def calculate_job_match(self, profile: PersonProfile, job_name: str) -> Dict:
-        """Calculate comprehensive match percentage and details for a specific job"""
-        job = self.onet_jobs[job_name]
-        
-        # Skills match (30% weight)
-        skills_score = self._calculate_skills_match(profile.skills, job["skills"])
-        
-        # Work values match (25% weight)
-        values_score = self._calculate_values_match(profile.work_values, job["work_values"])
-        
-        # Interests match (20% weight)
-        interests_score = self._calculate_interests_match(profile.interests, job["interests"])
-        
-        # Work styles match (25% weight)
-        work_styles_score = self._calculate_work_styles_match(profile.personality, job.get("work_styles", {}))
-        
-        # Overall match
-        overall_match = (skills_score * 0.3 + values_score * 0.25 + 
-                        interests_score * 0.2 + work_styles_score * 0.25) * 100
-        
-        # Identify strengths and improvement areas
-        strengths, improvements = self._identify_strengths_improvements(profile, job)
-        
-        # Generate interview preparation
-        interview_prep = self._generate_interview_preparation(profile, job)
-        
-        return {
-            "job_name": job_name,
-            "onet_code": job["onet_code"],
-            "overall_match": round(overall_match, 1),
-            "breakdown": {
-                "skills_match": round(skills_score * 100, 1),
-                "values_match": round(values_score * 100, 1),
-                "interests_match": round(interests_score * 100, 1),
-                "work_styles_match": round(work_styles_score * 100, 1)
-            },
-            "strengths": strengths,
-            "improvements": improvements,
-            "interview_preparation": interview_prep,
-            "required_skills": job["required_skills"]
-        }
-
-    def _calculate_skills_match(self, user_skills: Dict, job_skills: Dict) -> float:
-        """Calculate skills compatibility score"""
-        scores = []
-        
-        for skill, importance in job_skills.items():
-            user_level = user_skills.get(skill, 2.5)
-            
-            # Normalize both to 0-1 scale
-            normalized_importance = importance / 5.0
-            normalized_user = user_level / 5.0
-            
-            # Calculate match
-            if normalized_user >= normalized_importance:
-                score = 1.0
-            else:
-                gap = normalized_importance - normalized_user
-                score = max(0, 1 - (gap * 2))
-            
-            scores.append(score * normalized_importance)
-        
-        return sum(scores) / sum(job_skills.values()) * 5 if scores else 0
-
-    def _calculate_values_match(self, user_values: Dict, job_values: Dict) -> float:
-        """Calculate work values compatibility"""
-        scores = []
-        
-        for value, job_importance in job_values.items():
-            user_importance = user_values.get(value, 3.5)
-            
-            # Normalize to 0-1
-            norm_job = job_importance / 5.0
-            norm_user = user_importance / 6.0
-            
-            # Calculate similarity
-            difference = abs(norm_job - norm_user)
-            similarity = 1 - difference
-            
-            scores.append(similarity * norm_job)
-        
-        return sum(scores) / sum(job_values.values()) * 5 if scores else 0
-
-    def _calculate_interests_match(self, user_interests: List[str], job_interests: Dict) -> float:
-        """Calculate interests compatibility"""
-        if not user_interests:
-            return 0.5
-        
-        total_score = 0
-        max_possible = 0
-        
-        for interest, importance in job_interests.items():
-            max_possible += importance
-            if interest in user_interests:
-                total_score += importance
-        
-        return (total_score / max_possible) if max_possible > 0 else 0
-
-    def _calculate_work_styles_match(self, personality: Dict, job_work_styles: Dict) -> float:
-        """Calculate work styles compatibility based on personality traits"""
-        if not job_work_styles:
-            return 0.5
-        
-        # Map personality traits to work styles
-        personality_to_work_style = {
-            "analytical_thinking": personality.get("openness", 3),
-            "attention_to_detail": personality.get("conscientiousness", 3),
-            "dependability": personality.get("conscientiousness", 3),
-            "leadership": personality.get("extraversion", 3),
-            "stress_tolerance": 5 - personality.get("neuroticism", 3),
-            "adaptability": personality.get("openness", 3),
-            "social_orientation": personality.get("extraversion", 3),
-            "achievement": personality.get("conscientiousness", 3),
-            "initiative": personality.get("extraversion", 3),
-            "persistence": personality.get("conscientiousness", 3),
-            "concern_for_others": personality.get("agreeableness", 3),
-            "cooperation": personality.get("agreeableness", 3)
-        }
-        
-        scores = []
-        for style, importance in job_work_styles.items():
-            user_level = personality_to_work_style.get(style, 3.0)
-            
-            norm_importance = importance / 5.0
-            norm_user = user_level / 5.0
-            
-            if norm_user >= norm_importance * 0.8:
-                score = 1.0
-            else:
-                gap = (norm_importance * 0.8) - norm_user
-                score = max(0, 1 - (gap * 2))
-            
-            scores.append(score * norm_importance)
-        
-        return sum(scores) / sum(job_work_styles.values()) * 5 if scores else 0
-
-    def _identify_strengths_improvements(self, profile: PersonProfile, job: Dict) -> Tuple[List[str], List[Dict]]:
-        """Identify user strengths and areas for improvement"""
-        strengths = []
-        improvements = []
-        
-        skill_mapping = {
-            "Programming": "programming",
-            "Problem Solving": "problem_solving",
-            "Public Speaking": "public_speaking",
-            "Creative": "creative",
-            "Working with People": "working_with_people",
-            "Leadership": "leadership",
-            "Networking": "networking",
-            "Math": "math",
-            "Tech-Savvy": "tech_savvy",
-            "Empathy": "empathy",
-            "Time Management": "time_management",
-            "Attention to Detail": "attention_to_detail",
-            "Project Management": "project_management",
-            "Research": "research"
-        }
-        
-        for skill_name in job["required_skills"]:
-            skill_key = skill_mapping.get(skill_name, skill_name.lower().replace(' ', '_'))
-            user_level = profile.skills.get(skill_key, 2.5)
-            job_requirement = job["skills"].get(skill_key, 3.5)
-            
-            if user_level >= job_requirement:
-                strengths.append(f"Strong {skill_name} skills (Level {user_level}/5)")
-            elif user_level < job_requirement - 0.5:
-                courses = self.course_recommendations.get(skill_name, {
-                    "free": [{"name": f"Search for free {skill_name} courses", "url": "https://www.coursera.org/", "provider": "Various"}],
-                    "paid": [{"name": f"Search for {skill_name} courses", "url": "https://www.udemy.com/", "provider": "Udemy"}]
-                })
-                
-                improvements.append({
-                    "skill": skill_name,
-                    "current_level": user_level,
-                    "required_level": job_requirement,
-                    "gap_severity": "High" if job_requirement - user_level > 1.5 else "Medium",
-                    "free_courses": courses.get("free", []),
-                    "paid_courses": courses.get("paid", []),
-                    "improvement_tip": job.get("improvement_tips", {}).get(skill_name, f"Develop {skill_name} skills through practice and training")
-                })
-        
-        return strengths, improvements
-
     def _generate_interview_preparation(self, profile: PersonProfile, job: Dict) -> Dict:
         """Generate interview preparation based on profile and job match"""
         prep_data = {
@@ -525,21 +315,11 @@ class CareerMatcher:
         
         return prep_data
 
-    def analyze_person(self, profile: PersonProfile) -> Dict:
-        """Analyze a person against all jobs and return ranked matches"""
-        matches = []
-        
-        for job_name in self.onet_jobs.keys():
-            match_result = self.calculate_job_match(profile, job_name)
-            matches.append(match_result)
-        
-        matches.sort(key=lambda x: x["overall_match"], reverse=True)
-        
+    def _analysis_fields(self, profile: PersonProfile, matches: List[Dict], ranking: RankedScores) -> Dict:
+        """The profile as a dict for the response, and the preferred career scored next to the matches"""
         return {
-            "profile": asdict(profile),
-            "matches": matches,
-            "top_match": matches[0] if matches else None,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "profile": profile.to_dict(),
+            "preferred_career_match": self.preferred_career_match(profile, [m["job_name"] for m in matches], ranking)
         }
 
 # Initialize FastAPI app
@@ -558,16 +338,19 @@ app.add_middleware(
 matcher = CareerMatcher()
 
 @app.post("/analyze-profile", response_model=AnalysisResponse)
-async def analyze_profile(request: PersonProfileRequest):
+async def analyze_profile(request: PersonProfileRequest,
+                          top_n: Optional[int] = Query(None, ge=1),
+                          offset: int = Query(0, ge=0)):
     """
     Analyze a person's profile and return career matching results
+    Pass top_n (and offset for later pages) to get only part of the ranking; all jobs by default
     """
     try:
         # Create profile from request
         profile = matcher.create_profile_from_request(request)
         
         # Analyze the profile
-        result = matcher.analyze_person(profile)
+        result = matcher.analyze_person(profile, top_n, offset)
         
         return AnalysisResponse(
             success=True,
@@ -579,23 +362,46 @@ async def analyze_profile(request: PersonProfileRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing profile: {str(e)}")
 
-@app.get("/")
-async def root():
-    """Root endpoint with API information"""
+@app.post("/analyze-batch", response_model=AnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest[PersonProfileRequest]):
+    """
+    Score many profiles at once and return the top K matches for each, in input order
+    """
+    try:
+        result = matcher.analyze_batch_request(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch input: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing batch: {str(e)}")
+
+    return AnalysisResponse(
+        success=True,
+        message=f"Successfully ranked {result['total_profiles']} profiles",
+        result=result,
+        analysis_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+
+def root_info() -> Dict:
+    """API information served by /"""
     return {
         "message": "Career Matching API",
         "version": "1.0.0",
         "endpoints": {
             "/analyze-profile": "POST - Analyze individual profile from form data",
-            "/jobs": "GET - List available job types",
+            "/analyze-batch": "POST - Rank many profiles at once",
+            "/jobs": "GET - List available job types (filters: interest, skill, group, q; paginated with offset, limit (default 50); facets=1 adds filter counts)",
             "/form-fields": "GET - Get form field specifications",
             "/health": "GET - Health check"
         }
     }
 
-@app.get("/form-fields")
-async def get_form_fields():
-    """Get form field specifications for frontend"""
+@app.get("/")
+async def root(request: Request):
+    """Root endpoint with API information"""
+    return matcher.response_cache.respond(request, (STATIC_VERSION, "/"), root_info)
+
+def form_fields() -> Dict:
+    """Form field specifications served by /form-fields"""
     return {
         "personality_traits": {
             "openness": {"type": "integer", "min": 1, "max": 5, "description": "Openness to experience"},
@@ -643,33 +449,69 @@ async def get_form_fields():
         }
     }
 
-@app.get("/jobs")
-async def get_jobs():
-    """Get list of available job types and their details"""
+@app.get("/form-fields")
+async def get_form_fields(request: Request):
+    """Get form field specifications for frontend"""
+    return matcher.response_cache.respond(request, (STATIC_VERSION, "/form-fields"), form_fields)
+
+def jobs_listing(interest: Optional[str], skill: Optional[str], group: Optional[str], q: Optional[str],
+                 offset: int, limit: int, facets: bool = False) -> Dict:
+    """A page of available job types and their details, filtered through the catalog indexes"""
+    index = matcher.catalog_index
+    positions = index.search(interest=interest, skill=skill, group=group, q=q)
     jobs_info = {}
-    for job_name, job_data in matcher.onet_jobs.items():
-        jobs_info[job_name] = {
-            "onet_code": job_data["onet_code"],
-            "required_skills": job_data["required_skills"],
-            "top_work_values": sorted(job_data["work_values"].items(), key=lambda x: x[1], reverse=True)[:3],
-            "top_interests": sorted(job_data["interests"].items(), key=lambda x: x[1], reverse=True)[:3]
+    for position in positions[offset:offset + limit]:
+        summary = index.summaries[position]
+        jobs_info[index.job_names[position]] = {
+            "onet_code": summary["onet_code"],
+            "required_skills": summary["required_skills"],
+            "top_work_values": summary["top_work_values"],
+            "top_interests": summary["top_interests"]
         }
     
-    return {
-        "available_jobs": list(matcher.onet_jobs.keys()),
+    listing = {
+        "total_jobs": len(index),
+        "matching_jobs": len(positions),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < len(positions) else None,
+        "available_jobs": list(jobs_info.keys()),
         "job_details": jobs_info
     }
+    if facets:
+        listing["filter_values"] = index.filter_values()
+    return listing
+
+@app.get("/jobs")
+async def get_jobs(request: Request,
+                   interest: Optional[str] = Query(None, description="Top RIASEC interest, e.g. social"),
+                   skill: Optional[str] = Query(None, description="Required skill, e.g. research or Problem Solving"),
+                   group: Optional[str] = Query(None, description="O*NET major group, e.g. 15 or 15-1252.00"),
+                   q: Optional[str] = Query(None, description="Words matching job names and keywords by prefix"),
+                   offset: int = Query(0, ge=0),
+                   limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                   facets: bool = Query(False, description="Also return job counts per group, interest and skill")):
+    """Get a page of available job types and their details, filtered through the catalog indexes"""
+    key = (matcher.scoring_engine.catalog_version, "/jobs", interest, skill, group, q, offset, limit, facets)
+    return matcher.response_cache.respond(
+        request, key, lambda: jobs_listing(interest, skill, group, q, offset, limit, facets))
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "catalog_version": matcher.scoring_engine.catalog_version,
+        "score_cache": matcher.score_cache.stats(),
+        "top_k_pruning": matcher.scoring_engine.pruning.stats(),
+        "response_cache": matcher.response_cache.stats(),
+        "catalog_diagnostics": matcher.compiled_catalog.summary(),
+        "timestamp": datetime.now().isoformat()
+    }
 
-# Example HTML form endpoint (optional - for testing)
-@app.get("/form")
-async def get_form():
-    """Return a simple HTML form for testing the API"""
-    html_form = """
+def form_html() -> str:
+    """HTML test form served by /form"""
+    return """
     <!DOCTYPE html>
     <html>
     <head>
@@ -980,8 +822,12 @@ async def get_form():
     </body>
     </html>
     """
-    from fastapi.responses import HTMLResponse
-    return HTMLResponse(content=html_form, status_code=200)
+
+# Example HTML form endpoint (optional - for testing)
+@app.get("/form")
+async def get_form(request: Request):
+    """Return a simple HTML form for testing the API"""
+    return matcher.response_cache.respond(request, (STATIC_VERSION, "/form"), form_html, media_type="text/html")
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,33 +1,48 @@
 import firebase_admin
 from firebase_admin import credentials, firestore, db
-from fastapi import FastAPI, HTTPException, Form
+from fastapi import FastAPI, HTTPException, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
+import asyncio
+import copy
 import os
-from pydantic import BaseModel, Field
-from typing import Dict, List, Tuple, Optional
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List, Literal, Tuple, Optional
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
 import io
 import uvicorn
-from dataclasses import dataclass, asdict
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-import openai
-import os
-from openai import OpenAI
-import careers 
+from scoring import (DEFAULT_BACKEND, MAX_BATCH_TOP_K, PERSONALITY_TRAITS, PROFILE_SKILLS, WORK_VALUES,
+                     BatchAnalysisRequest, CatalogMatcher, JobRanking, Profile, RankedScores, ScoreCache, ScoringEngine,
+                     TopKMatches)
+from similarity import JobSimilarityIndex
+from catalog import CatalogWatcher, catalog_info, footprint_report, load_catalog
+from catalog_compiler import CompiledCatalog, compile_catalog
+from catalog_diff import CatalogDiff, diff_catalogs
+from catalog_index import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, CatalogIndex
+from name_resolver import JobNameResolver
+from insight_prompts import SECTION_PROMPTS, InsightPrompt, batch_slots, batched_prompt, combined_prompt
+from llm_client import LLMClient
+from match_quantizer import MatchQuantizer
+from insight_schema import SECTIONS, ActionPlan, InterviewInsights, conforms, validate_batch, validate_sections
+from response_cache import ResponseCache
 
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Pooled async OpenAI client: insight generation awaits instead of blocking the worker
+llm = LLMClient.from_env()
 
 # Pydantic models for request/response (keeping existing ones)
 class PersonProfileRequest(BaseModel):
@@ -73,183 +88,425 @@ class PersonProfileRequest(BaseModel):
     # Interests (multiple selection)
     interests: List[str] = Field(..., description="List of interests from: investigative, social, artistic, enterprising, realistic, conventional")
 
+class WhatIfRequest(BaseModel):
+    profile: PersonProfileRequest = Field(..., description="Base profile")
+    deltas: Dict[str, int] = Field(..., description="Change per answer field, e.g. {\"programming\": 2}; results are clamped to the field's range")
+    top_n: int = Field(3, ge=1, le=MAX_BATCH_TOP_K, description="Number of top job matches to compare")
+    include_gradient: bool = Field(False, description="Also return the match gain per +1 on each skill for the new top jobs")
+
 class AnalysisResponse(BaseModel):
     success: bool
     message: str
     result: Optional[Dict] = None
     analysis_date: Optional[str] = None
 
-@dataclass
-class PersonProfile:
-    name: str
-    email: str
-    university: str
-    personality: Dict[str, float]
-    work_values: Dict[str, float]
-    skills: Dict[str, float]
-    interests: List[str]
-    preferred_career: str
-
-class AICareerMatcher:
-    def __init__(self):
-        # Enhanced O*NET Job Database with similar roles mapping
-        self.onet_jobs = careers.onet_jobs
+# How a job's LLM sections are generated: one call per section, all in one structured-output call, or
+# (for multi-job analyses) the sections of several jobs in one structured-output call
+INSIGHT_MODES = ("sections", "combined", "batched")
+InsightMode = Literal["sections", "combined", "batched"]
 
-    def create_profile_from_request(self, request: PersonProfileRequest) -> PersonProfile:
-        """Create PersonProfile from API request"""
-        personality = {
-            "openness": request.openness,
-            "conscientiousness": request.conscientiousness,
-            "extraversion": request.extraversion,
-            "agreeableness": request.agreeableness,
-            "neuroticism": request.neuroticism
-        }
-        
-        work_values = {
-            "income": 7 - request.income_importance,
-            "impact": 7 - request.impact_importance,
-            "stability": 7 - request.stability_importance,
-            "variety": 7 - request.variety_importance,
-            "recognition": 7 - request.recognition_importance,
-            "autonomy": 7 - request.autonomy_importance
+# Insight mode of the job being generated, so its calls and fallbacks are counted under it
+_insight_mode: ContextVar[str] = ContextVar("insight_mode", default="sections")
+
+# Slotted profile with fixed dimension order; dicts are built only for prompts, reports and responses
+PersonProfile = Profile
+
+# Catalog generation serving the current request (set per request by pin_catalog_generation)
+_request_catalog: ContextVar[Optional["CatalogState"]] = ContextVar("request_catalog", default=None)
+
+class CatalogState:
+    """One catalog generation: the jobs plus everything compiled from them, never modified once live"""
+
+    def __init__(self, generation: int, onet_jobs: Dict, compiled: CompiledCatalog, scoring_engine: ScoringEngine,
+                 similarity: JobSimilarityIndex, changes: Optional[CatalogDiff] = None):
+        self.generation = generation
+        self.onet_jobs = onet_jobs
+        # Job entries as loaded, for diffing against the next generation: careers.onet_jobs may be edited in
+        # place before a reload, while snapshots decode jobs from their immutable file
+        self.loaded_jobs = copy.deepcopy(onet_jobs) if isinstance(onet_jobs, dict) else onet_jobs
+        # What changed from the previous generation
+        self.changes = changes
+        # Validated job views and the diagnostics behind /catalog/diagnostics
+        self.compiled = compiled
+        self.scoring_engine = scoring_engine
+        self.similarity = similarity
+        # Filter and keyword indexes behind /jobs, and typed career names -> catalog jobs
+        self.catalog_index = CatalogIndex(onet_jobs)
+        self.name_resolver = JobNameResolver(onet_jobs)
+        self.loaded_at = datetime.now().isoformat()
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def info(self) -> Dict:
+        """Generation summary for /catalog/version"""
+        return {
+            "generation": self.generation,
+            "catalog_version": self.scoring_engine.catalog_version,
+            "source": catalog_info(self.onet_jobs)["source"],
+            "jobs": len(self.onet_jobs),
+            "loaded_at": self.loaded_at,
+            "in_flight_requests": self.in_flight,
+            "changes": self.changes.summary() if self.changes else None
         }
-        
-        skills = {
-            "math": request.math,
-            "problem_solving": request.problem_solving,
-            "public_speaking": request.public_speaking,
-            "creative": request.creative,
-            "working_with_people": request.working_with_people,
-            "writing": request.writing,
-            "tech_savvy": request.tech_savvy,
-            "leadership": request.leadership,
-            "networking": request.networking,
-            "programming": request.programming,
-            "empathy": request.empathy,
-            "time_management": request.time_management,
-            "attention_to_detail": request.attention_to_detail,
-            "project_management": request.project_management,
-            "research": request.research,
-            "teamwork": request.teamwork
+
+class AICareerMatcher(CatalogMatcher):
+    def __init__(self):
+        # Repeat submissions (same answers, any name) skip scoring entirely
+        self.score_cache = ScoreCache(maxsize=int(os.getenv("SCORE_CACHE_SIZE", "4096")))
+        # /, /jobs: encoded once per catalog version and query, revalidated by ETag
+        self.response_cache = ResponseCache(maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+                                            max_age=int(os.getenv("RESPONSE_MAX_AGE", "60")))
+        # LLM calls one analysis runs at once; the top-3 analysis makes 12, so by default all overlap
+        self.insight_concurrency = int(os.getenv("INSIGHT_CONCURRENCY", "12"))
+        # Insight mode used when a request does not pick one (?insight_mode=sections|combined|batched)
+        self.insight_mode = os.getenv("INSIGHT_MODE", "sections")
+        # Jobs per call in the batched mode
+        self.insight_batch_size = int(os.getenv("INSIGHT_BATCH_SIZE", "3"))
+        # Prompts state scores and gaps in bands (INSIGHT_SCORE_BAND, INSIGHT_GAP_STEP), so near-identical
+        # profiles send identical prompts and share cached insights; exact scores are filled in locally
+        self.quantizer = MatchQuantizer.from_env()
+        if self.insight_mode not in INSIGHT_MODES:
+            raise ValueError(f"INSIGHT_MODE must be one of {', '.join(INSIGHT_MODES)}, not '{self.insight_mode}'")
+        # Per mode: jobs generated, sections that failed validation, sections re-requested and sections
+        # served from fixed fallback text, to compare the failure rate of the modes
+        self.insight_stats = {mode: {"jobs": 0, "invalid_sections": 0, "rerequested_sections": 0,
+                                     "fallback_sections": 0} for mode in INSIGHT_MODES}
+        # Enhanced O*NET Job Database with similar roles mapping: the memory-mapped snapshot built by
+        # `python catalog.py build` when present, else careers.onet_jobs. The catalog, its compiled
+        # NumPy matrices and the similarity index are swapped together as one generation on reload.
+        onet_jobs = load_catalog()
+        compiled = compile_catalog(onet_jobs)
+        print(f"Catalog compiled: {compiled.summary()}")
+        self.catalog_state = CatalogState(1, onet_jobs, compiled, self._build_scoring_engine(onet_jobs, compiled),
+                                          JobSimilarityIndex(onet_jobs))
+        # Older generations still finishing requests that started on them
+        self.retired_states: List[CatalogState] = []
+        self._reload_lock = threading.Lock()
+        footprint = self.memory_footprint()
+        arrays = footprint["components"].values()
+        print(f"Worker {os.getpid()} catalog {footprint['catalog']['content_hash']} "
+              f"({footprint['catalog']['source']}): {sum(a['mapped_mb'] for a in arrays):.1f} MB mapped, "
+              f"{sum(a['private_mb'] for a in arrays):.1f} MB private arrays, "
+              f"{footprint['process'].get('private_mb', '?')} MB private resident")
+        # Rebuilds in the background when the snapshot or careers.py changes
+        self.catalog_watcher = CatalogWatcher(lambda reload_module: self.refresh_catalog(reload_module),
+                                              interval=float(os.getenv("CATALOG_RELOAD_INTERVAL", "5")))
+        self.catalog_watcher.start()
+
+    def current_state(self) -> CatalogState:
+        """The generation this request started on, or the live one outside a request"""
+        return _request_catalog.get() or self.catalog_state
+
+    @property
+    def onet_jobs(self) -> Dict:
+        return self.current_state().onet_jobs
+
+    @property
+    def scoring_engine(self) -> ScoringEngine:
+        return self.current_state().scoring_engine
+
+    @property
+    def similarity(self) -> JobSimilarityIndex:
+        return self.current_state().similarity
+
+    @property
+    def catalog_index(self) -> CatalogIndex:
+        return self.current_state().catalog_index
+
+    @property
+    def name_resolver(self) -> JobNameResolver:
+        return self.current_state().name_resolver
+
+    @contextmanager
+    def pinned_catalog(self):
+        """Serve everything inside from the live generation, even if a reload swaps in another meanwhile"""
+        state = self.catalog_state
+        token = _request_catalog.set(state)
+        state.enter()
+        try:
+            yield state
+        finally:
+            state.leave()
+            _request_catalog.reset(token)
+
+    def memory_footprint(self) -> Dict:
+        """This worker's catalog memory: arrays mapped from the shared snapshot vs held privately"""
+        return footprint_report(self.onet_jobs, {"scoring": self.scoring_engine, "similarity": self.similarity})
+
+    def _build_scoring_engine(self, onet_jobs: Dict, compiled: CompiledCatalog) -> ScoringEngine:
+        return ScoringEngine(onet_jobs, backend=os.getenv("SCORING_BACKEND", DEFAULT_BACKEND),
+                             cache=self.score_cache, jobs=compiled.jobs)
+
+    def refresh_catalog(self, reload_module: bool = False) -> bool:
+        """
+        Build the catalog (snapshot file, or careers.onet_jobs which may have been edited in place) into a
+        new generation and swap it in if it changed
+        Requests already running finish on the generation they started with. Cached scores that only read
+        unchanged jobs move to the new catalog version, the rest are dropped. reload_module re-executes
+        careers.py first. Returns True if the catalog changed.
+        """
+        with self._reload_lock:
+            live = self.catalog_state
+            onet_jobs = load_catalog(reload_module=reload_module)
+            # A catalog with errors raises CatalogError here, leaving the live generation in place
+            compiled = compile_catalog(onet_jobs)
+            engine = self._build_scoring_engine(onet_jobs, compiled)
+            if engine.catalog_version == live.scoring_engine.catalog_version:
+                return False
+            diff = diff_catalogs(live.loaded_jobs, onet_jobs, live.scoring_engine.catalog_version, engine.catalog_version)
+            # Only jobs whose entries changed get their similarity rows and neighbour lists recomputed
+            state = CatalogState(live.generation + 1, onet_jobs, compiled, engine, live.similarity.derive(onet_jobs),
+                                 changes=diff)
+            self.retired_states = [s for s in self.retired_states if s.in_flight > 0] + [live]
+            self.catalog_state = state
+            carried = self.score_cache.carry_over(diff)
+            # Cached insights describing a changed or removed job are stale; the rest stay valid
+            dropped_insights = llm.cache.invalidate_jobs(diff.changed_jobs) if llm.cache is not None else 0
+            # Listings and / cover the whole catalog, so every encoded response is rebuilt
+            self.response_cache.invalidate(live.scoring_engine.catalog_version)
+            print(f"Catalog generation {state.generation} live: version {engine.catalog_version}, "
+                  f"{compiled.summary()}; changes: {diff.summary()}; score cache kept {carried['kept']}, "
+                  f"dropped {carried['dropped']}; LLM cache dropped {dropped_insights}")
+            return True
+
+    def catalog_status(self) -> Dict:
+        """Live catalog generation, older generations still draining requests, and watcher state"""
+        return {
+            "live": self.catalog_state.info(),
+            "draining": [state.info() for state in self.retired_states if state.in_flight > 0],
+            "last_change": self.catalog_state.changes.to_dict() if self.catalog_state.changes else None,
+            "reload_interval_seconds": self.catalog_watcher.interval,
+            "last_reload_error": self.catalog_watcher.last_error
         }
-        
-        return PersonProfile(
+
+    def create_profile_from_request(self, request: PersonProfileRequest) -> PersonProfile:
+        """Create PersonProfile from API request (work value rankings become levels: 1=most important -> 6)"""
+        levels = (tuple(getattr(request, trait) for trait in PERSONALITY_TRAITS) +
+                  tuple(7 - getattr(request, f"{value}_importance") for value in WORK_VALUES) +
+                  tuple(getattr(request, skill) for skill in PROFILE_SKILLS))
+        return PersonProfile.from_levels(
+            levels,
+            interests=request.interests,
             name=request.name,
             email=request.email,
             university=request.university,
-            personality=personality,
-            work_values=work_values,
-            skills=skills,
-            interests=request.interests,
             preferred_career=request.preferred_career
         )
 
-    def get_top_job_matches(self, profile: PersonProfile, top_n: int = 3) -> List[str]:
+    def rank_jobs(self, profile: PersonProfile) -> JobRanking:
+        """Score a profile against all jobs once; pages of the ranking reuse these scores"""
+        return self.scoring_engine.rank(profile)
+
+    def resolve_job_name(self, job_name: str) -> str:
+        """Catalog job a typed name refers to (exact key, alias or close spelling); ValueError if none is close"""
+        if job_name in self.onet_jobs:
+            return job_name
+        resolved = self.name_resolver.resolve(job_name)
+        if resolved is None:
+            closest = [c["job_name"] for c in self.name_resolver.candidates(job_name)]
+            raise ValueError(f"Unknown job '{job_name}'" + (f"; closest catalog jobs: {', '.join(closest)}" if closest else ""))
+        return resolved
+
+    def get_top_k(self, profile: PersonProfile, top_n: int = 3) -> TopKMatches:
+        """Top N jobs with exact scores; on large catalogs jobs that cannot make the top N are pruned first"""
+        return self.scoring_engine.top_k(profile, top_n)
+
+    def get_top_job_matches(self, profile: PersonProfile, top_n: int = 3, offset: int = 0) -> List[str]:
         """
         Calculate match scores for all jobs and return top N job names
-        This is a lightweight calculation without AI insights
+        This is a lightweight vectorized calculation without AI insights
+        Use offset to page to the next N matches without re-scoring
         """
-        job_scores = []
-        
-        for job_name in self.onet_jobs.keys():
-            job = self.onet_jobs[job_name]
-            
-            # Quick scoring calculation
-            skills_score = self._calculate_skills_match(profile.skills, job["skills"])
-            values_score = self._calculate_values_match(profile.work_values, job["work_values"])
-            interests_score = self._calculate_interests_match(profile.interests, job["interests"])
-            work_styles_score = self._calculate_work_styles_match(profile.personality, job.get("work_styles", {}))
-            
-            overall_score = (skills_score * 0.3 + values_score * 0.25 + 
-                           interests_score * 0.2 + work_styles_score * 0.25)
-            
-            job_scores.append((job_name, overall_score))
-        
-        # Sort by score and return top N job names
-        job_scores.sort(key=lambda x: x[1], reverse=True)
-        return [job_name for job_name, _ in job_scores[:top_n]]
+        return self.scoring_engine.top_job_matches(profile, top_n, offset)
+
+    def apply_answer_deltas(self, request: PersonProfileRequest, deltas: Dict[str, int]) -> PersonProfileRequest:
+        """Copy of a profile request with numeric answers shifted by deltas, clamped to each answer's range"""
+        updates = {}
+        for field, delta in deltas.items():
+            if field in PERSONALITY_TRAITS or field in PROFILE_SKILLS:
+                low, high = 1, 5
+            elif field.endswith("_importance") and field[:-len("_importance")] in WORK_VALUES:
+                low, high = 1, 6
+            else:
+                raise ValueError(f"'{field}' is not a numeric profile answer")
+            updates[field] = min(high, max(low, getattr(request, field) + delta))
+        return request.model_copy(update=updates)
+
+    def what_if(self, profile: PersonProfile, changed_profile: PersonProfile, top_n: int = 3,
+                include_gradient: bool = False) -> Dict:
+        """
+        Compare top matches before and after changing some answers
+        Only jobs that use a changed answer are re-scored against the cached per-job scores
+        """
+        return self.scoring_engine.what_if(profile, changed_profile, top_n, include_gradient)
+
+    async def _timed_stage(self, semaphore: asyncio.Semaphore, timings: Dict, stage: str, coro):
+        """Await one insight call once the semaphore admits it, recording its seconds under timings[stage]"""
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = round(time.perf_counter() - start, 3)
+
+    def _identifiers(self, profile: PersonProfile) -> Dict[str, str]:
+        """Personal values insight prompts write as placeholders (insight_prompts.NAME), filled into replies"""
+        return {"name": profile.name}
+
+    async def _complete(self, prompt: InsightPrompt, profile: PersonProfile, tag: str, jobs: List[str],
+                        valid=None) -> str:
+        """Reply to one insight prompt, with the profile's identifiers filled in"""
+        return await llm.complete(prompt.text, max_tokens=prompt.max_tokens, temperature=prompt.temperature,
+                                  response_format=prompt.response_format, tag=tag,
+                                  values=self._identifiers(profile), jobs=jobs, valid=valid)
 
-    async def generate_ai_insights(self, profile: PersonProfile, job_name: str, match_data: Dict) -> Dict:
-        """Generate AI-powered insights for a specific job match"""
+    def _count_insight(self, counter: str, count: int = 1):
+        self.insight_stats[_insight_mode.get()][counter] += count
+
+    def _section_generator(self, section: str, profile: PersonProfile, job_name: str, job: Dict, match_data: Dict):
+        """The one-section call (with its own fallback text) that generates section in the four-call mode"""
+        if section == "ai_summary":
+            return self._generate_ai_summary(profile, job_name, job, match_data)
+        if section == "action_plan":
+            return self._generate_action_plan(profile, job_name, match_data)
+        if section == "career_story":
+            return self._generate_career_story(profile, job_name, match_data)
+        return self._generate_interview_insights(profile, job_name, match_data)
+
+    async def generate_ai_insights(self, profile: PersonProfile, job_name: str, match_data: Dict,
+                                   semaphore: Optional[asyncio.Semaphore] = None,
+                                   timings: Optional[Dict] = None, mode: Optional[InsightMode] = None,
+                                   sections: Optional[Dict] = None) -> Dict:
+        """
+        Generate AI-powered insights for a specific job match
+        mode "sections" makes one call per section, "combined" one structured-output call for all of them
+        (default: insight_mode); "batched" is "combined" for a single job, and passes the sections already
+        generated for several jobs at once by insights_for_jobs. Independent calls run concurrently, at most
+        insight_concurrency at a time unless a shared semaphore is passed; seconds per call are recorded in
+        timings when given
+        """
         job = self.onet_jobs[job_name]
-        
-        # Prepare user data summary for AI
-        user_summary = self._prepare_user_summary(profile, match_data)
-        
-        # Generate AI summary
-        ai_summary = await self._generate_ai_summary(profile, job_name, job, match_data)
-        
-        # Generate top keywords and O-NET categories
-        keywords = await self._generate_keywords(job_name, job)
+        semaphore = semaphore or asyncio.Semaphore(self.insight_concurrency)
+        timings = {} if timings is None else timings
+        mode = mode or self.insight_mode
+        # Tasks copy the context when created, so their calls are counted under this job's mode
+        token = _insight_mode.set(mode)
+        self._count_insight("jobs")
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                def stage(name: str, coro):
+                    return group.create_task(self._timed_stage(semaphore, timings, name, coro))
+
+                keywords = stage("keywords", self._generate_keywords(job_name, job))
+                if sections is not None:
+                    tasks = {}
+                elif mode == "sections":
+                    tasks = {section: stage(section, self._section_generator(section, profile, job_name, job,
+                                                                             match_data))
+                             for section in SECTIONS}
+                else:
+                    combined = group.create_task(
+                        self._generate_combined_insights(profile, job_name, job, match_data, semaphore, timings))
+        finally:
+            _insight_mode.reset(token)
         onet_categories = await self._generate_onet_categories(job_name, job)
-        
-        # Generate action plan
-        action_plan = await self._generate_action_plan(profile, job_name, match_data)
-        
-        # Generate career story
-        career_story = await self._generate_career_story(profile, job_name, match_data)
-        
-        # Generate interview insights
-        interview_insights = await self._generate_interview_insights(profile, job_name, match_data)
-        
+        if sections is None:
+            sections = {name: task.result() for name, task in tasks.items()} if mode == "sections" else combined.result()
+
         return {
-            "ai_summary": ai_summary,
-            "keywords": keywords,
+            "ai_summary": sections["ai_summary"],
+            "keywords": keywords.result(),
             "onet_categories": onet_categories,
-            "action_plan": action_plan,
-            "career_story": career_story,
-            "interview_insights": interview_insights,
-            "similar_roles": job.get("similar_roles", [])
+            "action_plan": sections["action_plan"],
+            "career_story": sections["career_story"],
+            "interview_insights": sections["interview_insights"],
+            "similar_roles": job.get("similar_roles", []),
+            "similar_catalog_jobs": self.similarity.neighbours(job_name)
         }
 
-    def _prepare_user_summary(self, profile: PersonProfile, match_data: Dict) -> str:
-        """Prepare a concise summary of user data for AI processing"""
-        top_skills = sorted(profile.skills.items(), key=lambda x: x[1], reverse=True)[:5]
-        top_values = sorted(profile.work_values.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        return f"""
-        User: {profile.name}
-        Top Skills: {', '.join([f'{skill}: {level}/5' for skill, level in top_skills])}
-        Top Work Values: {', '.join([f'{value}: {level}/6' for value, level in top_values])}
-        Interests: {', '.join(profile.interests)}
-        Overall Match: {match_data['overall_match']}%
-        Strengths: {len(match_data['strengths'])} identified
-        Improvement Areas: {len(match_data['improvements'])} identified
+    async def _generate_batched_insights(self, profile: PersonProfile, job_names: List[str],
+                                         match_results: List[Dict], semaphore: asyncio.Semaphore,
+                                         job_timings: Dict, batch_timings: Dict) -> Dict[str, Dict]:
+        """
+        Every LLM section of several jobs from one structured-output call, split back per job
+        Jobs whose reply has invalid sections get those sections re-requested in a per-job combined call
+        """
+        slots = batch_slots(len(job_names))
+        prompt = batched_prompt(job_names, [self.quantizer.facts(match_data) for match_data in match_results])
+        try:
+            content = await self._timed_stage(semaphore, batch_timings, "seconds", self._complete(
+                prompt, profile, "batched", job_names,
+                valid=lambda reply: not any(failed for _, failed in validate_batch(reply, slots).values())))
+            replies = validate_batch(content, slots)
+        except Exception:
+            replies = {slot: ({}, list(SECTIONS)) for slot in slots}
+
+        results, retries = {}, {}
+        async with asyncio.TaskGroup() as group:
+            for slot, job_name, match_data in zip(slots, job_names, match_results):
+                results[job_name], failed = replies[slot]
+                if failed:
+                    self._count_insight("invalid_sections", len(failed))
+                    self._count_insight("rerequested_sections", len(failed))
+                    retries[job_name] = group.create_task(self._generate_combined_insights(
+                        profile, job_name, self.onet_jobs[job_name], match_data, semaphore,
+                        job_timings[job_name], failed))
+        for job_name, task in retries.items():
+            results[job_name].update(task.result())
+        return results
+
+    async def _generate_combined_insights(self, profile: PersonProfile, job_name: str, job: Dict, match_data: Dict,
+                                          semaphore: asyncio.Semaphore, timings: Dict,
+                                          failed: Optional[List[str]] = None) -> Dict:
         """
+        The LLM sections of a job (all, or the failed ones of a batched reply) from one structured-output
+        call, validated section by section
+        Sections that fail validation are re-requested together once; any still failing are generated by
+        their four-call prompt (which falls back to fixed text)
+        """
+        sections, failed = {}, list(failed or SECTIONS)
+        mode = _insight_mode.get()
+        facts = self.quantizer.facts(match_data)
+        for stage in ("combined", "combined_retry"):
+            try:
+                content = await self._timed_stage(semaphore, timings, stage, self._complete(
+                    combined_prompt(job_name, facts, failed), profile,
+                    stage if mode == "combined" else f"{mode}_{stage}", [job_name],
+                    valid=lambda reply, sections=failed: not validate_sections(reply, sections)[1]))
+                valid, failed = validate_sections(content, failed)
+            except Exception:
+                valid = {}
+            sections.update(valid)
+            if not failed:
+                return sections
+            self._count_insight("invalid_sections", len(failed))
+            if stage == "combined":
+                self._count_insight("rerequested_sections", len(failed))
+
+        async with asyncio.TaskGroup() as group:
+            tasks = {section: group.create_task(self._timed_stage(
+                semaphore, timings, section, self._section_generator(section, profile, job_name, job, match_data)))
+                for section in failed}
+        sections.update({section: task.result() for section, task in tasks.items()})
+        return sections
 
     async def _generate_ai_summary(self, profile: PersonProfile, job_name: str, job: Dict, match_data: Dict) -> str:
         """Generate AI summary of job fit"""
-        prompt = f"""
-        Create a personalized 2-3 paragraph summary for {profile.name} regarding their fit for the {job_name} position.
-        
-        Key Information:
-        - Overall Match: {match_data['overall_match']}%
-        - Skills Match: {match_data['breakdown']['skills_match']}%
-        - Values Match: {match_data['breakdown']['values_match']}%
-        - Interests Match: {match_data['breakdown']['interests_match']}%
-        - Work Styles Match: {match_data['breakdown']['work_styles_match']}%
-        
-        User Strengths: {', '.join(match_data['strengths'])}
-        Areas for Improvement: {len(match_data['improvements'])} key areas identified
-        
-        Write in a encouraging, professional tone that:
-        1. Acknowledges their strengths and natural fit
-        2. Addresses any gaps constructively
-        3. Provides realistic outlook on their candidacy
-        4. Motivates action toward career goals
-        
-        Keep it concise but insightful.
-        """
-        
+        prompt = SECTION_PROMPTS["ai_summary"](job_name, self.quantizer.facts(match_data))
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=400,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip()
+            content = await self._complete(prompt, profile, "sections", [job_name])
+            return content
         except Exception as e:
+            self._count_insight("fallback_sections")
             return f"AI analysis temporarily unavailable. Based on your {match_data['overall_match']}% match score, you show strong potential for this role with {len(match_data['strengths'])} key strengths identified."
 
     async def _generate_keywords(self, job_name: str, job: Dict) -> List[str]:
@@ -269,13 +526,8 @@ class AICareerMatcher:
         """
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
-                temperature=0.5
-            )
-            keywords = [k.strip() for k in response.choices[0].message.content.strip().split(',')]
+            content = await llm.complete(prompt, max_tokens=50, temperature=0.5, tag="keywords", jobs=[job_name])
+            keywords = [k.strip() for k in content.split(',')]
             return keywords[:4]
         except Exception:
             return ["professional", "skilled", "dedicated", "growth-oriented"]
@@ -298,40 +550,18 @@ class AICareerMatcher:
     async def _generate_action_plan(self, profile: PersonProfile, job_name: str, match_data: Dict) -> Dict:
         """Generate personalized action plan"""
         improvements = match_data.get('improvements', [])
-        
-        prompt = f"""
-        Create a focused action plan for {profile.name} to become a competitive candidate for {job_name}.
-        
-        Current gaps to address:
-        {chr(10).join([f"- {imp['skill']}: Gap of {imp['required_level'] - imp['current_level']:.1f} points" for imp in improvements[:3]])}
-        
-        Provide:
-        1. Top Needs (3 priority areas)
-        2. Action Items (4-5 specific, actionable steps)
-        
-        Make it practical and achievable within 3-6 months.
-        Format as JSON with "top_needs" and "action_items" arrays.
-        """
-        
+        prompt = SECTION_PROMPTS["action_plan"](job_name, self.quantizer.facts(match_data))
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.6
-            )
-            
-            content = response.choices[0].message.content.strip()
-            # Try to extract JSON, fallback if needed
+            content = await self._complete(prompt, profile, "sections", [job_name],
+                                           valid=lambda reply: conforms(ActionPlan, reply))
+
             try:
-                import re
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except:
-                pass
+                return ActionPlan.model_validate_json(content).model_dump()
+            except ValidationError:
+                self._count_insight("invalid_sections")
             
             # Fallback structure
+            self._count_insight("fallback_sections")
             return {
                 "top_needs": [
                     f"Develop {improvements[0]['skill']} skills" if improvements else "Enhance core competencies",
@@ -348,6 +578,7 @@ class AICareerMatcher:
             }
             
         except Exception:
+            self._count_insight("fallback_sections")
             return {
                 "top_needs": ["Skill development", "Experience building", "Industry networking"],
                 "action_items": ["Complete relevant courses", "Gain hands-on experience", "Build professional network", "Prepare interview materials"]
@@ -355,69 +586,28 @@ class AICareerMatcher:
 
     async def _generate_career_story(self, profile: PersonProfile, job_name: str, match_data: Dict) -> str:
         """Generate a compelling career narrative"""
-        strengths = match_data.get('strengths', [])
-        
-        prompt = f"""
-        Write a compelling 2-paragraph career story for {profile.name} pursuing {job_name}.
-        
-        Their strengths: {', '.join(strengths[:4])}
-        Match score: {match_data['overall_match']}%
-        
-        Create a narrative that:
-        1. First paragraph: Connects their background and strengths to this career path naturally
-        2. Second paragraph: Shows vision for their future growth and impact in this role
-        
-        Write in first person as if they're telling their story.
-        Be authentic, confident, and forward-looking.
-        """
-        
+        prompt = SECTION_PROMPTS["career_story"](job_name, self.quantizer.facts(match_data))
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip()
+            content = await self._complete(prompt, profile, "sections", [job_name])
+            return content
         except Exception:
+            self._count_insight("fallback_sections")
             return f"My journey toward {job_name} has been shaped by my natural strengths and genuine passion for this field. Through my experiences, I've developed key capabilities that align well with what this role demands. I'm excited about the opportunity to bring my skills and perspective to make a meaningful impact in this position and grow alongside the organization."
 
     async def _generate_interview_insights(self, profile: PersonProfile, job_name: str, match_data: Dict) -> Dict:
         """Generate interview-ready insights"""
-        strengths = match_data.get('strengths', [])
-        
-        prompt = f"""
-        Create interview preparation insights for {profile.name} applying for {job_name}.
-        
-        Their key strengths: {', '.join(strengths[:4])}
-        
-        Provide:
-        1. Key Selling Points (3 main strengths to emphasize)
-        2. Story Examples (3 specific scenarios they should prepare)
-        3. Questions to Ask (3 thoughtful questions for the interviewer)
-        
-        Format as JSON with these three arrays.
-        Make it specific and actionable for interview success.
-        """
-        
+        prompt = SECTION_PROMPTS["interview_insights"](job_name, self.quantizer.facts(match_data))
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=350,
-                temperature=0.6
-            )
-            
-            content = response.choices[0].message.content.strip()
+            content = await self._complete(prompt, profile, "sections", [job_name],
+                                           valid=lambda reply: conforms(InterviewInsights, reply))
+
             try:
-                import re
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except:
-                pass
+                return InterviewInsights.model_validate_json(content).model_dump()
+            except ValidationError:
+                self._count_insight("invalid_sections")
             
             # Fallback
+            self._count_insight("fallback_sections")
             return {
                 "key_selling_points": [
                     "Strong analytical and problem-solving abilities",
@@ -437,216 +627,95 @@ class AICareerMatcher:
             }
             
         except Exception:
+            self._count_insight("fallback_sections")
             return {
                 "key_selling_points": ["Strong foundational skills", "Growth mindset", "Team collaboration"],
                 "story_examples": ["Problem-solving example", "Teamwork scenario", "Learning achievement"],
                 "questions_to_ask": ["Role expectations", "Team challenges", "Growth opportunities"]
             }
 
-    def calculate_job_match(self, profile: PersonProfile, job_name: str) -> Dict:
+    def calculate_job_match(self, profile: PersonProfile, job_name: str, ranking: Optional[RankedScores] = None) -> Dict:
         """Calculate comprehensive match percentage and details for a specific job"""
-        job = self.onet_jobs[job_name]
-        
-        # Skills match (30% weight)
-        skills_score = self._calculate_skills_match(profile.skills, job["skills"])
-        
-        # Work values match (25% weight) 
-        values_score = self._calculate_values_match(profile.work_values, job["work_values"])
-        
-        # Interests match (20% weight)
-        interests_score = self._calculate_interests_match(profile.interests, job["interests"])
-        
-        # Work styles match (25% weight)
-        work_styles_score = self._calculate_work_styles_match(profile.personality, job.get("work_styles", {}))
-        
-        # Overall match
-        overall_match = (skills_score * 0.3 + values_score * 0.25 + 
-                        interests_score * 0.2 + work_styles_score * 0.25) * 100
-        
-        # Identify strengths and improvement areas
-        strengths, improvements = self._identify_strengths_improvements(profile, job)
-        
-        return {
-            "job_name": job_name,
-            "onet_code": job["onet_code"],
-            "overall_match": round(overall_match, 1),
-            "breakdown": {
-                "skills_match": round(skills_score * 100, 1),
-                "values_match": round(values_score * 100, 1),
-                "interests_match": round(interests_score * 100, 1),
-                "work_styles_match": round(work_styles_score * 100, 1)
-            },
-            "strengths": strengths,
-            "improvements": improvements,
-            "required_skills": job["required_skills"]
-        }
-
-    def _calculate_skills_match(self, user_skills: Dict, job_skills: Dict) -> float:
-        """Calculate skills compatibility score"""
-        scores = []
-        
-        for skill, importance in job_skills.items():
-            user_level = user_skills.get(skill, 2.5)
-            
-            # Normalize both to 0-1 scale
-            normalized_importance = importance / 5.0
-            normalized_user = user_level / 5.0
-            
-            # Calculate match
-            if normalized_user >= normalized_importance:
-                score = 1.0
-            else:
-                gap = normalized_importance - normalized_user
-                score = max(0, 1 - (gap * 2))
-            
-            scores.append(score * normalized_importance)
-        
-        return sum(scores) / sum(job_skills.values()) * 5 if scores else 0
+        return self.scoring_engine.calculate_job_match(profile, job_name, ranking)
 
-    def _calculate_values_match(self, user_values: Dict, job_values: Dict) -> float:
-        """Calculate work values compatibility"""
-        scores = []
-        
-        for value, job_importance in job_values.items():
-            user_importance = user_values.get(value, 3.5)
-            
-            # Normalize to 0-1
-            norm_job = job_importance / 5.0
-            norm_user = user_importance / 6.0
-            
-            # Calculate similarity
-            difference = abs(norm_job - norm_user)
-            similarity = 1 - difference
-            
-            scores.append(similarity * norm_job)
-        
-        return sum(scores) / sum(job_values.values()) * 5 if scores else 0
-
-    def _calculate_interests_match(self, user_interests: List[str], job_interests: Dict) -> float:
-        """Calculate interests compatibility"""
-        if not user_interests:
-            return 0.5
-        
-        total_score = 0
-        max_possible = 0
-        
-        for interest, importance in job_interests.items():
-            max_possible += importance
-            if interest in user_interests:
-                total_score += importance
-        
-        return (total_score / max_possible) if max_possible > 0 else 0
-
-    def _calculate_work_styles_match(self, personality: Dict, job_work_styles: Dict) -> float:
-        """Calculate work styles compatibility based on personality traits"""
-        if not job_work_styles:
-            return 0.5
-        
-        # Map personality traits to work styles
-        personality_to_work_style = {
-            "analytical_thinking": personality.get("openness", 3),
-            "attention_to_detail": personality.get("conscientiousness", 3),
-            "dependability": personality.get("conscientiousness", 3),
-            "leadership": personality.get("extraversion", 3),
-            "stress_tolerance": 5 - personality.get("neuroticism", 3),
-            "adaptability": personality.get("openness", 3),
-            "social_orientation": personality.get("extraversion", 3),
-            "achievement": personality.get("conscientiousness", 3),
-            "initiative": personality.get("extraversion", 3),
-            "persistence": personality.get("conscientiousness", 3),
-            "concern_for_others": personality.get("agreeableness", 3),
-            "cooperation": personality.get("agreeableness", 3)
-        }
-        
-        scores = []
-        for style, importance in job_work_styles.items():
-            user_level = personality_to_work_style.get(style, 3.0)
-            
-            norm_importance = importance / 5.0
-            norm_user = user_level / 5.0
-            
-            if norm_user >= norm_importance * 0.8:
-                score = 1.0
-            else:
-                gap = (norm_importance * 0.8) - norm_user
-                score = max(0, 1 - (gap * 2))
-            
-            scores.append(score * norm_importance)
-        
-        return sum(scores) / sum(job_work_styles.values()) * 5 if scores else 0
-
-    def _identify_strengths_improvements(self, profile: PersonProfile, job: Dict) -> Tuple[List[str], List[Dict]]:
-        """Identify user strengths and areas for improvement"""
-        strengths = []
-        improvements = []
-        
-        skill_mapping = {
-            "Programming": "programming",
-            "Problem Solving": "problem_solving",
-            "Public Speaking": "public_speaking",
-            "Creative": "creative",
-            "Working with People": "working_with_people",
-            "Leadership": "leadership",
-            "Networking": "networking",
-            "Math": "math",
-            "Tech-Savvy": "tech_savvy",
-            "Empathy": "empathy",
-            "Time Management": "time_management",
-            "Attention to Detail": "attention_to_detail",
-            "Project Management": "project_management",
-            "Research": "research"
+    async def insights_for_jobs(self, profile: PersonProfile, job_names: List[str],
+                                ranking: Optional[RankedScores] = None,
+                                mode: Optional[InsightMode] = None) -> Tuple[List[Dict], Dict]:
+        """
+        Match data plus AI insights for each job, in job_names order, with every job's sections generated
+        concurrently under one insight_concurrency cap
+        Also returns timings: seconds per section per job, the wall time of the fan-out and the time the
+        calls would have taken one after another
+        """
+        mode = mode or self.insight_mode
+        semaphore = asyncio.Semaphore(self.insight_concurrency)
+        job_timings = {job_name: {} for job_name in job_names}
+        match_results = [self.calculate_job_match(profile, job_name, ranking) for job_name in job_names]
+        start = time.perf_counter()
+        sections, batches = {}, []
+        if mode == "batched":
+            size = self.insight_batch_size
+            batches = [{"jobs": job_names[i:i + size]} for i in range(0, len(job_names), size)]
+            token = _insight_mode.set(mode)
+            try:
+                async with asyncio.TaskGroup() as group:
+                    batch_tasks = [group.create_task(self._generate_batched_insights(
+                        profile, batch["jobs"], match_results[i * size:(i + 1) * size], semaphore, job_timings, batch))
+                        for i, batch in enumerate(batches)]
+            finally:
+                _insight_mode.reset(token)
+            for task in batch_tasks:
+                sections.update(task.result())
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(self.generate_ai_insights(profile, job_name, match_result, semaphore,
+                                                                 job_timings[job_name], mode, sections.get(job_name)))
+                     for job_name, match_result in zip(job_names, match_results)]
+        timings = {
+            "insights_seconds": round(time.perf_counter() - start, 3),
+            "serial_seconds": round(sum(sum(stages.values()) for stages in job_timings.values())
+                                    + sum(batch.get("seconds", 0) for batch in batches), 3),
+            "concurrency": self.insight_concurrency,
+            "insight_mode": mode,
+            "jobs": job_timings
         }
-        
-        for skill_name in job["required_skills"]:
-            skill_key = skill_mapping.get(skill_name, skill_name.lower().replace(' ', '_'))
-            user_level = profile.skills.get(skill_key, 2.5)
-            job_requirement = job["skills"].get(skill_key, 3.5)
-            
-            if user_level >= job_requirement:
-                strengths.append(f"Strong {skill_name} skills (Level {user_level}/5)")
-            elif user_level < job_requirement - 0.5:
-                improvements.append({
-                    "skill": skill_name,
-                    "current_level": user_level,
-                    "required_level": job_requirement,
-                    "gap_severity": "High" if job_requirement - user_level > 1.5 else "Medium"
-                })
-        
-        return strengths, improvements
-
-    async def analyze_person_with_top_matches(self, profile: PersonProfile, top_n: int = 3) -> Dict:
+        if batches:
+            timings["batches"] = batches
+        return [{**match_result, **task.result()} for match_result, task in zip(match_results, tasks)], timings
+
+    async def analyze_person_with_top_matches(self, profile: PersonProfile, top_n: int = 3,
+                                              mode: Optional[InsightMode] = None) -> Dict:
         """
         MODIFIED METHOD: Analyze a person against only the top N job matches with AI insights
         This reduces API calls and focuses on most relevant careers
         """
         # Step 1: Get top N job matches (lightweight calculation)
         print(f"Calculating match scores for all {len(self.onet_jobs)} jobs...")
-        top_job_names = self.get_top_job_matches(profile, top_n)
-        print(f"Top {top_n} job matches identified: {', '.join(top_job_names)}")
-        
-        # Step 2: Generate detailed analysis with AI insights for top matches only
-        matches = []
-        for i, job_name in enumerate(top_job_names, 1):
-            print(f"Generating AI insights for match {i}/{top_n}: {job_name}")
-            
-            # Calculate detailed match data
-            match_result = self.calculate_job_match(profile, job_name)
-            
-            # Generate AI insights
-            ai_insights = await self.generate_ai_insights(profile, job_name, match_result)
-            
-            # Combine results
-            enhanced_match = {**match_result, **ai_insights}
-            matches.append(enhanced_match)
-        
-        print(f"Analysis complete for top {top_n} matches.")
+        start = time.perf_counter()
+        ranking = self.get_top_k(profile, top_n)
+        scoring_seconds = time.perf_counter() - start
+        top_job_names = ranking.job_names
+        print(f"Top {top_n} job matches identified: {', '.join(top_job_names)} "
+              f"({ranking.jobs_pruned} jobs pruned before full scoring)")
+        
+        # Step 2: Generate detailed analysis with AI insights for top matches only, all jobs at once
+        print(f"Generating AI insights for {len(top_job_names)} matches: {', '.join(top_job_names)}")
+        matches, timings = await self.insights_for_jobs(profile, top_job_names, ranking, mode)
+        timings["scoring_seconds"] = round(scoring_seconds, 3)
+        timings["total_seconds"] = round(time.perf_counter() - start, 3)
+        
+        print(f"Analysis complete for top {top_n} matches in {timings['total_seconds']}s "
+              f"({timings['insights_seconds']}s insights, {timings['serial_seconds']}s if run one by one).")
         
         return {
-            "profile": asdict(profile),
+            "profile": profile.to_dict(),
             "matches": matches,
             "top_match": matches[0] if matches else None,
+            "preferred_career_match": self.preferred_career_match(profile, top_job_names, ranking),
             "total_jobs_considered": len(self.onet_jobs),
+            "catalog_version": self.scoring_engine.catalog_version,
             "jobs_analyzed_with_ai": len(matches),
+            "jobs_pruned": ranking.jobs_pruned,
+            "timings": timings,
             "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
@@ -1042,8 +1111,15 @@ class AICareerMatcher:
         else:
             return f"{primary_descriptor} passionate about creating value and driving meaningful outcomes"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """On shutdown: stop the catalog watcher and close pooled OpenAI connections"""
+    yield
+    ai_matcher.catalog_watcher.stop()
+    await llm.aclose()
+
 # Initialize FastAPI app
-app = FastAPI(title="AI-Enhanced Career Matching API - Top 3 Focus", version="2.1.0")
+app = FastAPI(title="AI-Enhanced Career Matching API - Top 3 Focus", version="2.1.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -1057,12 +1133,21 @@ app.add_middleware(
 # Initialize the AI matcher
 ai_matcher = AICareerMatcher()
 
+@app.middleware("http")
+async def pin_catalog_generation(request, call_next):
+    """Serve each request from one catalog generation, even if a reload swaps in a new one meanwhile"""
+    with ai_matcher.pinned_catalog():
+        return await call_next(request)
+
 cred = credentials.Certificate("./service_acct.json")
 firebase_admin.initialize_app(cred)
 db = firestore.client()
 
 @app.post("/analyze-profile-top3", response_model=AnalysisResponse)
-async def analyze_profile_top_3_matches(request: PersonProfileRequest):
+async def analyze_profile_top_3_matches(
+    request: PersonProfileRequest,
+    insight_mode: Optional[InsightMode] = Query(None, description="sections: one LLM call per section; combined: one structured call per job; batched: one structured call for the top 3 (default: INSIGHT_MODE)")
+):
     """
     MODIFIED ENDPOINT: Analyze a person's profile and return AI insights for only the top 3 job matches
     This is more efficient and focused than analyzing all 15 jobs
@@ -1071,7 +1156,8 @@ async def analyze_profile_top_3_matches(request: PersonProfileRequest):
     data = request.model_dump(mode="json", exclude_none=True)
     data["created_at"] = firestore.SERVER_TIMESTAMP
     ref = db.collection("user").document()
-    ref.set(data, merge=True)
+    # The Firestore client blocks, so write from a thread instead of stalling the event loop
+    await asyncio.to_thread(ref.set, data, merge=True)
     
     
     try:
@@ -1079,7 +1165,7 @@ async def analyze_profile_top_3_matches(request: PersonProfileRequest):
         profile = ai_matcher.create_profile_from_request(request)
         
         # Analyze only top 3 matches with AI insights (more efficient)
-        result = await ai_matcher.analyze_person_with_top_matches(profile, top_n=3)
+        result = await ai_matcher.analyze_person_with_top_matches(profile, top_n=3, mode=insight_mode)
         
         return AnalysisResponse(
             success=True,
@@ -1093,7 +1179,10 @@ async def analyze_profile_top_3_matches(request: PersonProfileRequest):
         raise HTTPException(status_code=500, detail=f"Error analyzing profile: {str(e)}")
 
 @app.post("/analyze-profile-ai", response_model=AnalysisResponse)
-async def analyze_profile_with_ai(request: PersonProfileRequest):
+async def analyze_profile_with_ai(
+    request: PersonProfileRequest,
+    insight_mode: Optional[InsightMode] = Query(None, description="sections, combined or batched (default: INSIGHT_MODE)")
+):
     """
     LEGACY ENDPOINT: Analyze all jobs (kept for backward compatibility)
     WARNING: This analyzes all 15 jobs and may be slower/more expensive
@@ -1102,20 +1191,17 @@ async def analyze_profile_with_ai(request: PersonProfileRequest):
         # Create profile from request
         profile = ai_matcher.create_profile_from_request(request)
         
-        # Analyze all jobs (legacy method - more API calls)
-        matches = []
-        for job_name in ai_matcher.onet_jobs.keys():
-            match_result = ai_matcher.calculate_job_match(profile, job_name)
-            ai_insights = await ai_matcher.generate_ai_insights(profile, job_name, match_result)
-            enhanced_match = {**match_result, **ai_insights}
-            matches.append(enhanced_match)
+        # Analyze all jobs (legacy method - more API calls, run concurrently under the insight cap)
+        matches, timings = await ai_matcher.insights_for_jobs(profile, list(ai_matcher.onet_jobs.keys()),
+                                                              mode=insight_mode)
         
         matches.sort(key=lambda x: x["overall_match"], reverse=True)
         
         result = {
-            "profile": asdict(profile),
+            "profile": profile.to_dict(),
             "matches": matches,
             "top_match": matches[0] if matches else None,
+            "timings": timings,
             "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
@@ -1129,6 +1215,56 @@ async def analyze_profile_with_ai(request: PersonProfileRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing profile: {str(e)}")
 
+@app.post("/analyze-batch", response_model=AnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest[PersonProfileRequest]):
+    """
+    Score many profiles at once (e.g. a whole cohort) without AI insights
+    Returns the top K matches and score breakdowns for each profile, in input order
+    """
+    try:
+        result = ai_matcher.analyze_batch_request(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch input: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing batch: {str(e)}")
+
+    return AnalysisResponse(
+        success=True,
+        message=f"Successfully ranked {result['total_profiles']} profiles",
+        result=result,
+        analysis_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+
+@app.post("/what-if", response_model=AnalysisResponse)
+async def what_if_analysis(request: WhatIfRequest):
+    """
+    Slider support: how do the top matches change if some answers change (e.g. Programming 2 -> 4)?
+    Deltas are added to the answers of the base profile; no AI insights are generated
+    """
+    try:
+        changed_request = ai_matcher.apply_answer_deltas(request.profile, request.deltas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid deltas: {str(e)}")
+
+    try:
+        profile = ai_matcher.create_profile_from_request(request.profile)
+        changed_profile = ai_matcher.create_profile_from_request(changed_request)
+        result = ai_matcher.what_if(profile, changed_profile, request.top_n, request.include_gradient)
+        result["applied_changes"] = {
+            field: {"before": getattr(request.profile, field), "after": getattr(changed_request, field)}
+            for field in request.deltas
+        }
+
+        return AnalysisResponse(
+            success=True,
+            message=f"What-if analysis for {profile.name}: {result['jobs_rescored']} of {result['total_jobs_considered']} jobs re-scored",
+            result=result,
+            analysis_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running what-if analysis: {str(e)}")
+
 @app.get("/quick-match-preview")
 async def get_quick_match_preview(
     name: str,
@@ -1137,11 +1273,13 @@ async def get_quick_match_preview(
     programming: int = 3,
     creative: int = 3,
     working_with_people: int = 3,
-    leadership: int = 3
+    leadership: int = 3,
+    offset: int = Query(0, ge=0)
 ):
     """
     NEW ENDPOINT: Quick preview of top 3 matches without full analysis
     Useful for initial screening before full AI analysis
+    Pass offset=3, 6, ... to page through the next matches
     """
     try:
         # Create minimal profile for quick matching
@@ -1176,11 +1314,13 @@ async def get_quick_match_preview(
         )
         
         # Get top 3 matches quickly (no AI insights)
-        top_jobs = ai_matcher.get_top_job_matches(minimal_profile, 3)
+        # The first page only needs the top 3, later pages come from the full ranking
+        ranking = ai_matcher.rank_jobs(minimal_profile) if offset else ai_matcher.get_top_k(minimal_profile, 3)
+        top_jobs = ranking.page(offset, 3)
         quick_matches = []
         
         for job_name in top_jobs:
-            match_data = ai_matcher.calculate_job_match(minimal_profile, job_name)
+            match_data = ai_matcher.calculate_job_match(minimal_profile, job_name, ranking)
             quick_matches.append({
                 "job_name": job_name,
                 "overall_match": match_data["overall_match"],
@@ -1192,6 +1332,9 @@ async def get_quick_match_preview(
             "success": True,
             "message": f"Quick match preview for {name}",
             "top_matches": quick_matches,
+            "offset": offset,
+            "total_jobs_considered": len(ai_matcher.onet_jobs),
+            "catalog_version": ai_matcher.scoring_engine.catalog_version,
             "note": "This is a preview. Use /analyze-profile-top3 for full AI analysis."
         }
         
@@ -1228,30 +1371,41 @@ async def download_career_report(job_name: str, analysis_data: str):
 @app.post("/generate-job-insights")
 async def generate_specific_job_insights(
     job_name: str,
-    request: PersonProfileRequest
+    request: PersonProfileRequest,
+    insight_mode: Optional[InsightMode] = Query(None, description="sections, combined or batched (default: INSIGHT_MODE)")
 ):
     """
     Generate AI insights for a specific job without full analysis
+    job_name may be typed free text; it is resolved to the closest catalog job
     """
+    try:
+        requested_job_name, job_name = job_name, ai_matcher.resolve_job_name(job_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         profile = ai_matcher.create_profile_from_request(request)
         match_data = ai_matcher.calculate_job_match(profile, job_name)
-        ai_insights = await ai_matcher.generate_ai_insights(profile, job_name, match_data)
+        timings = {}
+        ai_insights = await ai_matcher.generate_ai_insights(profile, job_name, match_data, timings=timings,
+                                                            mode=insight_mode)
         
         return {
             "success": True,
             "job_name": job_name,
+            "requested_job_name": requested_job_name,
             "match_data": match_data,
             "ai_insights": ai_insights,
+            "timings": timings,
+            "insight_mode": insight_mode or ai_matcher.insight_mode,
             "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating job insights: {str(e)}")
 
-@app.get("/")
-async def root():
-    """Root endpoint with API information"""
+def root_info() -> Dict:
+    """API information served by /"""
     return {
         "message": "AI-Enhanced Career Matching API - Top 3 Focus",
         "version": "2.1.0",
@@ -1269,31 +1423,45 @@ async def root():
             "/analyze-profile-top3": "POST - AI analysis of top 3 matches (RECOMMENDED)",
             "/analyze-profile-ai": "POST - Full AI analysis of all jobs (legacy, slower)",
             "/quick-match-preview": "GET - Quick preview without AI insights",
+            "/analyze-batch": "POST - Rank many profiles at once without AI insights",
+            "/what-if": "POST - How top matches change when some answers change",
             "/generate-job-insights": "POST - Generate AI insights for specific job",
             "/download-report/{job_name}": "GET - Download PDF report",
-            "/jobs": "GET - List available job types",
+            "/jobs": "GET - List available job types (filters: interest, skill, group, q; paginated with offset, limit (default 50); facets=1 adds filter counts)",
+            "/jobs/resolve": "GET - Resolve a typed career name to catalog jobs",
+            "/catalog/version": "GET - Live job catalog generation and reload status",
+            "/catalog/diagnostics": "GET - Validation report of the live job catalog (errors and warnings per job)",
             "/health": "GET - Health check"
         },
         "efficiency_note": f"Database contains {len(ai_matcher.onet_jobs)} jobs. Top 3 analysis reduces API calls by ~80%."
     }
 
-@app.get("/jobs")
-async def get_jobs():
-    """Get list of available job types with enhanced details"""
+@app.get("/")
+async def root(request: Request):
+    """Root endpoint with API information"""
+    return ai_matcher.response_cache.respond(request, (ai_matcher.scoring_engine.catalog_version, "/"), root_info)
+
+def jobs_listing(interest: Optional[str], skill: Optional[str], group: Optional[str], q: Optional[str],
+                 offset: int, limit: int, facets: bool = False) -> Dict:
+    """A page of available job types with enhanced details, filtered through the catalog indexes"""
+    index = ai_matcher.catalog_index
+    positions = index.search(interest=interest, skill=skill, group=group, q=q)
     jobs_info = {}
-    for job_name, job_data in ai_matcher.onet_jobs.items():
+    for position in positions[offset:offset + limit]:
+        job_name = index.job_names[position]
         jobs_info[job_name] = {
-            "onet_code": job_data["onet_code"],
-            "required_skills": job_data["required_skills"],
-            "similar_roles": job_data.get("similar_roles", []),
-            "keywords": job_data.get("job_keywords", []),
-            "top_work_values": sorted(job_data["work_values"].items(), key=lambda x: x[1], reverse=True)[:3],
-            "top_interests": sorted(job_data["interests"].items(), key=lambda x: x[1], reverse=True)[:3]
+            **index.summaries[position],
+            "similar_catalog_jobs": ai_matcher.similarity.neighbours(job_name)
         }
     
-    return {
-        "total_jobs": len(ai_matcher.onet_jobs),
-        "available_jobs": list(ai_matcher.onet_jobs.keys()),
+    listing = {
+        "total_jobs": len(index),
+        "matching_jobs": len(positions),
+        "filters": {"interest": interest, "skill": skill, "group": group, "q": q},
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < len(positions) else None,
+        "available_jobs": list(jobs_info.keys()),
         "job_details": jobs_info,
         "ai_features": [
             "Personalized fit analysis",
@@ -1303,6 +1471,43 @@ async def get_jobs():
         ],
         "recommendation": "Use /analyze-profile-top3 for efficient analysis of best matches"
     }
+    if facets:
+        listing["filter_values"] = index.filter_values()
+    return listing
+
+@app.get("/jobs")
+async def get_jobs(request: Request,
+                   interest: Optional[str] = Query(None, description="Top RIASEC interest, e.g. social"),
+                   skill: Optional[str] = Query(None, description="Required skill, e.g. research or Problem Solving"),
+                   group: Optional[str] = Query(None, description="O*NET major group, e.g. 15 or 15-1252.00"),
+                   q: Optional[str] = Query(None, description="Words matching job names and keywords by prefix"),
+                   offset: int = Query(0, ge=0),
+                   limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                   facets: bool = Query(False, description="Also return job counts per group, interest and skill")):
+    """Get a page of available job types with enhanced details, filtered through the catalog indexes"""
+    key = (ai_matcher.scoring_engine.catalog_version, "/jobs", interest, skill, group, q, offset, limit, facets)
+    return ai_matcher.response_cache.respond(
+        request, key, lambda: jobs_listing(interest, skill, group, q, offset, limit, facets))
+
+@app.get("/jobs/resolve")
+async def resolve_job(name: str = Query(..., description="Typed career name, e.g. 'sofware developer'"),
+                      limit: int = Query(5, ge=1, le=20)):
+    """Ranked catalog jobs matching a typed career name, and the one it resolves to if any"""
+    return {
+        "query": name,
+        "resolved": ai_matcher.name_resolver.resolve(name),
+        "candidates": ai_matcher.name_resolver.candidates(name, limit)
+    }
+
+@app.get("/catalog/version")
+async def get_catalog_version():
+    """Which catalog generation is live, and which older ones are still finishing requests"""
+    return ai_matcher.catalog_status()
+
+@app.get("/catalog/diagnostics")
+async def get_catalog_diagnostics():
+    """Validation report of the live catalog: errors, warnings and the jobs they concern"""
+    return ai_matcher.current_state().compiled.report()
 
 @app.get("/health")
 async def health_check():
@@ -1310,11 +1515,8 @@ async def health_check():
     ai_status = "available"
     try:
         # Test OpenAI connection with a minimal request
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": "test"}],
-            max_tokens=1
-        )
+        await llm.complete("test", max_tokens=1, temperature=0, timeout=5, max_retries=0, tag="health",
+                           use_cache=False)
         ai_status = "connected"
     except Exception:
         ai_status = "unavailable"
@@ -1323,6 +1525,16 @@ async def health_check():
         "status": "healthy",
         "ai_service": ai_status,
         "total_jobs_in_database": len(ai_matcher.onet_jobs),
+        "catalog_version": ai_matcher.scoring_engine.catalog_version,
+        "catalog": catalog_info(ai_matcher.onet_jobs),
+        "response_cache": ai_matcher.response_cache.stats(),
+        "memory_footprint": ai_matcher.memory_footprint(),
+        "score_cache": ai_matcher.score_cache.stats(),
+        "top_k_pruning": ai_matcher.scoring_engine.pruning.stats(),
+        "llm_client": llm.stats(),
+        "llm_cache": llm.cache.stats() if llm.cache is not None else None,
+        "insights": {"default_mode": ai_matcher.insight_mode, "concurrency": ai_matcher.insight_concurrency,
+                     "quantization": ai_matcher.quantizer.describe(), "modes": ai_matcher.insight_stats},
         "optimization": "Top 3 matching active",
         "timestamp": datetime.now().isoformat(),
         "version": "2.1.0"
@@ -1335,6 +1547,8 @@ if __name__ == "__main__":
     if not os.getenv('OPENAI_API_KEY'):
         print("Warning: OPENAI_API_KEY environment variable not set!")
     
-    print(f"Starting Career Matcher API with {len(careers.onet_jobs) if 'careers' in globals() else '?'} jobs in database")
+    catalog = catalog_info(ai_matcher.onet_jobs)
+    print(f"Starting Career Matcher API with {catalog['jobs']} jobs in database "
+          f"(catalog {catalog['content_hash']} from {catalog['source']})")
     print("Optimization: AI analysis focuses on top 3 matches for efficiency")
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
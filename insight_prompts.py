@@ -0,0 +1,179 @@
+"""
+Insight prompts of one job's match, as sent to the LLM
+
+Each builder turns a job and the facts MatchQuantizer states about its match (match_quantizer.py) into an
+InsightPrompt: the prompt text plus the sampling settings and response format of its call. Prompts write
+NAME where the student's name goes and LLMClient fills the name into the reply, so students whose matches
+state the same facts send identical requests and share cached replies. formai sends these prompts;
+`python match_quantizer.py replay` hashes the same requests to measure how often they repeat.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from insight_schema import SECTIONS, ActionPlan, InterviewInsights, batch_schema, section_schema
+from llm_cache import placeholder
+from llm_client import DEFAULT_MODEL, json_schema_format, request_key
+
+# Where insight prompts put the student's name
+NAME = placeholder("name")
+
+# What each structured insight section should hold, in the combined and batched prompts
+SECTION_INSTRUCTIONS = {
+    "ai_summary": "a personalized 2-3 paragraph summary of their fit: acknowledge their strengths and natural "
+                  "fit, address gaps constructively, give a realistic outlook on their candidacy and motivate "
+                  "action, in an encouraging, professional tone",
+    "action_plan": "top_needs (3 priority areas) and action_items (4-5 specific, actionable steps) that close "
+                   "the gaps within 3-6 months",
+    "career_story": "a compelling 2-paragraph career story in first person: first how their background and "
+                    "strengths lead naturally to this career, then their vision for growth and impact in the "
+                    "role; authentic, confident and forward-looking",
+    "interview_insights": "key_selling_points (3 main strengths to emphasize), story_examples (3 specific "
+                          "scenarios to prepare) and questions_to_ask (3 thoughtful questions for the interviewer)"
+}
+
+
+@dataclass
+class InsightPrompt:
+    """One insight LLM call: prompt text, sampling settings and response format"""
+    text: str
+    max_tokens: int
+    temperature: float
+    response_format: Optional[Dict] = None
+
+    def key(self, model: str = DEFAULT_MODEL, version: str = "1") -> str:
+        """LLM cache key of this call for any student (see llm_client.request_key)"""
+        return request_key(self.text, {"name": ""}, self.max_tokens, self.temperature, model,
+                           self.response_format, version)
+
+
+def batch_slots(count: int) -> List[str]:
+    """Names of the job slots of a batched prompt"""
+    return [f"job_{i}" for i in range(1, count + 1)]
+
+
+def match_details(facts: Dict) -> str:
+    """Match scores, strengths and gaps of one job for the structured insight prompts"""
+    return f"""
+    - Overall Match: {facts['overall_match']}
+    - Skills Match: {facts['skills_match']}
+    - Values Match: {facts['values_match']}
+    - Interests Match: {facts['interests_match']}
+    - Work Styles Match: {facts['work_styles_match']}
+
+    User Strengths: {', '.join(facts['strengths'])}
+    Current gaps to address:
+    {chr(10).join([f"- {gap}" for gap in facts['gaps']])}
+    """
+
+
+def summary_prompt(job_name: str, facts: Dict) -> InsightPrompt:
+    return InsightPrompt(f"""
+    Create a personalized 2-3 paragraph summary for {NAME} regarding their fit for the {job_name} position.
+
+    Key Information:
+    - Overall Match: {facts['overall_match']}
+    - Skills Match: {facts['skills_match']}
+    - Values Match: {facts['values_match']}
+    - Interests Match: {facts['interests_match']}
+    - Work Styles Match: {facts['work_styles_match']}
+
+    User Strengths: {', '.join(facts['strengths'])}
+    Areas for Improvement: {facts['improvement_count']} key areas identified
+
+    Write in a encouraging, professional tone that:
+    1. Acknowledges their strengths and natural fit
+    2. Addresses any gaps constructively
+    3. Provides realistic outlook on their candidacy
+    4. Motivates action toward career goals
+
+    Keep it concise but insightful.
+    """, max_tokens=400, temperature=0.7)
+
+
+def action_plan_prompt(job_name: str, facts: Dict) -> InsightPrompt:
+    return InsightPrompt(f"""
+    Create a focused action plan for {NAME} to become a competitive candidate for {job_name}.
+
+    Current gaps to address:
+    {chr(10).join([f"- {gap}" for gap in facts['gaps']])}
+
+    Provide:
+    1. Top Needs (3 priority areas)
+    2. Action Items (4-5 specific, actionable steps)
+
+    Make it practical and achievable within 3-6 months.
+    Format as JSON with "top_needs" and "action_items" arrays.
+    """, max_tokens=300, temperature=0.6,
+        response_format=json_schema_format("action_plan", ActionPlan.model_json_schema()))
+
+
+def career_story_prompt(job_name: str, facts: Dict) -> InsightPrompt:
+    return InsightPrompt(f"""
+    Write a compelling 2-paragraph career story for {NAME} pursuing {job_name}.
+
+    Their strengths: {', '.join(facts['strengths'])}
+    Match score: {facts['overall_match']}
+
+    Create a narrative that:
+    1. First paragraph: Connects their background and strengths to this career path naturally
+    2. Second paragraph: Shows vision for their future growth and impact in this role
+
+    Write in first person as if they're telling their story.
+    Be authentic, confident, and forward-looking.
+    """, max_tokens=300, temperature=0.7)
+
+
+def interview_prompt(job_name: str, facts: Dict) -> InsightPrompt:
+    return InsightPrompt(f"""
+    Create interview preparation insights for {NAME} applying for {job_name}.
+
+    Their key strengths: {', '.join(facts['strengths'])}
+
+    Provide:
+    1. Key Selling Points (3 main strengths to emphasize)
+    2. Story Examples (3 specific scenarios they should prepare)
+    3. Questions to Ask (3 thoughtful questions for the interviewer)
+
+    Format as JSON with these three arrays.
+    Make it specific and actionable for interview success.
+    """, max_tokens=350, temperature=0.6,
+        response_format=json_schema_format("interview_insights", InterviewInsights.model_json_schema()))
+
+
+# Section -> prompt of its own call in the four-call insight mode
+SECTION_PROMPTS = {
+    "ai_summary": summary_prompt,
+    "action_plan": action_plan_prompt,
+    "career_story": career_story_prompt,
+    "interview_insights": interview_prompt
+}
+
+
+def combined_prompt(job_name: str, facts: Dict, sections: List[str]) -> InsightPrompt:
+    """One prompt asking for the given sections, with the match data they share stated once"""
+    return InsightPrompt(f"""
+    Create career insights for {NAME} regarding the {job_name} position.
+
+    Key Information:
+    {match_details(facts)}
+
+    Return JSON with these fields:
+    {chr(10).join([f"- {section}: {SECTION_INSTRUCTIONS[section]}" for section in sections])}
+    """, max_tokens=450 * len(sections), temperature=0.6,
+        response_format=json_schema_format("job_insights", section_schema(sections)))
+
+
+def batched_prompt(job_names: List[str], job_facts: List[Dict]) -> InsightPrompt:
+    """One prompt asking for every section of several jobs (slots batch_slots(len(job_names)))"""
+    slots = batch_slots(len(job_names))
+    jobs = "".join(f"""
+    {slot}: {job_name}
+    {match_details(facts)}
+    """ for slot, job_name, facts in zip(slots, job_names, job_facts))
+    return InsightPrompt(f"""
+    Create career insights for {NAME} for each of these {len(job_names)} positions.
+    {jobs}
+    Return JSON with one object per position ({', '.join(slots)}), each with these fields:
+    {chr(10).join([f"- {section}: {SECTION_INSTRUCTIONS[section]}" for section in SECTIONS])}
+    """, max_tokens=1800 * len(slots), temperature=0.6,
+        response_format=json_schema_format("job_insights_batch", batch_schema(slots)))
@@ -0,0 +1,157 @@
+"""
+Pydantic models for the LLM-generated insight sections of one job
+
+The combined insight mode asks for every section of a job in one structured-output call whose JSON schema
+is generated from JobInsights, then validates each section on its own (validate_sections), so a reply with
+one bad section keeps the good ones and only the bad one is re-requested (with section_schema). The
+batched mode asks for several jobs in one call (batch_schema, one JobInsights per job slot) and splits
+the reply back per job (validate_batch). The action plan and interview insights of the four-call mode are
+validated against the same models.
+
+Run `python insight_schema.py` to print the combined schema and check the section validation.
+"""
+import json
+from typing import Annotated, Dict, List, Tuple
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, TypeAdapter, ValidationError
+
+
+def _not_empty(value):
+    if not value or (isinstance(value, str) and not value.strip()):
+        raise ValueError("must not be empty")
+    return value
+
+
+Text = Annotated[str, AfterValidator(_not_empty)]
+Items = Annotated[List[Text], AfterValidator(_not_empty)]
+
+
+class ActionPlan(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    top_needs: Items
+    action_items: Items
+
+
+class InterviewInsights(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    key_selling_points: Items
+    story_examples: Items
+    questions_to_ask: Items
+
+
+class JobInsights(BaseModel):
+    """Every LLM-written section of one job's insights"""
+    model_config = ConfigDict(extra="forbid")
+
+    ai_summary: Text
+    action_plan: ActionPlan
+    career_story: Text
+    interview_insights: InterviewInsights
+
+
+# Section name -> validator for its value, in JobInsights field order
+SECTIONS = {
+    "ai_summary": TypeAdapter(Text),
+    "action_plan": TypeAdapter(ActionPlan),
+    "career_story": TypeAdapter(Text),
+    "interview_insights": TypeAdapter(InterviewInsights)
+}
+
+
+def section_schema(sections: List[str]) -> Dict:
+    """JSON schema of a JobInsights object holding only the given sections, all required"""
+    schema = JobInsights.model_json_schema()
+    schema["properties"] = {name: schema["properties"][name] for name in sections}
+    schema["required"] = list(sections)
+    used = json.dumps(schema["properties"])
+    schema["$defs"] = {name: d for name, d in schema.get("$defs", {}).items() if f'"#/$defs/{name}"' in used}
+    if not schema["$defs"]:
+        del schema["$defs"]
+    return schema
+
+
+def conforms(model, content: str) -> bool:
+    """Whether a reply is JSON that validates against a model"""
+    try:
+        model.model_validate_json(content)
+    except ValidationError:
+        return False
+    return True
+
+
+def batch_schema(slots: List[str]) -> Dict:
+    """JSON schema of an object holding one complete JobInsights per job slot ("job_1", "job_2", ...)"""
+    job_schema = JobInsights.model_json_schema()
+    defs = job_schema.pop("$defs")
+    defs["JobInsights"] = job_schema
+    return {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {slot: {"$ref": "#/$defs/JobInsights"} for slot in slots},
+        "required": list(slots),
+        "$defs": defs
+    }
+
+
+def _parse_object(content: str):
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def validate_sections(content: str, sections: List[str]) -> Tuple[Dict, List[str]]:
+    """
+    Valid sections of a structured reply as plain dicts and strings, and the requested sections that
+    are missing or fail validation (all of them if the reply is not a JSON object)
+    """
+    return validate_section_data(_parse_object(content), sections)
+
+
+def validate_batch(content: str, slots: List[str]) -> Dict[str, Tuple[Dict, List[str]]]:
+    """validate_sections for every job slot of a batched reply"""
+    data = _parse_object(content) or {}
+    return {slot: validate_section_data(data.get(slot), list(SECTIONS)) for slot in slots}
+
+
+def validate_section_data(data, sections: List[str]) -> Tuple[Dict, List[str]]:
+    """Valid sections of one decoded reply object and the sections that failed"""
+    if not isinstance(data, dict):
+        return {}, list(sections)
+
+    valid, failed = {}, []
+    for name in sections:
+        try:
+            value = SECTIONS[name].validate_python(data.get(name))
+        except ValidationError:
+            failed.append(name)
+            continue
+        valid[name] = value.model_dump() if isinstance(value, BaseModel) else value
+    return valid, failed
+
+
+if __name__ == "__main__":
+    print(json.dumps(section_schema(list(SECTIONS)), indent=2))
+    reply = json.dumps({
+        "ai_summary": "A strong fit.",
+        "action_plan": {"top_needs": ["Statistics"], "action_items": []},
+        "career_story": "My story.",
+        "interview_insights": {"key_selling_points": ["Analysis"], "story_examples": ["A project"],
+                               "questions_to_ask": ["What does success look like?"], "extra": 1}
+    })
+    valid, failed = validate_sections(reply, list(SECTIONS))
+    assert sorted(valid) == ["ai_summary", "career_story"], valid
+    assert failed == ["action_plan", "interview_insights"], failed
+    assert validate_sections("not json", ["ai_summary"]) == ({}, ["ai_summary"])
+    assert section_schema(["career_story"])["required"] == ["career_story"]
+    good = json.loads(reply)
+    good["action_plan"]["action_items"] = ["Take a course"]
+    del good["interview_insights"]["extra"]
+    split = validate_batch(json.dumps({"job_1": good, "job_2": {"ai_summary": ""}}), ["job_1", "job_2"])
+    assert split["job_1"] == (good, []), split["job_1"]
+    assert split["job_2"] == ({}, list(SECTIONS)), split["job_2"]
+    assert batch_schema(["job_1"])["properties"]["job_1"] == {"$ref": "#/$defs/JobInsights"}
+    print("Section and batch validation keep valid sections and report the failed ones")
@@ -2,21 +2,15 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 import json
-from dataclasses import dataclass
+import os
 from datetime import datetime
+from catalog_compiler import compile_catalog
+from scoring import DEFAULT_BACKEND, CourseMatcher, Profile, ScoringEngine
 
-@dataclass
-class PersonProfile:
-    name: str
-    email: str
-    university: str
-    personality: Dict[str, float]
-    work_values: Dict[str, float]
-    skills: Dict[str, float]
-    interests: List[str]
-    preferred_career: str
+# Slotted profile with fixed dimension order; dicts are built only for prompts, reports and responses
+PersonProfile = Profile
 
-class CareerMatcher:
+class CareerMatcher(CourseMatcher):
     def __init__(self):
         # O*NET Job Database with detailed metrics including Work Styles
         self.onet_jobs = {
@@ -439,6 +433,13 @@ class CareerMatcher:
             }
         }
 
+        # Shared scoring core, same rankings as the API matchers, over jobs validated and compiled once
+        compiled = compile_catalog(self.onet_jobs)
+        if compiled.diagnostics:
+            print(f"Catalog: {compiled.summary()}")
+        self.scoring_engine = ScoringEngine(self.onet_jobs, backend=os.getenv("SCORING_BACKEND", DEFAULT_BACKEND),
+                                            jobs=compiled.jobs)
+
     def parse_csv_row(self, row: pd.Series) -> PersonProfile:
         """Parse a CSV row into a PersonProfile object"""
         try:
@@ -533,177 +534,6 @@ class CareerMatcher:
         except:
             return 3
 
-    def calculate_job_match(self, profile: PersonProfile, job_name: str) -> Dict:
-        """Calculate comprehensive match percentage and details for a specific job"""
-        job = self.onet_jobs[job_name]
-        
-        # Skills match (30% weight)
-        skills_score = self._calculate_skills_match(profile.skills, job["skills"])
-        
-        # Work values match (25% weight)
-        values_score = self._calculate_values_match(profile.work_values, job["work_values"])
-        
-        # Interests match (20% weight)
-        interests_score = self._calculate_interests_match(profile.interests, job["interests"])
-        
-        # Work styles match (25% weight) - NEW
-        work_styles_score = self._calculate_work_styles_match(profile.personality, job.get("work_styles", {}))
-        
-        # Overall match
-        overall_match = (skills_score * 0.3 + values_score * 0.25 + 
-                        interests_score * 0.2 + work_styles_score * 0.25) * 100
-        
-        # Identify strengths and improvement areas with course recommendations
-        strengths, improvements = self._identify_strengths_improvements(profile, job)
-        
-        # Generate interview preparation
-        interview_prep = self._generate_interview_preparation(profile, job)
-        
-        return {
-            "job_name": job_name,
-            "onet_code": job["onet_code"],
-            "overall_match": round(overall_match, 1),
-            "breakdown": {
-                "skills_match": round(skills_score * 100, 1),
-                "values_match": round(values_score * 100, 1),
-                "interests_match": round(interests_score * 100, 1),
-                "work_styles_match": round(work_styles_score * 100, 1)
-            },
-            "strengths": strengths,
-            "improvements": improvements,
-            "interview_preparation": interview_prep,
-            "required_skills": job["required_skills"]
-        }
-
-    def _calculate_skills_match(self, user_skills: Dict, job_skills: Dict) -> float:
-        """Calculate skills compatibility score"""
-        scores = []
-        
-        for skill, importance in job_skills.items():
-            user_level = user_skills.get(skill, 2.5)  # Default if skill not found
-            
-            # Normalize both to 0-1 scale
-            normalized_importance = importance / 5.0
-            normalized_user = user_level / 5.0
-            
-            # Calculate match (penalize being too far below requirement)
-            if normalized_user >= normalized_importance:
-                score = 1.0
-            else:
-                # Penalty increases as gap widens
-                gap = normalized_importance - normalized_user
-                score = max(0, 1 - (gap * 2))
-            
-            scores.append(score * normalized_importance)  # Weight by importance
-        
-        return sum(scores) / sum(job_skills.values()) * 5 if scores else 0
-
-    def _calculate_values_match(self, user_values: Dict, job_values: Dict) -> float:
-        """Calculate work values compatibility"""
-        scores = []
-        
-        for value, job_importance in job_values.items():
-            user_importance = user_values.get(value, 3.5)
-            
-            # Normalize to 0-1
-            norm_job = job_importance / 5.0
-            norm_user = user_importance / 6.0  # User values are 1-6 scale
-            
-            # Calculate similarity (closer values = higher score)
-            difference = abs(norm_job - norm_user)
-            similarity = 1 - difference
-            
-            scores.append(similarity * norm_job)  # Weight by job importance
-        
-        return sum(scores) / sum(job_values.values()) * 5 if scores else 0
-
-    def _calculate_interests_match(self, user_interests: List[str], job_interests: Dict) -> float:
-        """Calculate interests compatibility"""
-        if not user_interests:
-            return 0.5  # Neutral if no interests specified
-        
-        total_score = 0
-        max_possible = 0
-        
-        for interest, importance in job_interests.items():
-            max_possible += importance
-            if interest in user_interests:
-                total_score += importance
-        
-        return (total_score / max_possible) if max_possible > 0 else 0
-
-    def _calculate_work_styles_match(self, personality: Dict, job_work_styles: Dict) -> float:
-        """Calculate work styles compatibility based on personality traits"""
-        if not job_work_styles:
-            return 0.5
-        
-        # Map personality traits to work styles
-        personality_to_work_style = {
-            "analytical_thinking": personality.get("openness", 3),
-            "attention_to_detail": personality.get("conscientiousness", 3),
-            "dependability": personality.get("conscientiousness", 3),
-            "leadership": personality.get("extraversion", 3),
-            "stress_tolerance": 5 - personality.get("neuroticism", 3),  # Inverse
-            "adaptability": personality.get("openness", 3),
-            "social_orientation": personality.get("extraversion", 3),
-            "achievement": personality.get("conscientiousness", 3),
-            "initiative": personality.get("extraversion", 3),
-            "persistence": personality.get("conscientiousness", 3),
-            "concern_for_others": personality.get("agreeableness", 3),
-            "cooperation": personality.get("agreeableness", 3)
-        }
-        
-        scores = []
-        for style, importance in job_work_styles.items():
-            user_level = personality_to_work_style.get(style, 3.0)
-            
-            # Normalize and calculate match
-            norm_importance = importance / 5.0
-            norm_user = user_level / 5.0
-            
-            # Calculate compatibility
-            if norm_user >= norm_importance * 0.8:  # 80% threshold
-                score = 1.0
-            else:
-                gap = (norm_importance * 0.8) - norm_user
-                score = max(0, 1 - (gap * 2))
-            
-            scores.append(score * norm_importance)
-        
-        return sum(scores) / sum(job_work_styles.values()) * 5 if scores else 0
-
-    def _identify_strengths_improvements(self, profile: PersonProfile, job: Dict) -> Tuple[List[str], List[Dict]]:
-        """Identify user strengths and areas for improvement with course recommendations"""
-        strengths = []
-        improvements = []
-        
-        # Check skills against job requirements
-        for skill_name in job["required_skills"]:
-            skill_key = self.skill_mapping.get(skill_name, skill_name.lower().replace(' ', '_'))
-            user_level = profile.skills.get(skill_key, 2.5)
-            job_requirement = job["skills"].get(skill_key, 3.5)
-            
-            if user_level >= job_requirement:
-                strengths.append(f"Strong {skill_name} skills (Level {user_level}/5)")
-            elif user_level < job_requirement - 0.5:
-                # Get course recommendations
-                courses = self.course_recommendations.get(skill_name, {
-                    "free": [{"name": f"Search for free {skill_name} courses", "url": "https://www.coursera.org/", "provider": "Various"}],
-                    "paid": [{"name": f"Search for {skill_name} courses", "url": "https://www.udemy.com/", "provider": "Udemy"}]
-                })
-                
-                improvements.append({
-                    "skill": skill_name,
-                    "current_level": user_level,
-                    "required_level": job_requirement,
-                    "gap_severity": "High" if job_requirement - user_level > 1.5 else "Medium",
-                    "free_courses": courses.get("free", []),
-                    "paid_courses": courses.get("paid", []),
-                    "improvement_tip": job.get("improvement_tips", {}).get(skill_name, f"Develop {skill_name} skills through practice and training")
-                })
-        
-        return strengths, improvements
-
     def _generate_interview_preparation(self, profile: PersonProfile, job: Dict) -> Dict:
         """Generate interview preparation based on profile and job match"""
         prep_data = {
@@ -753,24 +583,6 @@ class CareerMatcher:
         
         return prep_data
 
-    def analyze_person(self, profile: PersonProfile) -> Dict:
-        """Analyze a person against all jobs and return ranked matches"""
-        matches = []
-        
-        for job_name in self.onet_jobs.keys():
-            match_result = self.calculate_job_match(profile, job_name)
-            matches.append(match_result)
-        
-        # Sort by overall match percentage
-        matches.sort(key=lambda x: x["overall_match"], reverse=True)
-        
-        return {
-            "profile": profile,
-            "matches": matches,
-            "top_match": matches[0] if matches else None,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-
     def process_csv_file(self, csv_path: str) -> List[Dict]:
         """Process entire CSV file and return analysis for all people"""
         try:
@@ -0,0 +1,247 @@
+"""
+Persistent content-addressed cache of LLM completions
+
+Two students with the same match data for a job get the same insight prompt apart from their name.
+Prompt builders write a placeholder where a personal identifier goes ("{{name}}", see placeholder), so
+such prompts are identical; LLMCache stores the completion in SQLite under a hash of the normalized
+prompt, model, sampling settings, response format and a prompt template version, and LLMClient fills the
+next student's identifiers into the placeholders after retrieval (fill_in). Entries expire after a TTL,
+the least recently used are evicted beyond max_entries, and entries are tagged with the catalog jobs their
+prompt describes, so a catalog reload drops the entries of changed jobs (invalidate_jobs). The file is
+shared by every worker on the host (WAL mode) and survives restarts. The cache is opt-in: set
+LLM_CACHE_PATH to the file to use.
+
+Usage: python llm_cache.py check | stats PATH | purge PATH
+check verifies fill-in, TTL, eviction and job invalidation on a temporary cache file.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+def placeholder(field: str) -> str:
+    return "{{" + field + "}}"
+
+
+def fill_in(text: str, identifiers: Dict[str, str], json_content: bool = False) -> str:
+    """text with placeholders replaced by identifier values (escaped for JSON string content if json_content)"""
+    for field, value in identifiers.items():
+        if value and value.strip():
+            value = value.strip()
+            text = text.replace(placeholder(field), json.dumps(value)[1:-1] if json_content else value)
+    return text
+
+
+def cache_key(prompt: str, model: str, temperature: float, max_tokens: int, response_format: Optional[Dict],
+              version: str) -> str:
+    """Hash of a templated prompt with runs of whitespace collapsed, plus everything else that shapes the reply"""
+    normalized = " ".join(prompt.split())
+    material = json.dumps([version, model, temperature, max_tokens, response_format, normalized], sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class LLMCache:
+    """SQLite store of templated completions with TTL, LRU size eviction, job tags and hit counters"""
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 50000, version: str = "1"):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Part of every key: bump it when prompt templates or reply post-processing change
+        self.version = version
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, content TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL,
+                seconds REAL NOT NULL DEFAULT 0, hits INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS entry_jobs (key TEXT NOT NULL, job TEXT NOT NULL, PRIMARY KEY (key, job));
+            CREATE INDEX IF NOT EXISTS entry_jobs_job ON entry_jobs (job);
+        """)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidated = 0
+        # Seconds of LLM calls the hits avoided, from the duration recorded with each stored reply
+        self.seconds_saved = 0.0
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMCache"]:
+        """Cache configured by LLM_CACHE_PATH (unset or empty: no cache), LLM_CACHE_TTL and LLM_CACHE_MAX_ENTRIES"""
+        path = os.getenv("LLM_CACHE_PATH", "")
+        if not path:
+            return None
+        return cls(path, ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                   max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000")),
+                   version=os.getenv("LLM_CACHE_VERSION", "1"))
+
+    def get(self, key: str) -> Optional[str]:
+        """Stored templated completion, or None if missing or older than the TTL"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT content, created, seconds FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._delete([key])
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.hits += 1
+            self.seconds_saved += row[2]
+            return row[0]
+
+    def put(self, key: str, content: str, jobs: Iterable[str] = (), seconds: float = 0.0):
+        """Store a templated completion, tagged with the catalog jobs its prompt describes"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO entries (key, content, created, last_used, seconds) "
+                                 "VALUES (?, ?, ?, ?, ?)", (key, content, now, now, seconds))
+                self._db.executemany("INSERT OR IGNORE INTO entry_jobs (key, job) VALUES (?, ?)",
+                                     [(key, job) for job in jobs])
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            self.stores += 1
+            # Evict in chunks, so a full cache does not run a DELETE on every store
+            if self.stores % 100 == 1:
+                self._evict(now)
+
+    def _delete(self, keys: List[str]):
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            self._db.execute(f"DELETE FROM entries WHERE key IN ({marks})", chunk)
+            self._db.execute(f"DELETE FROM entry_jobs WHERE key IN ({marks})", chunk)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        expired = [row[0] for row in self._db.execute("SELECT key FROM entries WHERE created < ?", (now - self.ttl,))]
+        self._delete(expired)
+        self.expired += len(expired)
+        excess = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            oldest = [row[0] for row in self._db.execute(
+                "SELECT key FROM entries ORDER BY last_used LIMIT ?", (excess,))]
+            self._delete(oldest)
+            self.evicted += len(oldest)
+
+    def evict(self):
+        with self._lock:
+            self._evict(time.time())
+
+    def invalidate_jobs(self, jobs: Iterable[str]) -> int:
+        """Drop every entry whose prompt describes one of jobs (the changed jobs of a catalog reload)"""
+        jobs = list(jobs)
+        if not jobs:
+            return 0
+        with self._lock:
+            marks = ",".join("?" * len(jobs))
+            keys = [row[0] for row in self._db.execute(
+                f"SELECT DISTINCT key FROM entry_jobs WHERE job IN ({marks})", jobs)]
+            self._delete(keys)
+            self.invalidated += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM entry_jobs")
+
+    def stats(self) -> Dict:
+        """Hit rate and eviction counters of this process, plus the shared file's size, for /health"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        try:
+            size = os.path.getsize(self.path) + os.path.getsize(self.path + "-wal")
+        except OSError:
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "file_mb": round(size / 1e6, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "stores": self.stores,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "invalidated": self.invalidated,
+            "llm_seconds_saved": round(self.seconds_saved, 1)
+        }
+
+    def close(self):
+        self._db.close()
+
+
+def check() -> List[str]:
+    """Round trips through a temporary cache file"""
+    problems = []
+    templated = "Create a plan for {{name}} to become a Registered Nurse. {{name}} has strong empathy."
+    if fill_in(templated, {"name": "Nurse"}) != "Create a plan for Nurse to become a Registered Nurse. Nurse has strong empathy.":
+        problems.append("filling in a placeholder did not restore the identifier")
+    if fill_in('{"story": "I am {{name}}"}', {"name": 'Zoe "Z" Li'}, json_content=True) != '{"story": "I am Zoe \\"Z\\" Li"}':
+        problems.append("identifiers are not JSON-escaped in JSON content")
+    if fill_in("{{name}} fits", {"name": "Al"}) != "Al fits":
+        problems.append("short values were not filled in")
+    if cache_key("a  b\n c", "m", 0.5, 10, None, "1") != cache_key("a b c", "m", 0.5, 10, None, "1"):
+        problems.append("whitespace changes the key")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LLMCache(os.path.join(directory, "cache.sqlite3"), ttl=60, max_entries=5)
+        cache.put("a", "reply a", jobs=["Nurse"], seconds=1.5)
+        cache.put("b", "reply b", jobs=["Nurse", "Plumber"])
+        if cache.get("a") != "reply a" or cache.get("missing") is not None:
+            problems.append("get does not return stored replies")
+        if cache.seconds_saved != 1.5:
+            problems.append(f"hit saved {cache.seconds_saved}s, expected the 1.5s recorded with the reply")
+        if cache.invalidate_jobs(["Plumber"]) != 1 or cache.get("b") is not None or cache.get("a") is None:
+            problems.append("invalidating a job did not drop exactly its entries")
+        for i in range(10):
+            cache.put(f"k{i}", "reply")
+        cache.evict()
+        if cache.stats()["entries"] != 5:
+            problems.append(f"{cache.stats()['entries']} entries after eviction, expected 5")
+        cache.ttl = -1
+        if cache.get("k9") is not None:
+            problems.append("expired entry was returned")
+        reopened = LLMCache(cache.path)
+        if reopened.get("k8") != "reply":
+            problems.append("entries did not persist across connections")
+        reopened.close()
+        cache.close()
+    return problems
+
+
+if __name__ == "__main__":
+    command, path = (sys.argv[1:] + [None, None])[:2]
+    if command == "check":
+        issues = check()
+        if issues:
+            print("\n".join(issues))
+            raise SystemExit(1)
+        print("Fill-in, TTL, eviction and job invalidation work")
+    elif command in ("stats", "purge") and (path or os.getenv("LLM_CACHE_PATH")):
+        cache = LLMCache(path or os.getenv("LLM_CACHE_PATH"))
+        if command == "purge":
+            cache.clear()
+        print(json.dumps(cache.stats(), indent=2))
+    else:
+        raise SystemExit(__doc__)
@@ -0,0 +1,219 @@
+"""
+Async OpenAI client for the insight generators
+
+LLMClient wraps one AsyncOpenAI client per process over a pooled HTTP connection pool (HTTP/2 when the h2
+package is installed), so insight calls await on the event loop instead of blocking the worker: while one
+user's insights are generated, the same worker keeps serving other requests. Pool size, keep-alive,
+HTTP/2 and timeouts come from the environment:
+
+    OPENAI_MAX_CONNECTIONS        connections to the API at most (default 20)
+    OPENAI_KEEPALIVE_CONNECTIONS  idle connections kept open for reuse (10)
+    OPENAI_KEEPALIVE_EXPIRY       seconds an idle connection stays open (30)
+    OPENAI_HTTP2                  1 to multiplex calls over HTTP/2, 0 for HTTP/1.1 (1)
+    OPENAI_TIMEOUT                default per-call timeout in seconds (30)
+    OPENAI_CONNECT_TIMEOUT        connect timeout in seconds (5)
+    OPENAI_MAX_RETRIES            retries on connection errors, 429s and 5xx (2)
+
+OPENAI_API_KEY and OPENAI_BASE_URL are read by the OpenAI SDK itself. Calls are counted per tag (calls,
+failures, seconds, prompt and completion tokens, cache hits, unshareable replies), so insight modes can be
+compared on live traffic. Prompts write "{{name}}" where a personal identifier goes and pass its value to complete(), which
+fills it into the reply; completions are served from and stored in the persistent LLMCache (llm_cache.py,
+opt-in with LLM_CACHE_PATH).
+"""
+import os
+import re
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import httpx
+from openai import APITimeoutError, AsyncOpenAI, DefaultAsyncHttpxClient
+
+from llm_cache import LLMCache, cache_key, fill_in, placeholder
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+def json_schema_format(name: str, schema: Dict) -> Dict:
+    """response_format asking for structured output that conforms to a JSON schema"""
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": True}}
+
+
+def sent_prompt(prompt: str, values: Dict[str, str]) -> str:
+    """prompt as sent: placeholders it contains are to be copied verbatim into the reply"""
+    fields = ", ".join(placeholder(field) for field in values if placeholder(field) in prompt)
+    if not fields:
+        return prompt
+    return prompt + f"\nWrite {fields} verbatim wherever you would write the value it stands for."
+
+
+def request_key(prompt: str, values: Dict[str, str], max_tokens: int, temperature: float,
+                model: str = DEFAULT_MODEL, response_format: Optional[Dict] = None, version: str = "1") -> str:
+    """LLM cache key of a complete() call: the same for every user whose prompt differs only in values"""
+    return cache_key(sent_prompt(prompt, values), model, temperature, max_tokens, response_format, version)
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+PERCENTAGE_PATTERN = re.compile(r"\d+(?:\.\d+)?(?:\s*[-\u2013]\s*\d+(?:\.\d+)?)?\s*%")
+
+
+def percentages(text: str) -> set:
+    """Percentages and percentage ranges stated in text, normalized ("70 \u2013 80 %" -> "70-80%")"""
+    return {re.sub(r"\s", "", found).replace("\u2013", "-") for found in PERCENTAGE_PATTERN.findall(text)}
+
+
+def shareable(reply: str, sent: str, values: Dict[str, str]) -> bool:
+    """
+    Whether a reply holds for every user sending this prompt: it writes no placeholder it was not given and
+    states no percentage the prompt does not (such as a guessed exact score, or "75%" for a 70-80% band)
+    """
+    return set(PLACEHOLDER_PATTERN.findall(reply)) <= set(values) and percentages(reply) <= percentages(sent)
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class LLMClient:
+    """Pooled AsyncOpenAI chat completions with per-call timeouts and call counters"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, max_connections: int = 20,
+                 keepalive_connections: int = 10, keepalive_expiry: float = 30.0, http2: bool = True,
+                 timeout: float = 30.0, connect_timeout: float = 5.0, max_retries: int = 2,
+                 cache: Optional[LLMCache] = None):
+        if http2 and not http2_available():
+            print("Warning: h2 is not installed, OpenAI calls use HTTP/1.1 (pip install h2)")
+            http2 = False
+        self.http2 = http2
+        self.timeout = timeout
+        self.max_connections = max_connections
+        http_client = DefaultAsyncHttpxClient(
+            http2=http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=keepalive_connections,
+                                keepalive_expiry=keepalive_expiry),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout)
+        )
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client,
+                                  max_retries=max_retries)
+        self.cache = cache
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_seconds = 0.0
+        # tag -> calls, failures, seconds and token usage of the calls made under it
+        self.by_tag: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_env(cls) -> "LLMClient":
+        return cls(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+            keepalive_connections=int(os.getenv("OPENAI_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30")),
+            http2=os.getenv("OPENAI_HTTP2", "1") == "1",
+            timeout=float(os.getenv("OPENAI_TIMEOUT", "30")),
+            connect_timeout=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5")),
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+            cache=LLMCache.from_env()
+        )
+
+    async def complete(self, prompt: str, max_tokens: int, temperature: float, model: str = DEFAULT_MODEL,
+                       timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                       response_format: Optional[Dict] = None, tag: str = "default",
+                       values: Optional[Dict[str, str]] = None, jobs: Iterable[str] = (),
+                       valid: Optional[Callable[[str], bool]] = None, use_cache: bool = True) -> str:
+        """
+        Text of one chat completion for a single user prompt
+        timeout (seconds) and max_retries override the client defaults for this call; response_format is
+        passed through (see json_schema_format); errors propagate. The call is counted under tag.
+        values ({"name": "Alice"}) are filled into the placeholders the prompt writes ("{{name}}") and the
+        reply copies, so the cache serves the same reply to every user with an otherwise identical prompt.
+        A reply that is not shareable (see shareable) is re-requested once and, if the second one is not
+        either, returned uncached; replies are cached tagged with jobs, and only if valid(reply) holds when
+        valid is given
+        """
+        identifiers = values or {}
+        sent = sent_prompt(prompt, identifiers)
+        json_content = response_format is not None
+        counters = self.by_tag.setdefault(tag, {"calls": 0, "failures": 0, "seconds": 0.0, "prompt_tokens": 0,
+                                                "completion_tokens": 0, "cache_hits": 0, "unshareable": 0})
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            key = request_key(prompt, identifiers, max_tokens, temperature, model, response_format, cache.version)
+            cached = cache.get(key)
+            if cached is not None:
+                counters["cache_hits"] += 1
+                return fill_in(cached, identifiers, json_content)
+
+        client = self.client if max_retries is None else self.client.with_options(max_retries=max_retries)
+        request = {"model": model, "messages": [{"role": "user", "content": sent}], "max_tokens": max_tokens,
+                   "temperature": temperature, "timeout": self.timeout if timeout is None else timeout}
+        if response_format is not None:
+            request["response_format"] = response_format
+        start = time.perf_counter()
+        for attempt in range(2):
+            content = await self._create(client, request, counters)
+            if shareable(content, sent, identifiers):
+                break
+            counters["unshareable"] += 1
+        else:
+            return fill_in(content, identifiers, json_content)
+        if cache is not None and content and (valid is None or valid(content)):
+            cache.put(key, content, jobs, time.perf_counter() - start)
+        return fill_in(content, identifiers, json_content)
+
+    async def _create(self, client: AsyncOpenAI, request: Dict, counters: Dict) -> str:
+        """Content of one chat completion call, counted in the client totals and counters"""
+        self.calls += 1
+        counters["calls"] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(**request)
+            if response.usage is not None:
+                counters["prompt_tokens"] += response.usage.prompt_tokens
+                counters["completion_tokens"] += response.usage.completion_tokens
+            return (response.choices[0].message.content or "").strip()
+        except APITimeoutError:
+            self.timeouts += 1
+            self.failures += 1
+            counters["failures"] += 1
+            raise
+        except Exception:
+            self.failures += 1
+            counters["failures"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight -= 1
+            self.total_seconds += elapsed
+            counters["seconds"] += elapsed
+
+    def stats(self) -> Dict:
+        """Call counters and pool settings for /health"""
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "mean_seconds": round(self.total_seconds / self.calls, 3) if self.calls else None,
+            "max_connections": self.max_connections,
+            "http2": self.http2,
+            "timeout_seconds": self.timeout,
+            "by_tag": {tag: {**counters, "seconds": round(counters["seconds"], 3),
+                             "mean_seconds": round(counters["seconds"] / counters["calls"], 3) if counters["calls"] else None}
+                       for tag, counters in self.by_tag.items()}
+        }
+
+    async def aclose(self):
+        await self.client.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,185 @@
+"""
+Concurrency load test for the LLM-backed endpoints of formai.py
+
+Times one request on its own, then fires concurrent requests at a running API. With blocking OpenAI calls
+a worker serves one insight request at a time, so the batch takes about requests x the single-request time
+(speedup ~1x); with the async client, requests in flight overlap (speedup ~concurrency).
+
+To test without spending tokens, run a fake OpenAI upstream with a fixed latency and point the API at it:
+
+    python load_test.py upstream --port 8100 --latency 0.5
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=test uvicorn formai:app --port 8000
+    python load_test.py run --url http://localhost:8000 --requests 20 --concurrency 10
+
+run loads /generate-job-insights and /analyze-profile-top3 in turn unless --endpoint is given (repeatable).
+/analyze-profile-top3 also writes the profile to Firestore, so it shows any blocking call left in the endpoint.
+
+Compare insight modes with --insight-mode sections|combined|batched; the API's /health reports token usage and
+latency per call tag (llm_client.by_tag) and validation failures per mode (insights.modes).
+
+Usage: python load_test.py upstream [--port N] [--latency S] [--invalid-rate P]
+       | run [--url U] [--requests N] [--concurrency N] [--endpoint PATH ...] [--insight-mode MODE]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+import careers
+from scoring import INTERESTS, PERSONALITY_TRAITS, PROFILE_SKILLS, WORK_VALUES
+
+# Completion text the fake upstream returns: valid JSON, so the action plan and interview parsers succeed
+UPSTREAM_CONTENT = json.dumps({
+    "top_needs": ["Statistics", "Portfolio", "Networking"],
+    "action_items": ["Take a course", "Build a project", "Find a mentor", "Practice interviews"],
+    "key_selling_points": ["Analysis", "Communication", "Curiosity"],
+    "story_examples": ["A hard problem", "A team project", "A fast learning curve"],
+    "questions_to_ask": ["What does success look like?", "What slows the team down?", "How is work reviewed?"]
+})
+
+# Endpoints run loads by default: one insight call per request, and the top-3 analysis with its Firestore write
+DEFAULT_ENDPOINTS = ["/generate-job-insights", "/analyze-profile-top3"]
+
+
+def schema_content(schema: Dict, node: Dict, rng: random.Random, invalid_rate: float):
+    """A value conforming to a JSON schema node; each top-level section is emptied with probability invalid_rate"""
+    if "$ref" in node:
+        node = schema["$defs"][node["$ref"].rsplit("/", 1)[-1]]
+    if node.get("type") == "object":
+        value = {key: schema_content(schema, child, rng, 0) for key, child in node["properties"].items()}
+        if node is schema:
+            value = {key: ("" if isinstance(v, str) else {k: [] for k in v}) if rng.random() < invalid_rate else v
+                     for key, v in value.items()}
+        return value
+    if node.get("type") == "array":
+        return [schema_content(schema, node["items"], rng, 0) for _ in range(3)]
+    return "Generated text"
+
+
+def upstream_app(latency: float, invalid_rate: float = 0.0):
+    """
+    OpenAI-compatible /v1/chat/completions that answers every call after latency seconds
+    Calls with a json_schema response_format get an object of that schema, with each section invalid
+    (emptied) with probability invalid_rate; usage counts roughly 4 characters per token
+    """
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    state = {"in_flight": 0, "peak_in_flight": 0, "calls": 0}
+    rng = random.Random(0)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: Dict):
+        state["calls"] += 1
+        state["in_flight"] += 1
+        state["peak_in_flight"] = max(state["peak_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            state["in_flight"] -= 1
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            content = json.dumps(schema_content(schema, schema, rng, invalid_rate))
+        else:
+            content = UPSTREAM_CONTENT
+        prompt_tokens = sum(len(m["content"]) for m in body.get("messages", [])) // 4
+        return {
+            "id": f"chatcmpl-{state['calls']}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4}
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return state
+
+    return app
+
+
+def request_payloads(count: int, seed: int = 0) -> List[Dict]:
+    """Distinct PersonProfileRequest bodies, so no request is answered from a cache"""
+    rng = random.Random(seed)
+    return [{
+        "name": f"Student {i}", "email": f"student{i}@example.edu", "university": "Example University",
+        "preferred_career": rng.choice(list(careers.onet_jobs)), "updates": False,
+        **{trait: rng.randint(1, 5) for trait in PERSONALITY_TRAITS},
+        **{f"{value}_importance": rank for value, rank in zip(WORK_VALUES, rng.sample(range(1, 7), 6))},
+        **{skill: rng.randint(1, 5) for skill in PROFILE_SKILLS},
+        "interests": rng.sample(INTERESTS, rng.randint(1, 3))
+    } for i in range(count)]
+
+
+async def run(url: str, endpoint: str, requests: int, concurrency: int, insight_mode: Optional[str] = None) -> Dict:
+    """One request alone, then requests with at most concurrency in flight: latencies, wall time and speedup"""
+    payloads = request_payloads(requests)
+    jobs = list(careers.onet_jobs)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], []
+
+    async with httpx.AsyncClient(base_url=url, timeout=300,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(i: int, payload: Dict):
+            params = {"job_name": jobs[i % len(jobs)]} if endpoint == "/generate-job-insights" else {}
+            if insight_mode:
+                params["insight_mode"] = insight_mode
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(endpoint, params=params, json=payload)
+                latencies.append(time.perf_counter() - start)
+                statuses.append(response.status_code)
+
+        await one(0, payloads[0])
+        single = latencies.pop()
+        statuses.pop()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i, payload) for i, payload in enumerate(payloads)))
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "insight_mode": insight_mode,
+        "ok": statuses.count(200),
+        "single_request_seconds": round(single, 2),
+        "wall_seconds": round(wall, 2),
+        "mean_seconds": round(statistics.mean(latencies), 2),
+        "p95_seconds": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        # Time the requests would take one after another over the time they took: ~1 when served serially
+        "speedup": round(requests * single / wall, 1)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrency load test for the LLM-backed endpoints")
+    parser.add_argument("command", choices=["upstream", "run"])
+    parser.add_argument("--port", type=int, default=8100, help="upstream: port to listen on")
+    parser.add_argument("--latency", type=float, default=0.5, help="upstream: seconds per completion")
+    parser.add_argument("--invalid-rate", type=float, default=0.0,
+                        help="upstream: probability that a structured reply section is invalid")
+    parser.add_argument("--insight-mode", choices=["sections", "combined", "batched"],
+                        help="run: insight mode to request")
+    parser.add_argument("--url", default="http://localhost:8000", help="run: API base URL")
+    parser.add_argument("--endpoint", action="append", dest="endpoints", default=None,
+                        help="run: POST endpoint to load (repeatable)")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "upstream":
+        import uvicorn
+
+        uvicorn.run(upstream_app(args.latency, args.invalid_rate), host="127.0.0.1", port=args.port, log_level="warning")
+    else:
+        results = {endpoint: asyncio.run(run(args.url, endpoint, args.requests, args.concurrency, args.insight_mode))
+                   for endpoint in args.endpoints or DEFAULT_ENDPOINTS}
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,156 @@
+"""
+Quantized match data for insight prompts, so near-identical profiles share cached insights
+
+Insight prompts quoted overall_match and the breakdown percentages to the decimal place and every skill
+gap to a tenth of a point, so two students who differ only there got different prompts and never shared
+an LLM cache entry (llm_cache.py). MatchQuantizer turns match data into the facts the prompts state:
+score bands ("70-80%"), the job's strengths and the top gap skills with a severity band ("1-2 points").
+Exact scores never reach the LLM text: responses carry them in the match data beside the insights, and
+LLMClient re-requests a reply stating a percentage its prompt does not and never caches one
+(llm_client.shareable). Profiles in the same bucket for the same job therefore send identical
+prompts (insight_prompts.py) and reuse the cached text.
+
+Granularity comes from INSIGHT_SCORE_BAND (points per score band, default 10; 0 states exact values as
+before) and INSIGHT_GAP_STEP (points per gap severity band, default 1).
+
+Usage: python match_quantizer.py replay [CSV] [--synthetic N] [--bands 0,5,10,20] [--gap-steps 0.5,1]
+replays the survey submissions in CSV (default "Pookie Concierge.csv", in file order) or N random profiles
+against the catalog, builds the insight requests of their top 3 matches in each insight mode and reports
+the LLM cache hit rate each granularity would have had.
+"""
+import argparse
+import math
+import os
+from typing import Dict, List, Tuple
+
+from insight_prompts import SECTION_PROMPTS, batched_prompt, combined_prompt
+from insight_schema import SECTIONS
+
+# Match data scores stated in insight prompts, in prompt order
+SCORE_FIELDS = ["overall_match", "skills_match", "values_match", "interests_match", "work_styles_match"]
+
+# Insight requests replay() reports: the four-call mode's sections, then one combined and one batched call
+REPLAY_REQUESTS = list(SECTION_PROMPTS) + ["combined", "batched"]
+
+
+class MatchQuantizer:
+    """Match data -> prompt facts, with scores and gaps stated exactly or in bands of a configurable width"""
+
+    def __init__(self, score_band: float = 10, gap_step: float = 1.0, max_strengths: int = 4, max_gaps: int = 3):
+        self.score_band = score_band
+        self.gap_step = gap_step
+        self.max_strengths = max_strengths
+        self.max_gaps = max_gaps
+
+    @classmethod
+    def from_env(cls) -> "MatchQuantizer":
+        return cls(score_band=float(os.getenv("INSIGHT_SCORE_BAND", "10")),
+                   gap_step=float(os.getenv("INSIGHT_GAP_STEP", "1")))
+
+    @property
+    def exact(self) -> bool:
+        return self.score_band <= 0
+
+    def score_range(self, score: float) -> str:
+        low = math.floor(score / self.score_band) * self.score_band
+        if low >= 100:
+            low -= self.score_band
+        return f"{low:g}-{min(low + self.score_band, 100):g}%"
+
+    def gap_range(self, gap: float) -> str:
+        if self.gap_step <= 0:
+            return f"{gap:.1f}"
+        low = math.floor(gap / self.gap_step) * self.gap_step
+        return f"{low:g}-{low + self.gap_step:g}"
+
+    def facts(self, match_data: Dict) -> Dict:
+        """
+        What insight prompts state about a match
+        Exact mode states "73.4%" and "Gap of 1.4 points"; banded mode states "70-80%" and "Gap of 1-2 points"
+        """
+        scores = {"overall_match": match_data["overall_match"], **match_data["breakdown"]}
+        if self.exact:
+            stated = {field: f"{scores[field]}%" for field in SCORE_FIELDS}
+        else:
+            stated = {field: self.score_range(scores[field]) for field in SCORE_FIELDS}
+        improvements = match_data.get("improvements", [])
+        gaps = [f"{imp['skill']}: Gap of {self.gap_range(imp['required_level'] - imp['current_level'])} points"
+                if not self.exact else
+                f"{imp['skill']}: Gap of {imp['required_level'] - imp['current_level']:.1f} points"
+                for imp in improvements[:self.max_gaps]]
+        return {
+            **stated,
+            "strengths": match_data.get("strengths", [])[:self.max_strengths],
+            "improvement_count": len(improvements),
+            "gaps": gaps
+        }
+
+    def describe(self) -> Dict:
+        return {"score_band": self.score_band, "gap_step": self.gap_step, "exact": self.exact}
+
+
+def replay(profile_matches: List[List[Tuple[str, Dict]]], quantizer: MatchQuantizer,
+           batch_size: int = 3) -> Dict[str, float]:
+    """
+    Hit rate of each insight request (REPLAY_REQUESTS) if the LLM cache had started empty and served the
+    profiles' matches in order: the prompts formai sends, hashed into the keys LLMClient caches them under
+    """
+    keys = {request: [] for request in REPLAY_REQUESTS}
+    for matches in profile_matches:
+        stated = [(job_name, quantizer.facts(match_data)) for job_name, match_data in matches]
+        for job_name, facts in stated:
+            for section, build in SECTION_PROMPTS.items():
+                keys[section].append(build(job_name, facts).key())
+            keys["combined"].append(combined_prompt(job_name, facts, list(SECTIONS)).key())
+        for start in range(0, len(stated), batch_size):
+            batch = stated[start:start + batch_size]
+            keys["batched"].append(batched_prompt([job_name for job_name, _ in batch],
+                                                  [facts for _, facts in batch]).key())
+    return {request: (len(sent) - len(set(sent))) / len(sent) if sent else 0.0 for request, sent in keys.items()}
+
+
+def survey_profiles(csv_path: str) -> List:
+    """Profiles of the survey submissions in a CSV, parsed the way the batch report parses them"""
+    import pandas as pd
+    from insights_generator_new import CareerMatcher
+
+    parser = CareerMatcher()
+    profiles = [parser.parse_csv_row(row) for _, row in pd.read_csv(csv_path).iterrows()]
+    return [profile for profile in profiles if profile is not None]
+
+
+def match_stream(profiles: List, onet_jobs: Dict, top_n: int = 3) -> List[List[Tuple[str, Dict]]]:
+    """(job, match data) of each profile's top matches, in submission order: what the top-3 flow prompts for"""
+    from scoring import ScoringEngine
+
+    engine = ScoringEngine(onet_jobs)
+    stream = []
+    for profile in profiles:
+        ranking = engine.top_k(profile, top_n)
+        stream.append([(job_name, engine.calculate_job_match(profile, job_name, ranking))
+                       for job_name in ranking.job_names])
+    return stream
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay submissions and report insight cache hit rates")
+    parser.add_argument("command", choices=["replay"])
+    parser.add_argument("csv", nargs="?", default="Pookie Concierge.csv")
+    parser.add_argument("--synthetic", type=int, default=0, help="replay N random profiles instead of the CSV")
+    parser.add_argument("--bands", default="0,2,5,10,20", help="score band widths to compare (0 = exact)")
+    parser.add_argument("--gap-steps", default="0.5,1", help="gap severity band widths to compare")
+    args = parser.parse_args()
+
+    from catalog import load_catalog
+    from scoring import sample_profiles
+
+    profiles = sample_profiles(args.synthetic, seed=0) if args.synthetic else survey_profiles(args.csv)
+    stream = match_stream(profiles, load_catalog())
+    print(f"{len(profiles)} {'random profiles' if args.synthetic else 'submissions from ' + args.csv}, "
+          f"{sum(len(matches) for matches in stream)} top-3 job matches")
+    print(f"{'band':>5} {'gap':>5} " + " ".join(f"{request:>18}" for request in REPLAY_REQUESTS))
+    for band in [float(b) for b in args.bands.split(",")]:
+        for step in [float(s) for s in args.gap_steps.split(",")] if band > 0 else [0.0]:
+            rates = replay(stream, MatchQuantizer(score_band=band, gap_step=step))
+            print(f"{band:>5g} {step if band > 0 else '-':>5} "
+                  + " ".join(f"{rates[request]:>17.1%} " for request in REPLAY_REQUESTS))
@@ -0,0 +1,159 @@
+"""
+Fuzzy resolution of typed career names to catalog jobs
+
+JobNameResolver is built once per catalog load from each job's name, its similar_roles and job_keywords
+(aliases, weighted by how directly they name the job) and O*NET code. Every alias is split into
+character trigrams held in an inverted index (trigram -> alias ids). Resolving free text counts the
+trigrams each alias shares with it in one bincount over the posting lists, scores aliases by trigram
+Jaccard similarity times the alias weight and keeps the best alias per job, so a lookup never walks the
+catalog's dicts and needs no LLM call. "Sofware developr" or "tax accountant" resolve to catalog entries.
+
+Run `python name_resolver.py` to check resolutions of misspelled catalog names and aliases.
+"""
+import random
+import re
+import numpy as np
+from typing import Dict, List, Optional
+
+# Alias kinds and how directly each names its job; a keyword alone never clears RESOLVE_SCORE
+ALIAS_WEIGHTS = {"name": 1.0, "similar_role": 0.85, "keyword": 0.5}
+
+# Lowest score listed as a candidate, and lowest score resolved to a job without asking
+CANDIDATE_SCORE = 0.3
+RESOLVE_SCORE = 0.55
+
+DEFAULT_CANDIDATES = 5
+
+
+def normalise(text: str) -> str:
+    """Lowercase words separated by single spaces"""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct character trigrams of normalised text, padded so word starts and ends count"""
+    padded = f"  {normalise(text)} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class JobNameResolver:
+    """Trigram index over catalog job names, similar roles and keywords"""
+
+    def __init__(self, onet_jobs: Dict):
+        self.job_names = list(onet_jobs.keys())
+        # Exact (normalised) alias -> (job position, score), strongest alias kind first
+        self.exact = {}
+        alias_jobs, alias_weights, alias_texts, postings = [], [], [], {}
+        for position, (job_name, job) in enumerate(onet_jobs.items()):
+            self.exact.setdefault(normalise(job["onet_code"]), (position, 1.0))
+            aliases = [(job_name, "name")] + [(role, "similar_role") for role in job.get("similar_roles", [])]
+            aliases += [(keyword, "keyword") for keyword in job.get("job_keywords", [])]
+            for alias, kind in aliases:
+                text = normalise(alias)
+                if not text:
+                    continue
+                weight = ALIAS_WEIGHTS[kind]
+                if self.exact.get(text, (None, 0.0))[1] < weight:
+                    self.exact[text] = (position, weight)
+                alias_id = len(alias_texts)
+                alias_jobs.append(position)
+                alias_weights.append(weight)
+                alias_texts.append(alias)
+                for gram in trigrams(text):
+                    postings.setdefault(gram, []).append(alias_id)
+        self.alias_jobs = np.array(alias_jobs, dtype=np.intp)
+        self.alias_weights = np.array(alias_weights)
+        self.alias_texts = alias_texts
+        self.alias_sizes = np.bincount(np.concatenate([np.array(ids, dtype=np.intp) for ids in postings.values()]),
+                                       minlength=len(alias_texts)) if postings else np.zeros(0, dtype=np.intp)
+        self.postings = {gram: np.array(ids, dtype=np.intp) for gram, ids in postings.items()}
+
+    def candidates(self, text: str, k: int = DEFAULT_CANDIDATES) -> List[Dict]:
+        """Up to k catalog jobs best matching text: job name, 0-1 score and the alias that matched"""
+        key = normalise(text)
+        if not key:
+            return []
+        exact = self.exact.get(key)
+        if exact is not None and exact[1] == 1.0:
+            return [{"job_name": self.job_names[exact[0]], "score": 1.0, "matched": text.strip()}]
+
+        grams = trigrams(key)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.alias_texts))
+        # Jaccard is at most shared / len(grams), so aliases sharing too few trigrams cannot be candidates
+        aliases = np.flatnonzero(shared >= CANDIDATE_SCORE * len(grams))
+        if len(aliases) == 0 and exact is None:
+            return []
+        shared = shared[aliases]
+        scores = self.alias_weights[aliases] * shared / (len(grams) + self.alias_sizes[aliases] - shared)
+        if exact is not None:
+            aliases = np.append(aliases, -1)
+            scores = np.append(scores, exact[1])
+
+        # Best alias per job (first in descending score order), then the k best jobs
+        order = np.argsort(-scores, kind="stable")
+        jobs = np.where(aliases[order] >= 0, self.alias_jobs[aliases[order]], exact[0] if exact else -1)
+        _, first = np.unique(jobs, return_index=True)
+        results = []
+        for i in order[np.sort(first)][:k]:
+            if scores[i] < CANDIDATE_SCORE:
+                break
+            job = self.alias_jobs[aliases[i]] if aliases[i] >= 0 else exact[0]
+            results.append({"job_name": self.job_names[job], "score": round(float(scores[i]), 3),
+                            "matched": self.alias_texts[aliases[i]] if aliases[i] >= 0 else text.strip()})
+        return results
+
+    def resolve(self, text: str) -> Optional[str]:
+        """The catalog job text names, if the best candidate is confident enough"""
+        candidates = self.candidates(text, 1)
+        if candidates and candidates[0]["score"] >= RESOLVE_SCORE:
+            return candidates[0]["job_name"]
+        return None
+
+
+def check_resolution(onet_jobs: Dict, queries: int = 300, seed: int = 0) -> List[str]:
+    """Misspelled job names (one edit per eight characters) and similar roles must resolve to their job"""
+    rng = random.Random(seed)
+    resolver = JobNameResolver(onet_jobs)
+    names = {normalise(name) for name in onet_jobs}
+    failures = []
+    for name, job in onet_jobs.items():
+        if resolver.resolve(name) != name:
+            failures.append(f"exact name {name!r} resolved to {resolver.resolve(name)!r}")
+        for role in job.get("similar_roles", []):
+            # A role shared by several jobs, or that is itself a catalog job, may resolve to another one
+            owners = [n for n, j in onet_jobs.items() if role in j.get("similar_roles", [])]
+            if normalise(role) not in names and owners == [name] and resolver.resolve(role) != name:
+                failures.append(f"similar role {role!r} of {name!r} resolved to {resolver.resolve(role)!r}")
+    for _ in range(queries):
+        name = rng.choice(list(onet_jobs))
+        typed = list(name.lower())
+        for _ in range(max(1, len(typed) // 8)):
+            i = rng.randrange(len(typed))
+            edit = rng.choice(["drop", "swap", "replace"])
+            if edit == "drop" and len(typed) > 3:
+                del typed[i]
+            elif edit == "swap" and i + 1 < len(typed):
+                typed[i], typed[i + 1] = typed[i + 1], typed[i]
+            else:
+                typed[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        typed = "".join(typed)
+        ranked = [c["job_name"] for c in resolver.candidates(typed)]
+        if name not in ranked[:3]:
+            failures.append(f"{typed!r} (from {name!r}) ranked {ranked[:3]}")
+    return failures
+
+
+if __name__ == "__main__":
+    import careers
+
+    problems = check_resolution(careers.onet_jobs)
+    # Typos can land closer to another job's name; a few misses out of the random queries are expected
+    misses = [p for p in problems if not p.startswith(("exact", "similar"))]
+    hard = [p for p in problems if p.startswith(("exact", "similar"))]
+    print("\n".join(problems[:20]))
+    if hard or len(misses) > 0.05 * 300:
+        raise SystemExit(1)
+    print(f"Names, similar roles and {300 - len(misses)}/300 misspelled names resolve over {len(careers.onet_jobs)} jobs")
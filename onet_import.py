@@ -0,0 +1,292 @@
+"""
+Offline importer building the job catalog from an O*NET database release
+
+Reads a release directory: the tab-delimited text release (Occupation Data.txt, Skills.txt, Knowledge.txt,
+Abilities.txt, Work Values.txt, Interests.txt, Work Styles.txt and optionally Related Occupations.txt)
+or the same files as .xlsx (needs openpyxl). O*NET elements are mapped onto the project's dimension keys
+and the result is written in careers.py's format, optionally compiled straight into a catalog snapshot.
+
+Files are streamed in fixed-size chunks reading only the needed columns, and only rows for mapped
+elements are kept, so memory grows with the number of occupations rather than with the release size.
+
+Usage: python onet_import.py RELEASE_DIR [--output careers_onet.py] [--snapshot PATH] [--chunk-rows N]
+"""
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+CODE = "O*NET-SOC Code"
+ELEMENT = "Element Name"
+SCALE = "Scale ID"
+VALUE = "Data Value"
+SUPPRESS = "Recommend Suppress"
+
+# Rating scale read from each file, and its range (rescaled onto the catalog's 1-5 importance range)
+FILE_SCALES = {
+    "Skills": "IM",
+    "Knowledge": "IM",
+    "Abilities": "IM",
+    "Work Styles": "IM",
+    "Work Values": "EX",
+    "Interests": "OI"
+}
+SCALE_RANGES = {"IM": (1.0, 5.0), "EX": (1.0, 7.0), "OI": (1.0, 7.0)}
+
+# Project dimension key -> O*NET (file, element) sources, averaged after rescaling
+SKILL_SOURCES = {
+    "math": [("Skills", "Mathematics"), ("Knowledge", "Mathematics")],
+    "problem_solving": [("Skills", "Complex Problem Solving"), ("Skills", "Critical Thinking")],
+    "public_speaking": [("Skills", "Speaking")],
+    "creative": [("Abilities", "Originality"), ("Abilities", "Fluency of Ideas")],
+    "working_with_people": [("Skills", "Social Perceptiveness"), ("Skills", "Coordination")],
+    "writing": [("Skills", "Writing")],
+    "tech_savvy": [("Knowledge", "Computers and Electronics"), ("Skills", "Technology Design")],
+    "leadership": [("Skills", "Management of Personnel Resources")],
+    "networking": [("Skills", "Persuasion"), ("Skills", "Negotiation")],
+    "programming": [("Skills", "Programming")],
+    "empathy": [("Skills", "Service Orientation"), ("Skills", "Social Perceptiveness")],
+    "time_management": [("Skills", "Time Management")],
+    "attention_to_detail": [("Work Styles", "Attention to Detail")],
+    "project_management": [("Skills", "Management of Material Resources"), ("Skills", "Judgment and Decision Making")],
+    "research": [("Skills", "Science"), ("Skills", "Active Learning")],
+    "teamwork": [("Work Styles", "Cooperation"), ("Skills", "Coordination")]
+}
+
+# O*NET groups its 21 work needs into six work values. Income, stability and variety take their own needs
+# (Compensation; Security; Activity and Variety) rather than the Working Conditions value all three sit
+# under, which made them near copies of each other. Releases that rate only the six values leave those
+# dimensions unsourced: jobs then omit them and the report lists them under unsourced_dimensions
+WORK_VALUE_SOURCES = {
+    "income": [("Work Values", "Compensation")],
+    "impact": [("Work Values", "Achievement"), ("Work Values", "Relationships")],
+    "stability": [("Work Values", "Security")],
+    "variety": [("Work Values", "Activity"), ("Work Values", "Variety")],
+    "recognition": [("Work Values", "Recognition")],
+    "autonomy": [("Work Values", "Independence")]
+}
+
+INTEREST_SOURCES = {key: [("Interests", key.title())] for key in
+                    ["investigative", "realistic", "artistic", "social", "enterprising", "conventional"]}
+
+# Work styles the matcher scores (scoring.WORK_STYLE_TRAITS) plus innovation, as careers.py lists it
+WORK_STYLE_SOURCES = {
+    "analytical_thinking": [("Work Styles", "Analytical Thinking")],
+    "attention_to_detail": [("Work Styles", "Attention to Detail")],
+    "dependability": [("Work Styles", "Dependability")],
+    "leadership": [("Work Styles", "Leadership")],
+    "stress_tolerance": [("Work Styles", "Stress Tolerance")],
+    "adaptability": [("Work Styles", "Adaptability/Flexibility")],
+    "social_orientation": [("Work Styles", "Social Orientation")],
+    "achievement": [("Work Styles", "Achievement/Effort")],
+    "initiative": [("Work Styles", "Initiative")],
+    "persistence": [("Work Styles", "Persistence")],
+    "concern_for_others": [("Work Styles", "Concern for Others")],
+    "cooperation": [("Work Styles", "Cooperation")],
+    "innovation": [("Work Styles", "Innovation")]
+}
+
+# Job field -> (dimension sources, dimensions kept per job; None keeps all), as careers.py lists 6 each
+FIELD_SOURCES = {
+    "skills": (SKILL_SOURCES, 6),
+    "work_values": (WORK_VALUE_SOURCES, None),
+    "interests": (INTEREST_SOURCES, None),
+    "work_styles": (WORK_STYLE_SOURCES, 6)
+}
+
+# Required-skill display names, as scoring.SKILL_NAME_KEYS maps them back to skill keys
+SKILL_DISPLAY_NAMES = {
+    "math": "Math", "problem_solving": "Problem Solving", "public_speaking": "Public Speaking",
+    "creative": "Creative", "working_with_people": "Working with People", "writing": "Writing",
+    "tech_savvy": "Tech-Savvy", "leadership": "Leadership", "networking": "Networking",
+    "programming": "Programming", "empathy": "Empathy", "time_management": "Time Management",
+    "attention_to_detail": "Attention to Detail", "project_management": "Project Management",
+    "research": "Research", "teamwork": "Teamwork"
+}
+
+REQUIRED_SKILLS = 5
+SIMILAR_ROLES = 5
+KEYWORDS = 4
+KEYWORD_STOPWORDS = {"and", "all", "other", "except", "workers", "specialists", "with", "from"}
+DEFAULT_CHUNK_ROWS = 50000
+
+
+def _release_file(directory: str, name: str) -> Optional[str]:
+    for extension in (".txt", ".xlsx"):
+        path = os.path.join(directory, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_chunks(path: str, columns: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream a release file as DataFrames of at most chunk_rows rows, holding only the requested columns"""
+    if path.endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("Reading the Excel release needs openpyxl (pip install openpyxl); "
+                              "the text release needs nothing extra")
+        workbook = load_workbook(path, read_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows))
+        positions = [header.index(column) for column in columns if column in header]
+        names = [header[i] for i in positions]
+        chunk = []
+        for row in rows:
+            chunk.append([row[i] for i in positions])
+            if len(chunk) == chunk_rows:
+                yield pd.DataFrame(chunk, columns=names)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=names)
+        workbook.close()
+        return
+
+    header = pd.read_csv(path, sep="\t", nrows=0).columns
+    for chunk in pd.read_csv(path, sep="\t", usecols=[c for c in columns if c in header], dtype=str,
+                             chunksize=chunk_rows, keep_default_na=False):
+        yield chunk
+
+
+def read_ratings(path: str, scale: str, elements: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 stats: Optional[Dict] = None) -> pd.DataFrame:
+    """Occupation x element table of one file's ratings on one scale, for the given elements only"""
+    kept = []
+    low, high = SCALE_RANGES[scale]
+    wanted = set(elements)
+    for chunk in read_chunks(path, [CODE, ELEMENT, SCALE, VALUE, SUPPRESS], chunk_rows):
+        mask = (chunk[SCALE] == scale) & chunk[ELEMENT].isin(wanted)
+        if SUPPRESS in chunk:
+            mask &= chunk[SUPPRESS] != "Y"
+        rows = chunk.loc[mask, [CODE, ELEMENT, VALUE]]
+        if stats is not None:
+            stats["rows_read"] += len(chunk)
+            stats["rows_used"] += len(rows)
+        kept.append(rows)
+    if not kept:
+        return pd.DataFrame()
+    ratings = pd.concat(kept, ignore_index=True)
+    # Rescale onto the catalog's 1-5 range
+    ratings[VALUE] = 1.0 + (pd.to_numeric(ratings[VALUE], errors="coerce") - low) * 4.0 / (high - low)
+    return ratings.pivot_table(index=CODE, columns=ELEMENT, values=VALUE, aggfunc="mean")
+
+
+def _keywords(title: str) -> List[str]:
+    words = [w for w in re.findall(r"[a-z]+", title.lower()) if len(w) > 3 and w not in KEYWORD_STOPWORDS]
+    return list(dict.fromkeys(words))[:KEYWORDS]
+
+
+def import_release(directory: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[Dict, Dict]:
+    """
+    Build a catalog (job title -> job entry in careers.py's format) from an O*NET release directory
+    Returns (onet_jobs, report) where the report counts rows, occupations and mapping gaps (elements the
+    release does not rate, and dimensions left without any source as "field: dimension").
+    """
+    start = time.perf_counter()
+    occupations_path = _release_file(directory, "Occupation Data")
+    if occupations_path is None:
+        raise FileNotFoundError(f"No 'Occupation Data' file (.txt or .xlsx) in {directory}")
+    report = {"rows_read": 0, "rows_used": 0, "missing_files": [], "missing_elements": [],
+              "unsourced_dimensions": [], "occupations_in_release": 0, "occupations_skipped": 0}
+
+    titles = {}
+    for chunk in read_chunks(occupations_path, [CODE, "Title"], chunk_rows):
+        titles.update(zip(chunk[CODE], chunk["Title"]))
+    report["occupations_in_release"] = len(titles)
+
+    # Elements needed from each file, across every field's sources
+    needed = {}
+    for sources, _ in FIELD_SOURCES.values():
+        for dimension_sources in sources.values():
+            for file_name, element in dimension_sources:
+                needed.setdefault(file_name, set()).add(element)
+
+    tables = {}
+    for file_name, elements in needed.items():
+        path = _release_file(directory, file_name)
+        if path is None:
+            report["missing_files"].append(file_name)
+            continue
+        tables[file_name] = read_ratings(path, FILE_SCALES[file_name], sorted(elements), chunk_rows, report)
+        report["missing_elements"] += [f"{file_name}: {element}" for element in sorted(elements)
+                                       if element not in tables[file_name].columns]
+
+    # Field -> occupation x dimension table (mean of the available sources, one decimal like careers.py)
+    fields = {}
+    for field, (sources, _) in FIELD_SOURCES.items():
+        columns = {}
+        for dimension, dimension_sources in sources.items():
+            parts = [tables[f][e] for f, e in dimension_sources if f in tables and e in tables[f].columns]
+            if parts:
+                columns[dimension] = pd.concat(parts, axis=1).mean(axis=1)
+            else:
+                report["unsourced_dimensions"].append(f"{field}: {dimension}")
+        fields[field] = pd.DataFrame(columns).round(1)
+
+    related = {}
+    related_path = _release_file(directory, "Related Occupations")
+    if related_path is not None:
+        for chunk in read_chunks(related_path, [CODE, "Related O*NET-SOC Code", "Index"], chunk_rows):
+            chunk = chunk.assign(Index=pd.to_numeric(chunk["Index"], errors="coerce"))
+            for code, related_code, index in zip(chunk[CODE], chunk["Related O*NET-SOC Code"], chunk["Index"]):
+                related.setdefault(code, []).append((index, related_code))
+
+    # Plain dicts per occupation; per-row pandas lookups would dominate the import time
+    records = {field: table.to_dict("index") for field, table in fields.items()}
+    onet_jobs = {}
+    for code, title in titles.items():
+        job = {"onet_code": code}
+        for field, (_, keep) in FIELD_SOURCES.items():
+            if code not in records[field]:
+                break
+            levels = [(dimension, level) for dimension, level in records[field][code].items() if level == level]
+            if keep is not None:
+                levels = sorted(levels, key=lambda item: -item[1])[:keep]
+            job[field] = {dimension: float(level) for dimension, level in levels}
+        else:
+            if not job["skills"] or not job["interests"]:
+                report["occupations_skipped"] += 1
+                continue
+            job["required_skills"] = [SKILL_DISPLAY_NAMES[key] for key in list(job["skills"])[:REQUIRED_SKILLS]]
+            job["similar_roles"] = [titles[c] for _, c in sorted(related.get(code, []), key=lambda r: r[0])
+                                    if c in titles][:SIMILAR_ROLES]
+            job["job_keywords"] = _keywords(title)
+            onet_jobs[title] = job
+            continue
+        report["occupations_skipped"] += 1
+
+    report["occupations_imported"] = len(onet_jobs)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return onet_jobs, report
+
+
+def write_catalog_module(onet_jobs: Dict, path: str):
+    """Write the catalog as a Python module defining onet_jobs, like careers.py"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('"""Job catalog imported from an O*NET release by onet_import.py"""\n')
+        # JSON with only strings, floats and lists is also a valid Python literal
+        f.write(f"onet_jobs = {json.dumps(onet_jobs, indent=4, ensure_ascii=False)}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import an O*NET release into the job catalog format")
+    parser.add_argument("release_dir", help="Directory with the O*NET text (.txt) or Excel (.xlsx) release files")
+    parser.add_argument("--output", default="careers_onet.py", help="Python module to write the catalog to")
+    parser.add_argument("--snapshot", help="Also compile the catalog into this snapshot file")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows read per chunk")
+    args = parser.parse_args()
+
+    catalog, summary = import_release(args.release_dir, args.chunk_rows)
+    write_catalog_module(catalog, args.output)
+    print(f"Wrote {len(catalog)} occupations to {args.output}")
+    if args.snapshot:
+        from catalog import build_snapshot
+
+        snapshot = build_snapshot(catalog, args.snapshot)
+        print(f"Wrote {args.snapshot}: catalog version {snapshot['content_hash']}")
+    print(json.dumps(summary, indent=2))
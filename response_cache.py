@@ -0,0 +1,99 @@
+"""
+Pre-encoded responses for the read-only endpoints the frontend polls
+
+ResponseCache serializes an endpoint's content once per key (catalog version, path and query parameters)
+and keeps the encoded bytes with a strong ETag derived from them. Later hits send the stored bytes as is,
+and a request whose If-None-Match carries the current ETag gets an empty 304. Per-path counters show how
+often content was rebuilt versus served from the cache.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+# Key version for content that does not depend on the catalog
+STATIC_VERSION = "static"
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag of an encoded body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists etag (GET uses weak comparison, so W/ prefixes are ignored)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Bounded LRU cache of encoded endpoint bodies and their ETags, keyed by (version, path, params...)"""
+
+    def __init__(self, maxsize: int = 256, max_age: int = 60):
+        self.maxsize = maxsize
+        # Seconds clients may reuse a response before revalidating; a catalog reload changes the ETag
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, path: str, counter: str):
+        counters = self._counters.setdefault(path, {"builds": 0, "hits": 0, "not_modified": 0})
+        counters[counter] += 1
+
+    def respond(self, request: Request, key: Tuple, build: Callable, media_type: str = "application/json") -> Response:
+        """
+        Response for key: the stored bytes, a 304 if the client already holds them, or build() encoded once
+        build returns JSON-able content, or text for other media types.
+        """
+        path = key[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(path, "hits")
+
+        if entry is None:
+            content = build()
+            if media_type == "application/json":
+                body = JSONResponse(content=jsonable_encoder(content)).body
+            else:
+                body = content.encode("utf-8")
+            entry = (body, etag_for(body))
+            with self._lock:
+                self._count(path, "builds")
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            with self._lock:
+                self._count(path, "not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    def invalidate(self, version: Optional[str] = None) -> int:
+        """Drop entries for one version (or everything), returning how many were removed"""
+        with self._lock:
+            stale = [key for key in self._entries if version is None or key[0] == version]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> Dict:
+        """Per-path build (recompute), hit and 304 counters"""
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize,
+                    "paths": {path: dict(counters) for path, counters in sorted(self._counters.items())}}
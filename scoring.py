@@ -0,0 +1,1643 @@
+"""
+Shared scoring core for the career matchers
+
+form.CareerMatcher, formai.AICareerMatcher and insights_generator_new.CareerMatcher all score
+profiles through ScoringEngine. Three interchangeable backends compute the component scores:
+
+- "python": reference implementation walking each job's dicts with the original formulas
+- "numpy": catalog compiled once into dense matrices, every job scored in a few array operations
+- "lookup": per (job, dimension, level) contributions precomputed, scoring is a gather and sum
+
+All produce bit-identical scores; run `python scoring.py` to check them against each other.
+
+On large catalogs the lookup backend also gives cheap score estimates with a certified error bound,
+which ScoringEngine.top_k uses to prune jobs that cannot reach the top k before exact scoring.
+"""
+import copy
+import hashlib
+import json
+import random
+import threading
+import numpy as np
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar, Union
+from pydantic import BaseModel, Field
+
+# Canonical dimension order for profile inputs (matches PersonProfileRequest)
+PERSONALITY_TRAITS = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
+WORK_VALUES = ["income", "impact", "stability", "variety", "recognition", "autonomy"]
+PROFILE_SKILLS = [
+    "math", "problem_solving", "public_speaking", "creative", "working_with_people",
+    "writing", "tech_savvy", "leadership", "networking", "programming", "empathy",
+    "time_management", "attention_to_detail", "project_management", "research", "teamwork"
+]
+INTERESTS = ["investigative", "social", "artistic", "enterprising", "realistic", "conventional"]
+
+# Personality trait behind each O*NET work style (stress tolerance is the inverse of neuroticism)
+WORK_STYLE_TRAITS = {
+    "analytical_thinking": "openness",
+    "attention_to_detail": "conscientiousness",
+    "dependability": "conscientiousness",
+    "leadership": "extraversion",
+    "stress_tolerance": "neuroticism",
+    "adaptability": "openness",
+    "social_orientation": "extraversion",
+    "achievement": "conscientiousness",
+    "initiative": "extraversion",
+    "persistence": "conscientiousness",
+    "concern_for_others": "agreeableness",
+    "cooperation": "agreeableness"
+}
+
+# Fallback levels used when a profile does not cover a job dimension
+DEFAULT_SKILL_LEVEL = 2.5
+DEFAULT_VALUE_LEVEL = 3.5
+DEFAULT_TRAIT_LEVEL = 3
+DEFAULT_WORK_STYLE_LEVEL = 3.0
+
+# Required-skill display names mapped to profile skill keys (API names and survey column names)
+SKILL_NAME_KEYS = {
+    "Programming": "programming",
+    "Problem Solving": "problem_solving",
+    "Public Speaking": "public_speaking",
+    "Creative": "creative",
+    "Working with People": "working_with_people",
+    "Leadership": "leadership",
+    "Networking": "networking",
+    "Math": "math",
+    "Tech-Savvy": "tech_savvy",
+    "Empathy": "empathy",
+    "Time Management": "time_management",
+    "Attention to Detail": "attention_to_detail",
+    "Project Management": "project_management",
+    "Research": "research",
+    "Writing & Communication": "writing",
+    "Tech-Savvy (Excel, Tableau, etc.)": "tech_savvy",
+    "Leadership & Team Management": "leadership",
+    "Networking & Relationship Building": "networking",
+    "Negotiation & Salesmanship": "negotiation",
+    "Creativity & Innovation": "creative",
+    "Programming Proficiency": "programming",
+    "Hands on Building & Prototyping": "hands_on",
+    "Teamwork": "teamwork"
+}
+
+# Levels used by strengths/improvements when a required skill is not rated or not weighted
+DEFAULT_REQUIRED_SKILL_LEVEL = 3.5
+
+# Component order in score arrays, and their weights in the overall match (as in combine_components)
+COMPONENTS = ["skills", "values", "interests", "work_styles"]
+COMPONENT_WEIGHTS = np.array([0.3, 0.25, 0.2, 0.25])
+
+# Column layout of the compact profile array accepted by the batch API:
+# personality traits (1-5), value rankings (1-6, 1=most important), skills (1-5), interest flags (0/1)
+PROFILE_COLUMNS = (PERSONALITY_TRAITS + [f"{value}_importance" for value in WORK_VALUES] +
+                   PROFILE_SKILLS + INTERESTS)
+
+# Half-step level grid for the lookup backend (index = level * 2), covering integer answers 1-6,
+# the 2.5/3.0/3.5 defaults, inverted neuroticism (0-4) and averaged CSV answers
+LEVEL_GRID = np.arange(13) / 2.0
+
+# Below this many jobs a full stable sort beats partial selection (python benchmarks.py topk)
+PARTIAL_SELECT_MIN_JOBS = 256
+
+# Below this many jobs scoring everything beats estimating first (python benchmarks.py pruning)
+PRUNE_MIN_JOBS = 512
+
+# Profiles scored per chunk in batch ranking, bounds the profiles x jobs x slots temporaries
+BATCH_CHUNK_SIZE = 256
+
+# Limits of one /analyze-batch request: scoring time and response size grow with profiles x top_k
+MAX_BATCH_PROFILES = 2000
+MAX_BATCH_TOP_K = 20
+
+
+ProfileRequest = TypeVar("ProfileRequest", bound=BaseModel)
+
+
+class BatchAnalysisRequest(BaseModel, Generic[ProfileRequest]):
+    """Body of /analyze-batch; each API parametrizes it with its own PersonProfileRequest"""
+    profiles: Optional[List[ProfileRequest]] = Field(None, max_length=MAX_BATCH_PROFILES, description="Full profile payloads to score")
+    profile_matrix: Optional[List[List[int]]] = Field(None, max_length=MAX_BATCH_PROFILES, description="Compact N x 33 integer array, columns as listed by scoring.PROFILE_COLUMNS")
+    top_k: int = Field(3, ge=1, le=MAX_BATCH_TOP_K, description="Number of top job matches to return per profile")
+
+
+def combine_components(skills_score, values_score, interests_score, work_styles_score):
+    """Weighted overall match (skills 30%, values 25%, interests 20%, work styles 25%)"""
+    return (skills_score * 0.3 + values_score * 0.25 +
+            interests_score * 0.2 + work_styles_score * 0.25)
+
+
+@dataclass
+class ScoringProfile:
+    """The scoring-relevant subset of PersonProfile, used for compact array input"""
+    personality: Dict[str, float]
+    work_values: Dict[str, float]
+    skills: Dict[str, float]
+    interests: List[str]
+
+
+# Fixed level layout of Profile: personality traits, work value levels (7 - ranking), skills
+PROFILE_LEVELS = ([("personality", key) for key in PERSONALITY_TRAITS] + [("work_values", key) for key in WORK_VALUES] +
+                  [("skills", key) for key in PROFILE_SKILLS])
+LEVEL_POSITIONS = {dimension: i for i, dimension in enumerate(PROFILE_LEVELS)}
+PROFILE_FIELDS = ["personality", "work_values", "skills"]
+
+
+class Profile:
+    """
+    Slotted profile with fixed dimension order, the PersonProfile used by the matchers
+    levels follows PROFILE_LEVELS (None where unanswered) and keeps int/float types, which strengths text
+    echoes; answers outside it (e.g. extra survey skills) sit in extras as (field, key, level). The
+    personality, work_values and skills dicts are built on access, for prompts, reports and the reference
+    backend; to_dict() gives the PersonProfile dict shape for responses.
+    """
+
+    __slots__ = ("name", "email", "university", "levels", "extras", "interests", "preferred_career", "_fingerprint")
+
+    def __init__(self, name: str = "", email: str = "", university: str = "", personality: Optional[Dict] = None,
+                 work_values: Optional[Dict] = None, skills: Optional[Dict] = None,
+                 interests: Optional[List[str]] = None, preferred_career: str = ""):
+        levels = [None] * len(PROFILE_LEVELS)
+        extras = []
+        for field, answers in zip(PROFILE_FIELDS, (personality, work_values, skills)):
+            for key, level in (answers or {}).items():
+                position = LEVEL_POSITIONS.get((field, key))
+                if position is None:
+                    extras.append((field, key, level))
+                else:
+                    levels[position] = level
+        self._set(name, email, university, tuple(levels), tuple(extras), interests, preferred_career)
+
+    @classmethod
+    def from_levels(cls, levels: Tuple, interests: List[str], name: str = "", email: str = "",
+                    university: str = "", preferred_career: str = "") -> "Profile":
+        """Profile straight from answers in PROFILE_LEVELS order, without building dicts"""
+        if len(levels) != len(PROFILE_LEVELS):
+            raise ValueError(f"Expected {len(PROFILE_LEVELS)} levels, got {len(levels)}")
+        profile = cls.__new__(cls)
+        profile._set(name, email, university, tuple(levels), (), interests, preferred_career)
+        return profile
+
+    def _set(self, name, email, university, levels, extras, interests, preferred_career):
+        self.name = name
+        self.email = email
+        self.university = university
+        self.levels = levels
+        self.extras = extras
+        self.interests = list(interests or [])
+        self.preferred_career = preferred_career
+        self._fingerprint = None
+
+    def items(self, field: str):
+        """(key, level) answers of one field, canonical keys first"""
+        for (level_field, key), level in zip(PROFILE_LEVELS, self.levels):
+            if level_field == field and level is not None:
+                yield key, level
+        for extra_field, key, level in self.extras:
+            if extra_field == field:
+                yield key, level
+
+    def level(self, field: str, key: str, default=None):
+        """One answer, or default if unanswered"""
+        position = LEVEL_POSITIONS.get((field, key))
+        if position is not None:
+            level = self.levels[position]
+            return default if level is None else level
+        for extra_field, extra_key, level in self.extras:
+            if extra_field == field and extra_key == key:
+                return level
+        return default
+
+    @property
+    def personality(self) -> Dict[str, float]:
+        return dict(self.items("personality"))
+
+    @property
+    def work_values(self) -> Dict[str, float]:
+        return dict(self.items("work_values"))
+
+    @property
+    def skills(self) -> Dict[str, float]:
+        return dict(self.items("skills"))
+
+    def to_dict(self) -> Dict:
+        """The PersonProfile dict shape returned by the API"""
+        return {
+            "name": self.name,
+            "email": self.email,
+            "university": self.university,
+            "personality": self.personality,
+            "work_values": self.work_values,
+            "skills": self.skills,
+            "interests": list(self.interests),
+            "preferred_career": self.preferred_career
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Profile):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__[:-1])
+
+    def __repr__(self) -> str:
+        return f"Profile(name={self.name!r}, levels={self.levels!r}, extras={self.extras!r}, interests={self.interests!r})"
+
+
+class Job:
+    """
+    Slotted view of a catalog job, compiled once at load (catalog_compiler.compile_catalog)
+    required_skills holds (display name, profile skill key, position in Profile.levels, required level) in
+    catalog order; the position is None for keys outside PROFILE_SKILLS, which only extra (CSV) skills match.
+    """
+
+    __slots__ = ("name", "onet_code", "required_skill_names", "required_skills")
+
+    def __init__(self, name: str, job: Dict):
+        self.name = name
+        self.onet_code = job["onet_code"]
+        self.required_skill_names = list(job["required_skills"])
+        required_skills = []
+        for skill_name in job["required_skills"]:
+            key = skill_key_for(skill_name)
+            required_skills.append((skill_name, key, LEVEL_POSITIONS.get(("skills", key)),
+                                    job["skills"].get(key, DEFAULT_REQUIRED_SKILL_LEVEL)))
+        self.required_skills = tuple(required_skills)
+
+    def user_levels(self, profile) -> List[float]:
+        """The profile's level on each required skill (DEFAULT_SKILL_LEVEL where unrated)"""
+        if isinstance(profile, Profile):
+            levels = profile.levels
+            return [profile.level("skills", key, DEFAULT_SKILL_LEVEL) if position is None
+                    else DEFAULT_SKILL_LEVEL if levels[position] is None else levels[position]
+                    for _, key, position, _ in self.required_skills]
+        skills = profile.skills
+        return [skills.get(key, DEFAULT_SKILL_LEVEL) for _, key, _, _ in self.required_skills]
+
+
+def skill_key_for(skill_name: str) -> str:
+    """Profile skill key for a required-skill display name"""
+    return SKILL_NAME_KEYS.get(skill_name, skill_name.lower().replace(' ', '_'))
+
+
+def work_style_level(personality: Dict, style: str) -> float:
+    """User level for a work style, derived from the matching personality trait"""
+    trait = WORK_STYLE_TRAITS.get(style)
+    if trait is None:
+        return DEFAULT_WORK_STYLE_LEVEL
+    if trait == "neuroticism":
+        return 5 - personality.get(trait, DEFAULT_TRAIT_LEVEL)
+    return personality.get(trait, DEFAULT_TRAIT_LEVEL)
+
+
+def split_profile_matrix(matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Validate a compact profile array and split it into (personality, rankings, skills, interest flags)"""
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.ndim != 2 or matrix.shape[1] != len(PROFILE_COLUMNS):
+        raise ValueError(f"Profile matrix must have shape (N, {len(PROFILE_COLUMNS)}), got {matrix.shape}")
+
+    n_traits, n_values, n_skills = len(PERSONALITY_TRAITS), len(WORK_VALUES), len(PROFILE_SKILLS)
+    personality = matrix[:, :n_traits]
+    rankings = matrix[:, n_traits:n_traits + n_values]
+    skill_levels = matrix[:, n_traits + n_values:n_traits + n_values + n_skills]
+    interest_flags = matrix[:, n_traits + n_values + n_skills:]
+
+    if ((personality < 1) | (personality > 5)).any() or ((skill_levels < 1) | (skill_levels > 5)).any():
+        raise ValueError("Personality traits and skills must be between 1 and 5")
+    if ((rankings < 1) | (rankings > 6)).any():
+        raise ValueError("Work value rankings must be between 1 and 6")
+    if not np.isin(interest_flags, (0, 1)).all():
+        raise ValueError("Interest flags must be 0 or 1")
+    return personality, rankings, skill_levels, interest_flags
+
+
+def profiles_from_matrix(matrix) -> List[ScoringProfile]:
+    """Expand a compact profile array into ScoringProfile objects"""
+    personality, rankings, skill_levels, interest_flags = split_profile_matrix(matrix)
+    return [
+        ScoringProfile(
+            personality={k: int(v) for k, v in zip(PERSONALITY_TRAITS, personality[row])},
+            work_values={k: 7 - int(v) for k, v in zip(WORK_VALUES, rankings[row])},
+            skills={k: int(v) for k, v in zip(PROFILE_SKILLS, skill_levels[row])},
+            interests=[k for k, flag in zip(INTERESTS, interest_flags[row]) if flag == 1]
+        )
+        for row in range(len(personality))
+    ]
+
+
+def catalog_version(onet_jobs: Dict) -> str:
+    """Content hash of a job catalog (key order included, since it affects sums and tie order)"""
+    # Snapshots store the hash of the catalog they were compiled from
+    stored = getattr(onet_jobs, "content_hash", None)
+    if stored is not None:
+        return stored
+    payload = json.dumps(onet_jobs, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def stored_state(onet_jobs: Dict, component: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict]]:
+    """Arrays and metadata a catalog snapshot precomputed for a component, or None (e.g. for plain dicts)"""
+    stored = getattr(onet_jobs, "stored_state", None)
+    return stored(component) if stored is not None else None
+
+
+def profile_fingerprint(profile) -> Tuple:
+    """Canonical, hashable key for everything scoring reads from a profile (name and contact details excluded)"""
+    if isinstance(profile, Profile):
+        # Same key as the dict form, computed once per Profile
+        if profile._fingerprint is None:
+            profile._fingerprint = (
+                tuple(sorted(profile.items("personality"))),
+                tuple(sorted(profile.items("work_values"))),
+                tuple(sorted((skill, level, isinstance(level, float)) for skill, level in profile.items("skills"))),
+                frozenset(profile.interests)
+            )
+        return profile._fingerprint
+    return (
+        tuple(sorted(profile.personality.items())),
+        tuple(sorted(profile.work_values.items())),
+        # Skill levels are echoed in strengths text, so 5 and 5.0 must not share an entry
+        tuple(sorted((skill, level, isinstance(level, float)) for skill, level in profile.skills.items())),
+        frozenset(profile.interests)
+    )
+
+
+class ScoreCache:
+    """Bounded LRU cache for deterministic match results, keyed by catalog version and profile fingerprint"""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: Tuple, compute, copy_value: bool = True):
+        """
+        Return a copy of the cached value for key, computing and storing it on a miss
+        Pass copy_value=False for values that are never mutated (e.g. a JobRanking)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = self._entries[key]
+                return copy.deepcopy(value) if copy_value else value
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        # Callers decorate match dicts in place, so never hand out the stored object
+        return copy.deepcopy(value) if copy_value else value
+
+    # Cached engine methods whose result reads one job only, the job named by the key's argument
+    JOB_METHODS = {"calculate_job_match"}
+
+    def carry_over(self, diff) -> Dict[str, int]:
+        """
+        Move entries of diff.old_version that are still valid to diff.new_version and drop the rest
+        (diff is a catalog_diff.CatalogDiff). Per-job results survive unless their job changed or was removed;
+        whole-catalog results (rankings, top k) survive only if no job was added, removed, changed or reordered.
+        """
+        changed_jobs = diff.changed_jobs
+        kept = dropped = 0
+        with self._lock:
+            entries = OrderedDict()
+            for key, value in self._entries.items():
+                if key[0] != diff.old_version:
+                    entries[key] = value
+                elif (key[1] in self.JOB_METHODS and key[3] not in changed_jobs) or not diff.changes_rankings:
+                    entries[(diff.new_version,) + key[1:]] = value
+                    kept += 1
+                else:
+                    dropped += 1
+            self._entries = entries
+        return {"kept": kept, "dropped": dropped}
+
+    def invalidate(self, catalog_version: Optional[str] = None) -> int:
+        """Drop entries for one catalog version (or everything), returning how many were removed"""
+        with self._lock:
+            if catalog_version is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == catalog_version]
+                for key in stale:
+                    del self._entries[key]
+                removed = len(stale)
+        return removed
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def _ordered_sum(values: np.ndarray) -> np.ndarray:
+    """Sum the last axis left to right so results match Python's sum() bit for bit"""
+    if values.shape[-1] == 0:
+        return np.zeros(values.shape[:-1])
+    total = values[..., 0]
+    for k in range(1, values.shape[-1]):
+        total = total + values[..., k]
+    return total
+
+
+def top_k_indexes(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indexes of the k highest scores, best first, in the same order as a stable descending sort
+    Uses a partial partition so only the selected candidates are sorted
+    """
+    n = len(scores)
+    if k >= n or n < PARTIAL_SELECT_MIN_JOBS:
+        return np.argsort(-scores, kind="stable")[:max(k, 0)]
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    # Every score tied with the k-th best is a candidate, so ties still resolve in catalog order
+    threshold = np.partition(scores, n - k)[n - k]
+    candidates = np.flatnonzero(scores >= threshold)
+    return candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row-wise top_k_indexes for a profiles x jobs score matrix"""
+    n = scores.shape[1]
+    if k >= n or n < PARTIAL_SELECT_MIN_JOBS:
+        return np.argsort(-scores, axis=1, kind="stable")[:, :max(k, 0)]
+    if k <= 0:
+        return np.empty((len(scores), 0), dtype=np.intp)
+    selected = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    # Catalog order first, then a stable sort by score breaks ties like a full stable sort
+    selected.sort(axis=1)
+    order = np.argsort(-np.take_along_axis(scores, selected, axis=1), axis=1, kind="stable")
+    top = np.take_along_axis(selected, order, axis=1)
+
+    # Rows with ties straddling the k-th place may have kept the wrong tied job; redo those exactly
+    kth = np.take_along_axis(scores, top[:, -1:], axis=1)
+    for row in np.flatnonzero((scores >= kth).sum(axis=1) > k):
+        top[row] = top_k_indexes(scores[row], k)
+    return top
+
+
+class JobRanking:
+    """One profile scored against every job, with lazy top-k selection and paging over the result"""
+
+    def __init__(self, job_names: List[str], components: np.ndarray, overall: np.ndarray):
+        self.job_names = job_names
+        self.components = components
+        self.overall = overall
+        # Shared through the score cache, so freeze the arrays
+        self.components.flags.writeable = False
+        self.overall.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.job_names)
+
+    def page_indexes(self, offset: int = 0, limit: Optional[int] = None) -> np.ndarray:
+        """Job indexes ranked offset .. offset + limit (all remaining jobs if limit is None)"""
+        offset = max(offset, 0)
+        end = len(self) if limit is None else min(offset + max(limit, 0), len(self))
+        if offset >= end:
+            return np.empty(0, dtype=np.intp)
+        return top_k_indexes(self.overall, end)[offset:]
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """Job names ranked offset .. offset + limit, without re-scoring"""
+        return [self.job_names[i] for i in self.page_indexes(offset, limit)]
+
+    def job_scores(self, job_index: int) -> Tuple[np.ndarray, float]:
+        """(components, overall) of one job"""
+        return self.components[job_index], self.overall[job_index]
+
+    def position(self, job_index: int) -> int:
+        """1-based rank of a job, ties ordered by catalog position like the ranking itself"""
+        score = self.overall[job_index]
+        return int((self.overall > score).sum() + (self.overall[:job_index] == score).sum()) + 1
+
+
+class TopKMatches:
+    """Exact scores of one profile's best k jobs, and how many jobs were pruned before exact scoring"""
+
+    def __init__(self, job_names: List[str], job_indexes: np.ndarray, components: np.ndarray,
+                 overall: np.ndarray, jobs_pruned: int):
+        self.job_indexes = [int(j) for j in job_indexes]
+        self.job_names = [job_names[j] for j in self.job_indexes]
+        self.jobs_pruned = jobs_pruned
+        self.components = components
+        self.overall = overall
+        # Shared through the score cache, so freeze the arrays
+        self.components.flags.writeable = False
+        self.overall.flags.writeable = False
+        self._positions = {j: i for i, j in enumerate(self.job_indexes)}
+
+    def __len__(self) -> int:
+        return len(self.job_indexes)
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """Job names ranked offset .. offset + limit within the top k"""
+        offset = max(offset, 0)
+        return self.job_names[offset:] if limit is None else self.job_names[offset:offset + max(limit, 0)]
+
+    def job_scores(self, job_index: int) -> Tuple[np.ndarray, float]:
+        """(components, overall) of one of the selected jobs"""
+        position = self._positions[job_index]
+        return self.components[position], self.overall[position]
+
+
+# Score holders accepted by calculate_job_match
+RankedScores = Union[JobRanking, TopKMatches]
+
+
+class PruningStats:
+    """Counters for bound-based pruning in top-k requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.jobs_considered = 0
+        self.jobs_pruned = 0
+        self.last_pruned = 0
+
+    def record(self, jobs_considered: int, jobs_pruned: int):
+        with self._lock:
+            self.requests += 1
+            self.jobs_considered += jobs_considered
+            self.jobs_pruned += jobs_pruned
+            self.last_pruned = jobs_pruned
+
+    def stats(self) -> Dict:
+        """Pruned job counts for monitoring"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "jobs_considered": self.jobs_considered,
+                "jobs_pruned": self.jobs_pruned,
+                "last_request_pruned": self.last_pruned,
+                "prune_rate": round(self.jobs_pruned / self.jobs_considered, 4) if self.jobs_considered else 0.0
+            }
+
+
+class JobMatrix:
+    """Dense NumPy view of a job catalog, compiled once and reused for every profile"""
+
+    # Dimension vocabularies, one per scored job field
+    VOCABULARIES = ["skill_keys", "value_keys", "interest_keys", "work_style_keys"]
+
+    # Compiled arrays, everything a snapshot has to store to rebuild the matrix
+    ARRAYS = ["skills", "work_values", "interests", "work_styles",
+              "skill_weight_sums", "value_weight_sums", "interest_weight_sums", "work_style_weight_sums",
+              "has_skills", "has_values", "has_work_styles",
+              "skill_slots", "skill_slot_weights", "value_slots", "value_slot_weights",
+              "interest_slots", "interest_slot_weights", "work_style_slots", "work_style_slot_weights",
+              "skill_slot_norms", "value_slot_norms", "work_style_slot_norms"]
+
+    def __init__(self, onet_jobs: Dict):
+        self.job_names = list(onet_jobs.keys())
+        self.job_index = {name: i for i, name in enumerate(self.job_names)}
+        jobs = [onet_jobs[name] for name in self.job_names]
+        self.onet_codes = [job["onet_code"] for job in jobs]
+
+        # Dimension vocabularies: canonical profile keys first, then anything extra the catalog uses
+        self.skill_keys = self._collect_keys(PROFILE_SKILLS, jobs, "skills")
+        self.value_keys = self._collect_keys(WORK_VALUES, jobs, "work_values")
+        self.interest_keys = self._collect_keys(INTERESTS, jobs, "interests")
+        self.work_style_keys = self._collect_keys(list(WORK_STYLE_TRAITS), jobs, "work_styles")
+
+        # Dense jobs x dimension importance matrices (0.0 where the job does not list the dimension)
+        self.skills = self._dense(jobs, "skills", self.skill_keys)
+        self.work_values = self._dense(jobs, "work_values", self.value_keys)
+        self.interests = self._dense(jobs, "interests", self.interest_keys)
+        self.work_styles = self._dense(jobs, "work_styles", self.work_style_keys)
+
+        # Precomputed weight sums, accumulated in each job's own key order
+        self.skill_weight_sums = np.array([float(sum(job["skills"].values())) for job in jobs])
+        self.value_weight_sums = np.array([float(sum(job["work_values"].values())) for job in jobs])
+        self.interest_weight_sums = np.array([float(sum(job["interests"].values())) for job in jobs])
+        self.work_style_weight_sums = np.array([float(sum(job.get("work_styles", {}).values())) for job in jobs])
+        self.has_skills = np.array([bool(job["skills"]) for job in jobs])
+        self.has_values = np.array([bool(job["work_values"]) for job in jobs])
+        self.has_work_styles = np.array([bool(job.get("work_styles")) for job in jobs])
+
+        # Slot layout (jobs x max dimensions per job) keeping each job's dict order, so the
+        # vectorized sums add terms in the same order as the original per-job loops
+        self.skill_slots, self.skill_slot_weights = self._slots(jobs, "skills", self.skill_keys)
+        self.value_slots, self.value_slot_weights = self._slots(jobs, "work_values", self.value_keys)
+        self.interest_slots, self.interest_slot_weights = self._slots(jobs, "interests", self.interest_keys)
+        self.work_style_slots, self.work_style_slot_weights = self._slots(jobs, "work_styles", self.work_style_keys)
+        # Slot weights on the 0-1 scale the formulas compare levels on (the same division, done once)
+        self.skill_slot_norms = self.skill_slot_weights / 5.0
+        self.value_slot_norms = self.value_slot_weights / 5.0
+        self.work_style_slot_norms = self.work_style_slot_weights / 5.0
+
+    @classmethod
+    def from_arrays(cls, job_names: List[str], onet_codes: List[str], keys: Dict[str, List[str]],
+                    arrays: Dict[str, np.ndarray]) -> "JobMatrix":
+        """Rebuild a compiled catalog around stored arrays (e.g. memory-mapped ones) without copying them"""
+        matrix = cls.__new__(cls)
+        matrix.job_names = job_names
+        matrix.job_index = {name: i for i, name in enumerate(job_names)}
+        matrix.onet_codes = onet_codes
+        for attribute in cls.VOCABULARIES:
+            setattr(matrix, attribute, keys[attribute])
+        for name in cls.ARRAYS:
+            setattr(matrix, name, arrays[name])
+        return matrix
+
+    @classmethod
+    def for_catalog(cls, onet_jobs: Dict) -> "JobMatrix":
+        """Compiled view of a catalog, reusing a snapshot's stored arrays instead of recompiling"""
+        stored = getattr(onet_jobs, "job_matrix", None)
+        return stored() if stored is not None else cls(onet_jobs)
+
+    def __len__(self) -> int:
+        return len(self.job_names)
+
+    @staticmethod
+    def _collect_keys(canonical: List[str], jobs: List[Dict], field: str) -> List[str]:
+        keys = list(canonical)
+        seen = set(keys)
+        for job in jobs:
+            for key in job.get(field, {}):
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+        return keys
+
+    @staticmethod
+    def _dense(jobs: List[Dict], field: str, keys: List[str]) -> np.ndarray:
+        column = {key: i for i, key in enumerate(keys)}
+        matrix = np.zeros((len(jobs), len(keys)))
+        for row, job in enumerate(jobs):
+            for key, importance in job.get(field, {}).items():
+                matrix[row, column[key]] = importance
+        return matrix
+
+    @staticmethod
+    def _slots(jobs: List[Dict], field: str, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        column = {key: i for i, key in enumerate(keys)}
+        width = max((len(job.get(field, {})) for job in jobs), default=0)
+        # Padding slots point at column 0 with zero weight, which contributes exactly 0.0
+        slots = np.zeros((len(jobs), width), dtype=np.intp)
+        weights = np.zeros((len(jobs), width))
+        for row, job in enumerate(jobs):
+            for k, (key, importance) in enumerate(job.get(field, {}).items()):
+                slots[row, k] = column[key]
+                weights[row, k] = importance
+        return slots, weights
+
+
+class PythonBackend:
+    """Reference backend: walks each job's dicts with the original per-job formulas"""
+
+    name = "python"
+
+    def __init__(self, onet_jobs: Dict):
+        self.onet_jobs = onet_jobs
+        self.job_names = list(onet_jobs.keys())
+
+    def score_profiles(self, profiles: List, job_indexes: Optional[List[int]] = None) -> np.ndarray:
+        """Return a profiles x jobs x 4 array of (skills, values, interests, work styles) scores in 0-1"""
+        names = self.job_names if job_indexes is None else [self.job_names[j] for j in job_indexes]
+        scores = np.zeros((len(profiles), len(names), len(COMPONENTS)))
+        for row, profile in enumerate(profiles):
+            skills, work_values, personality = profile.skills, profile.work_values, profile.personality
+            for column, job_name in enumerate(names):
+                job = self.onet_jobs[job_name]
+                scores[row, column] = (
+                    self.skills_match(skills, job["skills"]),
+                    self.values_match(work_values, job["work_values"]),
+                    self.interests_match(profile.interests, job["interests"]),
+                    self.work_styles_match(personality, job.get("work_styles", {}))
+                )
+        return scores
+
+    def score_matrix(self, matrix, job_indexes: Optional[List[int]] = None) -> np.ndarray:
+        """Score a compact N x len(PROFILE_COLUMNS) profile array"""
+        return self.score_profiles(profiles_from_matrix(matrix), job_indexes)
+
+    @staticmethod
+    def skills_match(user_skills: Dict, job_skills: Dict) -> float:
+        """Calculate skills compatibility score"""
+        scores = []
+
+        for skill, importance in job_skills.items():
+            user_level = user_skills.get(skill, DEFAULT_SKILL_LEVEL)
+
+            # Normalize both to 0-1 scale
+            normalized_importance = importance / 5.0
+            normalized_user = user_level / 5.0
+
+            # Calculate match (penalize being too far below requirement)
+            if normalized_user >= normalized_importance:
+                score = 1.0
+            else:
+                gap = normalized_importance - normalized_user
+                score = max(0, 1 - (gap * 2))
+
+            scores.append(score * normalized_importance)
+
+        return sum(scores) / sum(job_skills.values()) * 5 if scores else 0
+
+    @staticmethod
+    def values_match(user_values: Dict, job_values: Dict) -> float:
+        """Calculate work values compatibility"""
+        scores = []
+
+        for value, job_importance in job_values.items():
+            user_importance = user_values.get(value, DEFAULT_VALUE_LEVEL)
+
+            # Normalize to 0-1 (user values are on a 1-6 scale)
+            norm_job = job_importance / 5.0
+            norm_user = user_importance / 6.0
+
+            # Calculate similarity (closer values = higher score)
+            difference = abs(norm_job - norm_user)
+            similarity = 1 - difference
+
+            scores.append(similarity * norm_job)
+
+        return sum(scores) / sum(job_values.values()) * 5 if scores else 0
+
+    @staticmethod
+    def interests_match(user_interests: List[str], job_interests: Dict) -> float:
+        """Calculate interests compatibility"""
+        if not user_interests:
+            return 0.5
+
+        total_score = 0
+        max_possible = 0
+
+        for interest, importance in job_interests.items():
+            max_possible += importance
+            if interest in user_interests:
+                total_score += importance
+
+        return (total_score / max_possible) if max_possible > 0 else 0
+
+    @staticmethod
+    def work_styles_match(personality: Dict, job_work_styles: Dict) -> float:
+        """Calculate work styles compatibility based on personality traits"""
+        if not job_work_styles:
+            return 0.5
+
+        scores = []
+        for style, importance in job_work_styles.items():
+            user_level = work_style_level(personality, style)
+
+            norm_importance = importance / 5.0
+            norm_user = user_level / 5.0
+
+            # 80% of the requirement counts as a full match
+            if norm_user >= norm_importance * 0.8:
+                score = 1.0
+            else:
+                gap = (norm_importance * 0.8) - norm_user
+                score = max(0, 1 - (gap * 2))
+
+            scores.append(score * norm_importance)
+
+        return sum(scores) / sum(job_work_styles.values()) * 5 if scores else 0
+
+
+class NumpyBackend:
+    """Vectorized backend: scores every job of a compiled JobMatrix in a few array operations"""
+
+    name = "numpy"
+
+    def __init__(self, onet_jobs: Dict):
+        self.catalog = JobMatrix.for_catalog(onet_jobs)
+
+    def score_profiles(self, profiles: List, job_indexes: Optional[List[int]] = None) -> np.ndarray:
+        """Return a profiles x jobs x 4 array of (skills, values, interests, work styles) scores in 0-1"""
+        return self.component_scores(self.encode_profiles(profiles), job_indexes)
+
+    def score_matrix(self, matrix, job_indexes: Optional[List[int]] = None) -> np.ndarray:
+        """Score a compact N x len(PROFILE_COLUMNS) profile array"""
+        return self.component_scores(self.encode_profile_matrix(matrix), job_indexes)
+
+    def encode_profiles(self, profiles: List) -> Dict[str, np.ndarray]:
+        """Convert PersonProfile objects into aligned profile x dimension arrays"""
+        if profiles and all(isinstance(p, Profile) for p in profiles):
+            return self.encode_levels(profiles)
+        catalog = self.catalog
+        n = len(profiles)
+        skills = np.array([[p.skills.get(k, DEFAULT_SKILL_LEVEL) for k in catalog.skill_keys]
+                           for p in profiles], dtype=float).reshape(n, len(catalog.skill_keys))
+        values = np.array([[p.work_values.get(k, DEFAULT_VALUE_LEVEL) for k in catalog.value_keys]
+                           for p in profiles], dtype=float).reshape(n, len(catalog.value_keys))
+        interests = np.array([[k in p.interests for k in catalog.interest_keys]
+                              for p in profiles], dtype=bool).reshape(n, len(catalog.interest_keys))
+        styles = np.array([[work_style_level(p.personality, k) for k in catalog.work_style_keys]
+                           for p in profiles], dtype=float).reshape(n, len(catalog.work_style_keys))
+        has_interests = np.array([bool(p.interests) for p in profiles], dtype=bool)
+        return {
+            "skills": skills,
+            "work_values": values,
+            "interests": interests,
+            "has_interests": has_interests,
+            "work_styles": styles
+        }
+
+    def encode_levels(self, profiles: List[Profile]) -> Dict[str, np.ndarray]:
+        """Convert Profile objects into aligned arrays from their fixed-order levels, without dict lookups"""
+        catalog = self.catalog
+        n = len(profiles)
+        # None (unanswered) becomes NaN, then the field's default
+        levels = np.array([p.levels for p in profiles], dtype=float).reshape(n, len(PROFILE_LEVELS))
+        n_traits, n_values = len(PERSONALITY_TRAITS), len(WORK_VALUES)
+        personality = np.nan_to_num(levels[:, :n_traits], nan=DEFAULT_TRAIT_LEVEL)
+
+        # Vocabularies start with the canonical keys, so levels fill the leading columns
+        skills = np.full((n, len(catalog.skill_keys)), DEFAULT_SKILL_LEVEL)
+        skills[:, :len(PROFILE_SKILLS)] = np.nan_to_num(levels[:, n_traits + n_values:], nan=DEFAULT_SKILL_LEVEL)
+        values = np.full((n, len(catalog.value_keys)), DEFAULT_VALUE_LEVEL)
+        values[:, :n_values] = np.nan_to_num(levels[:, n_traits:n_traits + n_values], nan=DEFAULT_VALUE_LEVEL)
+        columns = {"skills": {key: i for i, key in enumerate(catalog.skill_keys)},
+                   "work_values": {key: i for i, key in enumerate(catalog.value_keys)}}
+        for row, profile in enumerate(profiles):
+            for field, key, level in profile.extras:
+                column = columns.get(field, {}).get(key)
+                if column is not None:
+                    (skills if field == "skills" else values)[row, column] = level
+
+        interests = np.array([[k in p.interests for k in catalog.interest_keys]
+                              for p in profiles], dtype=bool).reshape(n, len(catalog.interest_keys))
+        styles = np.full((n, len(catalog.work_style_keys)), DEFAULT_WORK_STYLE_LEVEL)
+        for column, style in enumerate(catalog.work_style_keys):
+            trait = WORK_STYLE_TRAITS.get(style)
+            if trait is not None:
+                level = personality[:, PERSONALITY_TRAITS.index(trait)]
+                styles[:, column] = 5 - level if trait == "neuroticism" else level
+
+        return {
+            "skills": skills,
+            "work_values": values,
+            "interests": interests,
+            "has_interests": np.array([bool(p.interests) for p in profiles], dtype=bool),
+            "work_styles": styles
+        }
+
+    def encode_profile_matrix(self, matrix) -> Dict[str, np.ndarray]:
+        """Convert a compact N x len(PROFILE_COLUMNS) integer array into aligned profile arrays"""
+        catalog = self.catalog
+        personality, rankings, skill_levels, interest_flags = split_profile_matrix(matrix)
+
+        # Vocabularies start with the canonical keys, so inputs fill the leading columns
+        n = len(personality)
+        skills = np.full((n, len(catalog.skill_keys)), DEFAULT_SKILL_LEVEL)
+        skills[:, :len(PROFILE_SKILLS)] = skill_levels
+        values = np.full((n, len(catalog.value_keys)), DEFAULT_VALUE_LEVEL)
+        values[:, :len(WORK_VALUES)] = 7 - rankings
+        interests = np.zeros((n, len(catalog.interest_keys)), dtype=bool)
+        interests[:, :len(INTERESTS)] = interest_flags == 1
+
+        styles = np.full((n, len(catalog.work_style_keys)), DEFAULT_WORK_STYLE_LEVEL)
+        for column, style in enumerate(catalog.work_style_keys):
+            trait = WORK_STYLE_TRAITS.get(style)
+            if trait is not None:
+                level = personality[:, PERSONALITY_TRAITS.index(trait)]
+                styles[:, column] = 5 - level if trait == "neuroticism" else level
+
+        return {
+            "skills": skills,
+            "work_values": values,
+            "interests": interests,
+            "has_interests": interests.any(axis=1),
+            "work_styles": styles
+        }
+
+    def component_scores(self, encoded: Dict[str, np.ndarray], job_indexes: Optional[List[int]] = None) -> np.ndarray:
+        """Return a profiles x jobs x 4 array of (skills, values, interests, work styles) scores in 0-1"""
+        rows = slice(None) if job_indexes is None else np.asarray(job_indexes, dtype=np.intp)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skills = self._skills_scores(encoded, rows)
+            values = self._values_scores(encoded, rows)
+            interests = self._interests_scores(encoded, rows)
+            work_styles = self._work_styles_scores(encoded, rows)
+
+        return np.stack([skills, values, interests, work_styles], axis=-1)
+
+    def _skills_scores(self, encoded: Dict[str, np.ndarray], rows: Union[slice, np.ndarray]) -> np.ndarray:
+        """Skills: full credit at or above the requirement, linear penalty below it"""
+        catalog = self.catalog
+        norm_importance = catalog.skill_slot_norms[rows]
+        norm_user = encoded["skills"][:, catalog.skill_slots[rows]] / 5.0
+        gap = norm_importance - norm_user
+        score = np.where(norm_user >= norm_importance, 1.0, np.maximum(0, 1 - (gap * 2)))
+        skills = _ordered_sum(score * norm_importance) / catalog.skill_weight_sums[rows] * 5
+        return np.where(catalog.has_skills[rows], skills, 0.0)
+
+    def _values_scores(self, encoded: Dict[str, np.ndarray], rows: Union[slice, np.ndarray]) -> np.ndarray:
+        """Work values: similarity of job importance (1-5) and user preference (1-6)"""
+        catalog = self.catalog
+        norm_job = catalog.value_slot_norms[rows]
+        norm_user = encoded["work_values"][:, catalog.value_slots[rows]] / 6.0
+        similarity = 1 - np.abs(norm_job - norm_user)
+        values = _ordered_sum(similarity * norm_job) / catalog.value_weight_sums[rows] * 5
+        return np.where(catalog.has_values[rows], values, 0.0)
+
+    def _interests_scores(self, encoded: Dict[str, np.ndarray], rows: Union[slice, np.ndarray]) -> np.ndarray:
+        """Interests: share of the job's interest weight covered by the user's interests"""
+        catalog = self.catalog
+        weight_sums = catalog.interest_weight_sums[rows]
+        selected = encoded["interests"][:, catalog.interest_slots[rows]]
+        covered = _ordered_sum(np.where(selected, catalog.interest_slot_weights[rows], 0.0))
+        interests = np.where(weight_sums > 0, covered / weight_sums, 0.0)
+        return np.where(encoded["has_interests"][:, None], interests, 0.5)
+
+    def _work_styles_scores(self, encoded: Dict[str, np.ndarray], rows: Union[slice, np.ndarray]) -> np.ndarray:
+        """Work styles: personality-derived level against 80% of the job requirement"""
+        catalog = self.catalog
+        norm_importance = catalog.work_style_slot_norms[rows]
+        norm_user = encoded["work_styles"][:, catalog.work_style_slots[rows]] / 5.0
+        gap = (norm_importance * 0.8) - norm_user
+        score = np.where(norm_user >= norm_importance * 0.8, 1.0, np.maximum(0, 1 - (gap * 2)))
+        work_styles = _ordered_sum(score * norm_importance) / catalog.work_style_weight_sums[rows] * 5
+        return np.where(catalog.has_work_styles[rows], work_styles, 0.5)
+
+
+class LookupTableBackend(NumpyBackend):
+    """
+    Gather-and-sum backend exploiting the small integer input domain
+    Each job's contribution for every (dimension slot, level) pair is precomputed at catalog load for
+    skills, values and work styles, so scoring is one table gather plus an ordered sum per job.
+    Profiles with levels off the half-step grid (never produced by the API or CSV parser) fall back
+    to the NumPy formulas.
+    """
+
+    name = "lookup"
+
+    # Table-driven components and where they sit in the 4-component score array
+    TABLE_COMPONENTS = [0, 1, 3]
+
+    # Score estimates are within this of the exact overall score; either sum rounds off by < 1e-14
+    ESTIMATE_TOLERANCE = 1e-9
+
+    # Derived tables a catalog snapshot stores, so workers map them instead of each building a copy
+    STORED_ARRAYS = ["table", "slot_columns", "table_offsets", "weight_sums", "has_weights",
+                     "feature_weights", "interest_weights", "estimate_base"]
+
+    def __init__(self, onet_jobs: Dict):
+        super().__init__(onet_jobs)
+        self.empty_scores = np.array([0.0, 0.0, 0.5])
+        stored = stored_state(onet_jobs, self.name)
+        if stored is not None:
+            arrays, _ = stored
+            for name in self.STORED_ARRAYS:
+                setattr(self, name, arrays[name])
+        else:
+            self._build_tables()
+
+    def snapshot_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Arrays (and metadata) for a catalog snapshot to store"""
+        return {name: getattr(self, name) for name in self.STORED_ARRAYS}, {}
+
+    def _build_tables(self):
+        catalog = self.catalog
+        levels = LEVEL_GRID[None, None, :]
+
+        # jobs x slots x levels tables, built with the same float operations as the formulas
+        norm_importance = catalog.skill_slot_norms[:, :, None]
+        norm_user = levels / 5.0
+        gap = norm_importance - norm_user
+        score = np.where(norm_user >= norm_importance, 1.0, np.maximum(0, 1 - (gap * 2)))
+        skill_table = score * norm_importance
+
+        norm_job = catalog.value_slot_norms[:, :, None]
+        norm_user = levels / 6.0
+        value_table = (1 - np.abs(norm_job - norm_user)) * norm_job
+
+        norm_importance = catalog.work_style_slot_norms[:, :, None]
+        norm_user = levels / 5.0
+        gap = (norm_importance * 0.8) - norm_user
+        score = np.where(norm_user >= norm_importance * 0.8, 1.0, np.maximum(0, 1 - (gap * 2)))
+        work_style_table = score * norm_importance
+
+        # Stack the three tables as jobs x component x slot x level, padding slots with zero contributions.
+        # Slot columns index the concatenated (skills, values, work styles) profile level vector.
+        tables = [skill_table, value_table, work_style_table]
+        slots = [catalog.skill_slots,
+                 catalog.value_slots + len(catalog.skill_keys),
+                 catalog.work_style_slots + len(catalog.skill_keys) + len(catalog.value_keys)]
+        width = max(table.shape[1] for table in tables)
+        self.table = np.zeros((len(catalog), len(tables), width, len(LEVEL_GRID)))
+        self.slot_columns = np.zeros((len(catalog), len(tables), width), dtype=np.intp)
+        for c, (table, columns) in enumerate(zip(tables, slots)):
+            self.table[:, c, :table.shape[1]] = table
+            self.slot_columns[:, c, :columns.shape[1]] = columns
+
+        # Flat offset of (job, component, slot, level 0) so a gather is a single np.take
+        self.table_offsets = np.arange(self.slot_columns.size).reshape(self.slot_columns.shape) * len(LEVEL_GRID)
+        self.weight_sums = np.stack([catalog.skill_weight_sums, catalog.value_weight_sums,
+                                     catalog.work_style_weight_sums], axis=-1)
+        self.has_weights = np.stack([catalog.has_skills, catalog.has_values, catalog.has_work_styles], axis=-1)
+
+        # Dense form of the tables for score estimates: (profile column, level) feature x job, holding the
+        # job's weighted contribution to the overall score, so an estimate is a sum of contiguous rows
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(self.has_weights, COMPONENT_WEIGHTS[self.TABLE_COMPONENTS] * 5 / self.weight_sums, 0.0)
+        features = self.slot_columns[..., None] * len(LEVEL_GRID) + np.arange(len(LEVEL_GRID))
+        jobs = np.broadcast_to(np.arange(len(catalog))[:, None, None, None], features.shape)
+        n_columns = len(catalog.skill_keys) + len(catalog.value_keys) + len(catalog.work_style_keys)
+        self.feature_weights = np.zeros((n_columns * len(LEVEL_GRID), len(catalog)))
+        np.add.at(self.feature_weights, (features.ravel(), jobs.ravel()),
+                  (self.table * scale[:, :, None, None]).ravel())
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.interest_weights = np.where(catalog.interest_weight_sums > 0,
+                                             catalog.interests.T * COMPONENT_WEIGHTS[2] / catalog.interest_weight_sums, 0.0)
+        self.estimate_base = np.where(catalog.has_work_styles, 0.0, 0.5 * COMPONENT_WEIGHTS[3])
+
+    @staticmethod
+    def level_codes(encoded: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """Concatenated skills/values/work styles levels as LEVEL_GRID positions, or None if off the grid"""
+        scaled = np.concatenate([encoded["skills"], encoded["work_values"], encoded["work_styles"]], axis=1) * 2
+        codes = scaled.astype(np.intp)
+        if codes.size and not ((codes == scaled).all() and codes.min() >= 0 and codes.max() < len(LEVEL_GRID)):
+            return None
+        return codes
+
+    def component_scores(self, encoded: Dict[str, np.ndarray], job_indexes: Optional[List[int]] = None) -> np.ndarray:
+        """Return a profiles x jobs x 4 array of (skills, values, interests, work styles) scores in 0-1"""
+        codes = self.level_codes(encoded)
+        if codes is None:
+            return super().component_scores(encoded, job_indexes)
+        rows = slice(None) if job_indexes is None else np.asarray(job_indexes, dtype=np.intp)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            contributions = np.take(self.table, self.table_offsets[rows] + np.take(codes, self.slot_columns[rows], axis=1))
+            table_scores = _ordered_sum(contributions) / self.weight_sums[rows] * 5
+            table_scores = np.where(self.has_weights[rows], table_scores, self.empty_scores)
+
+            scores = np.empty(table_scores.shape[:2] + (len(COMPONENTS),))
+            scores[..., self.TABLE_COMPONENTS] = table_scores
+            scores[..., 2] = self._interests_scores(encoded, rows)
+        return scores
+
+    def score_estimates(self, encoded: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """Overall scores within ESTIMATE_TOLERANCE for every job (profiles x jobs), or None off the level grid"""
+        codes = self.level_codes(encoded)
+        if codes is None:
+            return None
+        features = np.arange(codes.shape[1]) * len(LEVEL_GRID) + codes
+        estimates = np.take(self.feature_weights, features, axis=0).sum(axis=1)
+        interests = np.where(encoded["has_interests"][:, None],
+                             encoded["interests"].astype(float) @ self.interest_weights, 0.5 * COMPONENT_WEIGHTS[2])
+        return estimates + interests + self.estimate_base
+
+
+BACKENDS = {
+    PythonBackend.name: PythonBackend,
+    NumpyBackend.name: NumpyBackend,
+    LookupTableBackend.name: LookupTableBackend
+}
+
+
+# Fastest exact backend on the benchmarks (python benchmarks.py scoring)
+DEFAULT_BACKEND = LookupTableBackend.name
+
+
+class ScoringEngine:
+    """Job matching for one catalog: ranking, per-job breakdowns and strengths/improvements"""
+
+    def __init__(self, onet_jobs: Dict, backend: str = DEFAULT_BACKEND, cache: Optional[ScoreCache] = None,
+                 jobs: Optional[List[Job]] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown scoring backend '{backend}', expected one of {sorted(BACKENDS)}")
+        self.onet_jobs = onet_jobs
+        self.job_names = list(onet_jobs.keys())
+        self.job_index = {name: i for i, name in enumerate(self.job_names)}
+        self.catalog_version = catalog_version(onet_jobs)
+        self.backend = BACKENDS[backend](onet_jobs)
+        self.cache = cache
+        self.pruning = PruningStats()
+        self._dimension_jobs = None
+        # Job views by index, compiled at load (pass catalog_compiler's jobs to skip compiling them again)
+        self.jobs = jobs if jobs is not None else [Job(name, onet_jobs[name]) for name in self.job_names]
+
+    @property
+    def dimension_jobs(self) -> Dict[Tuple[str, str], List[int]]:
+        """Jobs whose score terms read each profile answer, for incremental re-scoring (built on first use)"""
+        if self._dimension_jobs is None:
+            dimension_jobs = {}
+            for index, job in enumerate(self.onet_jobs.values()):
+                for field in ("skills", "work_values", "interests", "work_styles"):
+                    for key in job.get(field, {}):
+                        dimension_jobs.setdefault((field, key), []).append(index)
+            self._dimension_jobs = dimension_jobs
+        return self._dimension_jobs
+
+    def job(self, job_index: int) -> Job:
+        """Slotted view of one catalog job (O*NET code, required skills and levels)"""
+        return self.jobs[job_index]
+
+    def _cached(self, method: str, profile, argument, compute, copy_value: bool = True):
+        if self.cache is None:
+            return compute()
+        key = (self.catalog_version, method, profile_fingerprint(profile), argument)
+        return self.cache.get_or_compute(key, compute, copy_value)
+
+    @staticmethod
+    def overall_scores(components: np.ndarray) -> np.ndarray:
+        """Collapse component scores into the weighted overall match (0-1)"""
+        return combine_components(components[..., 0], components[..., 1],
+                                  components[..., 2], components[..., 3])
+
+    def score_profile(self, profile) -> Tuple[np.ndarray, np.ndarray]:
+        """Score one profile against every job, returning (components, overall) arrays"""
+        components = self.backend.score_profiles([profile])[0]
+        return components, self.overall_scores(components)
+
+    def rank(self, profile) -> JobRanking:
+        """Score a profile against every job once; pages of the ranking are selected from these scores"""
+        return self._cached("rank", profile, None, lambda: JobRanking(self.job_names, *self.score_profile(profile)),
+                            copy_value=False)
+
+    def top_k(self, profile, k: int = 3) -> TopKMatches:
+        """
+        Best k jobs with exact scores, ties kept in catalog order
+        On large catalogs, jobs whose estimated upper bound is below the k-th best lower bound are pruned
+        before exact scoring
+        """
+        return self._cached("top_k", profile, k, lambda: self._top_k(profile, k), copy_value=False)
+
+    def _top_k(self, profile, k: int) -> TopKMatches:
+        n = len(self.job_names)
+        estimates = None
+        if n >= PRUNE_MIN_JOBS and 0 < k < n and hasattr(self.backend, "score_estimates"):
+            encoded = self.backend.encode_profiles([profile])
+            estimates = self.backend.score_estimates(encoded)
+
+        if estimates is None:
+            ranking = self.rank(profile)
+            job_indexes = ranking.page_indexes(0, k)
+            matches = TopKMatches(self.job_names, job_indexes, ranking.components[job_indexes],
+                                  ranking.overall[job_indexes], 0)
+        else:
+            # A job below threshold is beaten by k jobs even at its bound, so it cannot reach the top k or tie
+            tolerance = self.backend.ESTIMATE_TOLERANCE
+            estimates = estimates[0]
+            threshold = np.partition(estimates - tolerance, n - k)[n - k]
+            candidates = np.flatnonzero(estimates + tolerance >= threshold)
+            components = self.backend.component_scores(encoded, candidates)[0]
+            overall = self.overall_scores(components)
+            order = top_k_indexes(overall, k)
+            matches = TopKMatches(self.job_names, candidates[order], components[order], overall[order],
+                                  n - len(candidates))
+
+        self.pruning.record(n, matches.jobs_pruned)
+        return matches
+
+    def top_job_matches(self, profile, top_n: int = 3, offset: int = 0) -> List[str]:
+        """Return the top N job names (after skipping offset), ties kept in catalog order like a stable sort"""
+        if offset <= 0 and len(self.job_names) >= PRUNE_MIN_JOBS:
+            return list(self.top_k(profile, top_n).job_names)
+        return self.rank(profile).page(offset, top_n)
+
+    def rank_batch(self, profiles, top_k: int = 3) -> List[List[Dict]]:
+        """
+        Rank every job for many profiles, returning the top K matches with breakdowns per profile
+        Accepts PersonProfile-like objects or a compact N x len(PROFILE_COLUMNS) integer array
+        """
+        if isinstance(profiles, list) and profiles and hasattr(profiles[0], "skills"):
+            score_chunk = self.backend.score_profiles
+        else:
+            profiles = np.asarray(profiles, dtype=float)
+            if profiles.size == 0:
+                return []
+            score_chunk = self.backend.score_matrix
+
+        results = []
+        for start in range(0, len(profiles), BATCH_CHUNK_SIZE):
+            components = score_chunk(profiles[start:start + BATCH_CHUNK_SIZE])
+            overall = self.overall_scores(components)
+            order = top_k_rows(overall, top_k)
+            for row, job_indexes in enumerate(order):
+                results.append([self.match_summary(j, components[row, j], overall[row, j])
+                                for j in job_indexes])
+        return results
+
+    def match_summary(self, job_index: int, components: np.ndarray, overall: float) -> Dict:
+        """Score fields of a job match, rounded to one decimal percentage"""
+        skills_score, values_score, interests_score, work_styles_score = (float(c) for c in components)
+        job_name = self.job_names[job_index]
+        return {
+            "job_name": job_name,
+            "onet_code": self.job(job_index).onet_code,
+            "overall_match": round(float(overall) * 100, 1),
+            "breakdown": {
+                "skills_match": round(skills_score * 100, 1),
+                "values_match": round(values_score * 100, 1),
+                "interests_match": round(interests_score * 100, 1),
+                "work_styles_match": round(work_styles_score * 100, 1)
+            }
+        }
+
+    def calculate_job_match(self, profile, job_name: str, ranking: Optional[RankedScores] = None) -> Dict:
+        """
+        Calculate comprehensive match percentage and details for a specific job
+        Reuses the scores of ranking (a JobRanking or TopKMatches holding the job) instead of scoring it again
+        """
+        return self._cached("calculate_job_match", profile, job_name,
+                            lambda: self._calculate_job_match(profile, job_name, ranking))
+
+    def _calculate_job_match(self, profile, job_name: str, ranking: Optional[RankedScores]) -> Dict:
+        job_index = self.job_index[job_name]
+        job = self.job(job_index)
+
+        if ranking is not None:
+            match = self.match_summary(job_index, *ranking.job_scores(job_index))
+        else:
+            components = self.backend.score_profiles([profile], [job_index])[0, 0]
+            match = self.match_summary(job_index, components, combine_components(*components))
+
+        # Identify strengths and improvement areas
+        strengths, improvements = self.identify_strengths_improvements(profile, job)
+        match["strengths"] = strengths
+        match["improvements"] = improvements
+        match["required_skills"] = job.required_skill_names
+        return match
+
+    def affected_jobs(self, profile, changed_profile) -> np.ndarray:
+        """Indexes of the jobs whose scores can differ between two versions of a profile"""
+        affected = set()
+        for field, levels, changed_levels, default in (
+                ("skills", profile.skills, changed_profile.skills, DEFAULT_SKILL_LEVEL),
+                ("work_values", profile.work_values, changed_profile.work_values, DEFAULT_VALUE_LEVEL)):
+            for key in set(levels) | set(changed_levels):
+                if levels.get(key, default) != changed_levels.get(key, default):
+                    affected.update(self.dimension_jobs.get((field, key), []))
+
+        for field, key in self.dimension_jobs:
+            if field == "work_styles" and (work_style_level(profile.personality, key) !=
+                                           work_style_level(changed_profile.personality, key)):
+                affected.update(self.dimension_jobs[(field, key)])
+
+        # Gaining or losing every interest switches all jobs to or from the neutral interests score
+        interests, changed_interests = set(profile.interests), set(changed_profile.interests)
+        if bool(interests) != bool(changed_interests):
+            return np.arange(len(self.job_names))
+        for key in interests ^ changed_interests:
+            affected.update(self.dimension_jobs.get(("interests", key), []))
+        return np.array(sorted(affected), dtype=np.intp)
+
+    def rescore(self, ranking: JobRanking, changed_profile, job_indexes: np.ndarray) -> JobRanking:
+        """Ranking for a changed profile, re-scoring only job_indexes and reusing ranking's other scores"""
+        components = ranking.components.copy()
+        overall = ranking.overall.copy()
+        if len(job_indexes):
+            components[job_indexes] = self.backend.score_profiles([changed_profile], job_indexes)[0]
+            overall[job_indexes] = self.overall_scores(components[job_indexes])
+        return JobRanking(self.job_names, components, overall)
+
+    def skill_gradient(self, profile, job_indexes: np.ndarray) -> np.ndarray:
+        """
+        Overall score gain per +1 on each PROFILE_SKILLS answer (rows) for each job (columns), in one pass
+        Skills already at 5 have no gain
+        """
+        variants = [profile]
+        for skill in PROFILE_SKILLS:
+            skills = dict(profile.skills)
+            skills[skill] = min(5, skills.get(skill, DEFAULT_SKILL_LEVEL) + 1)
+            variants.append(ScoringProfile(personality=profile.personality, work_values=profile.work_values,
+                                           skills=skills, interests=profile.interests))
+        overall = self.overall_scores(self.backend.score_profiles(variants, job_indexes))
+        return overall[1:] - overall[0]
+
+    def what_if(self, profile, changed_profile, top_n: int = 3, include_gradient: bool = False) -> Dict:
+        """
+        How the top matches move when a profile's answers change
+        Only jobs whose score terms read a changed answer are re-scored; the rest reuse the cached ranking
+        """
+        before = self.rank(profile)
+        affected = self.affected_jobs(profile, changed_profile)
+        after = self.rescore(before, changed_profile, affected)
+
+        top_before = before.page_indexes(0, top_n)
+        top_after = after.page_indexes(0, top_n)
+        rank_changes = []
+        dropped = [j for j in top_before if j not in set(top_after)]
+        for job_index in list(top_after) + dropped:
+            rank_before, rank_after = before.position(job_index), after.position(job_index)
+            overall_before = round(float(before.overall[job_index]) * 100, 1)
+            overall_after = round(float(after.overall[job_index]) * 100, 1)
+            rank_changes.append({
+                "job_name": self.job_names[job_index],
+                "rank_before": rank_before,
+                "rank_after": rank_after,
+                "rank_change": rank_before - rank_after,
+                "overall_match_before": overall_before,
+                "overall_match_after": overall_after,
+                "overall_match_change": round(overall_after - overall_before, 1)
+            })
+
+        result = {
+            "top_matches_before": [self.match_summary(j, *before.job_scores(j)) for j in top_before],
+            "top_matches_after": [self.match_summary(j, *after.job_scores(j)) for j in top_after],
+            "rank_changes": rank_changes,
+            "jobs_rescored": len(affected),
+            "total_jobs_considered": len(self.job_names),
+            "catalog_version": self.catalog_version
+        }
+        if include_gradient:
+            # Gain in overall match percentage points per +1 on each skill, for the new top jobs
+            gradient = self.skill_gradient(changed_profile, top_after)
+            result["skill_gradient"] = {
+                self.job_names[j]: {skill: round(float(gain) * 100, 2) for skill, gain in zip(PROFILE_SKILLS, gradient[:, column])}
+                for column, j in enumerate(top_after)
+            }
+        return result
+
+    def identify_strengths_improvements(self, profile, job: Job) -> Tuple[List[str], List[Dict]]:
+        """Identify user strengths and areas for improvement"""
+        strengths = []
+        improvements = []
+
+        for (skill_name, _, _, job_requirement), user_level in zip(job.required_skills, job.user_levels(profile)):
+            if user_level >= job_requirement:
+                strengths.append(f"Strong {skill_name} skills (Level {user_level}/5)")
+            elif user_level < job_requirement - 0.5:
+                improvements.append({
+                    "skill": skill_name,
+                    "current_level": user_level,
+                    "required_level": job_requirement,
+                    "gap_severity": "High" if job_requirement - user_level > 1.5 else "Medium"
+                })
+
+        return strengths, improvements
+
+
+class CatalogMatcher(ABC):
+    """
+    Ranking, paging and batch analysis shared by the matchers (form.CareerMatcher,
+    insights_generator_new.CareerMatcher and formai.AICareerMatcher)
+    Subclasses set onet_jobs and scoring_engine and implement calculate_job_match (see CourseMatcher);
+    the API matchers implement create_profile_from_request for analyze_batch_request. _analysis_fields adds
+    their own fields to analyze_person's result. preferred_career_match needs a name_resolver
+    (name_resolver.JobNameResolver).
+    """
+
+    @abstractmethod
+    def calculate_job_match(self, profile, job_name: str, ranking: Optional[RankedScores] = None) -> Dict:
+        """Match percentage and details of the profile for a specific job"""
+
+    def preferred_career_match(self, profile, matched_job_names: List[str],
+                               ranking: Optional[RankedScores] = None) -> Dict:
+        """The profile's preferred career resolved to a catalog job and scored, to show next to the matches"""
+        candidates = self.name_resolver.candidates(profile.preferred_career)
+        resolved = self.name_resolver.resolve(profile.preferred_career)
+        result = {"preferred_career": profile.preferred_career, "job_name": resolved, "candidates": candidates}
+        if resolved is not None:
+            result["in_matches"] = resolved in matched_job_names
+            # A full ranking holds every job's scores, a top-k one only its matches
+            scored = ranking if ranking is not None and resolved in ranking.job_names else None
+            result["match"] = self.calculate_job_match(profile, resolved, scored)
+        return result
+
+    def analyze_batch(self, profiles, top_k: int = 3) -> List[Dict]:
+        """
+        Rank all jobs for many profiles in one profiles x jobs matrix computation
+        Accepts a list of PersonProfile objects or a compact N x 33 integer array (see PROFILE_COLUMNS)
+        """
+        return self.scoring_engine.rank_batch(profiles, top_k)
+
+    def analyze_batch_request(self, request: BatchAnalysisRequest) -> Dict:
+        """Result of an /analyze-batch request, top K matches per profile in input order; ValueError on bad input"""
+        if (request.profiles is None) == (request.profile_matrix is None):
+            raise ValueError("Provide exactly one of 'profiles' or 'profile_matrix'")
+        if request.profiles is not None:
+            profiles = [self.create_profile_from_request(p) for p in request.profiles]
+            ranked = self.analyze_batch(profiles, request.top_k)
+            results = [{"name": p.name, "email": p.email, "matches": m} for p, m in zip(profiles, ranked)]
+        else:
+            ranked = self.analyze_batch(request.profile_matrix, request.top_k)
+            results = [{"index": i, "matches": m} for i, m in enumerate(ranked)]
+        return {
+            "total_profiles": len(results),
+            "total_jobs_considered": len(self.onet_jobs),
+            "catalog_version": self.scoring_engine.catalog_version,
+            "top_k": request.top_k,
+            "scoring_backend": self.scoring_engine.backend.name,
+            "results": results
+        }
+
+    def _analysis_fields(self, profile, matches: List[Dict], ranking: RankedScores) -> Dict:
+        """Matcher-specific fields of analyze_person's result (they replace shared fields of the same name)"""
+        return {}
+
+    def analyze_person(self, profile, top_n: Optional[int] = None, offset: int = 0) -> Dict:
+        """
+        Analyze a person against all jobs and return ranked matches
+        Only the requested page (top_n matches after offset, or all jobs) gets full match details
+        """
+        if top_n is not None and offset == 0:
+            ranking = self.scoring_engine.top_k(profile, top_n)
+        else:
+            ranking = self.scoring_engine.rank(profile)
+        matches = [self.calculate_job_match(profile, job_name, ranking)
+                   for job_name in ranking.page(offset, top_n)]
+        top_match = matches[0] if matches and offset == 0 else None
+        if offset and self.onet_jobs:
+            top_match = self.calculate_job_match(profile, ranking.page(0, 1)[0], ranking)
+
+        return {
+            "profile": profile,
+            "matches": matches,
+            "top_match": top_match,
+            **self._analysis_fields(profile, matches, ranking),
+            "total_jobs_considered": len(self.onet_jobs),
+            "catalog_version": self.scoring_engine.catalog_version,
+            "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+class CourseMatcher(CatalogMatcher):
+    """
+    Matcher whose matches carry course recommendations for each gap and interview preparation
+    Subclasses set course_recommendations and implement _generate_interview_preparation
+    """
+
+    def calculate_job_match(self, profile, job_name: str, ranking: Optional[RankedScores] = None) -> Dict:
+        """Calculate comprehensive match percentage and details for a specific job"""
+        job = self.onet_jobs[job_name]
+        match = self.scoring_engine.calculate_job_match(profile, job_name, ranking)
+
+        # Attach course recommendations to each improvement area
+        for improvement in match["improvements"]:
+            improvement.update(self._improvement_resources(improvement["skill"], job))
+
+        # Generate interview preparation
+        match["interview_preparation"] = self._generate_interview_preparation(profile, job)
+        return match
+
+    def _improvement_resources(self, skill_name: str, job: Dict) -> Dict:
+        """Course recommendations and improvement tip for a skill gap"""
+        courses = self.course_recommendations.get(skill_name, {
+            "free": [{"name": f"Search for free {skill_name} courses", "url": "https://www.coursera.org/", "provider": "Various"}],
+            "paid": [{"name": f"Search for {skill_name} courses", "url": "https://www.udemy.com/", "provider": "Udemy"}]
+        })
+
+        return {
+            "free_courses": courses.get("free", []),
+            "paid_courses": courses.get("paid", []),
+            "improvement_tip": job.get("improvement_tips", {}).get(skill_name, f"Develop {skill_name} skills through practice and training")
+        }
+
+    @abstractmethod
+    def _generate_interview_preparation(self, profile, job: Dict) -> Dict:
+        """Interview preparation for the job, attached to each match"""
+
+
+def sample_profiles(count: int, seed: int) -> List[ScoringProfile]:
+    """Random profiles plus edge cases (no interests, unrated skills, fractional and off-grid levels)"""
+    rng = random.Random(seed)
+    profiles = [
+        ScoringProfile(personality={}, work_values={}, skills={}, interests=[]),
+        ScoringProfile(personality={k: 3.5 for k in PERSONALITY_TRAITS}, work_values={"income": 6},
+                       skills={"math": 5, "negotiation": 4}, interests=["social", "unknown"]),
+        ScoringProfile(personality={k: 5 for k in PERSONALITY_TRAITS}, work_values={k: 6 for k in WORK_VALUES},
+                       skills={k: 5 for k in PROFILE_SKILLS}, interests=list(INTERESTS)),
+        ScoringProfile(personality={k: 1 for k in PERSONALITY_TRAITS}, work_values={k: 1 for k in WORK_VALUES},
+                       skills={k: 1 for k in PROFILE_SKILLS}, interests=["realistic"]),
+        ScoringProfile(personality={"openness": 4.2, "neuroticism": 1.7}, work_values={"impact": 5.5},
+                       skills={"writing": 3.3, "research": 4}, interests=["artistic"])
+    ]
+    while len(profiles) < count:
+        profiles.append(ScoringProfile(
+            personality={k: rng.randint(1, 5) for k in PERSONALITY_TRAITS},
+            work_values={k: rng.randint(1, 6) for k in WORK_VALUES},
+            skills={k: rng.randint(1, 5) for k in PROFILE_SKILLS},
+            interests=rng.sample(INTERESTS, rng.randint(0, 3))
+        ))
+    return profiles
+
+
+def check_backends(onet_jobs: Dict, samples: int = 500, seed: int = 0) -> List[str]:
+    """Compare every backend against the reference Python backend, returning any mismatches"""
+    profiles = sample_profiles(samples, seed)
+    reference = ScoringEngine(onet_jobs, backend=PythonBackend.name)
+    expected_scores = reference.backend.score_profiles(profiles)
+    expected_ranks = [reference.top_job_matches(p, len(onet_jobs)) for p in profiles]
+
+    mismatches = []
+    for name in BACKENDS:
+        engine = ScoringEngine(onet_jobs, backend=name)
+        # Profiles are scored one at a time so fast paths are not masked by a chunk-wide fallback
+        scores = np.concatenate([engine.backend.score_profiles([p]) for p in profiles])
+        if not np.array_equal(scores, expected_scores):
+            rows = int((scores != expected_scores).any(axis=(1, 2)).sum())
+            mismatches.append(f"{name}: component scores differ for {rows} profiles")
+        for i, profile in enumerate(profiles):
+            if engine.top_job_matches(profile, len(onet_jobs)) != expected_ranks[i]:
+                mismatches.append(f"{name}: ranking differs for sample profile {i}")
+                break
+        for job_name in engine.job_names:
+            if engine.calculate_job_match(profiles[-1], job_name) != reference.calculate_job_match(profiles[-1], job_name):
+                mismatches.append(f"{name}: calculate_job_match differs for {job_name}")
+        ranking = engine.rank(profiles[-1])
+        for job_name in engine.job_names:
+            if engine.calculate_job_match(profiles[-1], job_name, ranking) != reference.calculate_job_match(profiles[-1], job_name):
+                mismatches.append(f"{name}: calculate_job_match from a ranking differs for {job_name}")
+
+    # Slotted Profiles must score, fingerprint and describe matches exactly like their dict form
+    slotted = [Profile(personality=p.personality, work_values=p.work_values, skills=p.skills, interests=p.interests)
+               for p in profiles]
+    for name in BACKENDS:
+        engine = ScoringEngine(onet_jobs, backend=name)
+        if not np.array_equal(np.concatenate([engine.backend.score_profiles([p]) for p in slotted]), expected_scores):
+            mismatches.append(f"{name}: Profile component scores differ from the dict form")
+        if not np.array_equal(engine.backend.score_profiles(slotted), expected_scores):
+            mismatches.append(f"{name}: batched Profile component scores differ from the dict form")
+    for profile, compact in zip(profiles, slotted):
+        if profile_fingerprint(compact) != profile_fingerprint(profile):
+            mismatches.append("Profile fingerprint differs from the dict form")
+            break
+        if any(reference.calculate_job_match(compact, job_name) != reference.calculate_job_match(profile, job_name)
+               for job_name in reference.job_names[:5]):
+            mismatches.append("calculate_job_match differs between Profile and the dict form")
+            break
+
+    # Partial top-k selection and paging must agree with a full stable sort, ties included
+    # (scores are tiled past PARTIAL_SELECT_MIN_JOBS, which also repeats every score as a tie)
+    overall = ScoringEngine.overall_scores(expected_scores)
+    overall = np.tile(overall, (1, PARTIAL_SELECT_MIN_JOBS // overall.shape[1] + 1))
+    full_order = np.argsort(-overall, axis=1, kind="stable")
+    for k in (1, 3, 10, 50, overall.shape[1] - 1):
+        if not np.array_equal(top_k_rows(overall, k), full_order[:, :k]):
+            mismatches.append(f"top_k_rows differs from a full sort for k={k}")
+        if any(not np.array_equal(top_k_indexes(row, k), order[:k]) for row, order in zip(overall, full_order)):
+            mismatches.append(f"top_k_indexes differs from a full sort for k={k}")
+    # Pruned top-k on a catalog large enough to prune, repeated so every score also appears as a tie
+    repeats = PRUNE_MIN_JOBS // len(onet_jobs) + 1
+    large = {f"{name} #{i}": job for i in range(repeats) for name, job in onet_jobs.items()}
+    for name in BACKENDS:
+        engine = ScoringEngine(large, backend=name)
+        for profile in profiles[:100]:
+            ranking = engine.rank(profile)
+            for k in (1, 3, 10):
+                top = engine.top_k(profile, k)
+                if top.job_names != ranking.page(0, k) or any(
+                        engine.calculate_job_match(profile, job, top) != engine.calculate_job_match(profile, job, ranking)
+                        for job in top.job_names):
+                    mismatches.append(f"{name}: pruned top-{k} differs from the full ranking")
+                    break
+        if name == LookupTableBackend.name and not engine.pruning.jobs_pruned:
+            mismatches.append(f"{name}: no jobs were pruned on a {len(large)} job catalog")
+
+    # Incremental what-if re-scoring must match scoring the changed profile from scratch
+    for name in BACKENDS:
+        engine = ScoringEngine(onet_jobs, backend=name)
+        for i, (profile, changed) in enumerate(zip(profiles[:25], profiles[1:26])):
+            variants = [
+                changed,
+                ScoringProfile(profile.personality, profile.work_values,
+                               {**profile.skills, "programming": 5}, profile.interests),
+                ScoringProfile({**profile.personality, "neuroticism": 1}, profile.work_values,
+                               profile.skills, profile.interests[:1])
+            ]
+            for variant in variants:
+                after = engine.rescore(engine.rank(profile), variant, engine.affected_jobs(profile, variant))
+                expected = engine.rank(variant)
+                if not (np.array_equal(after.components, expected.components) and
+                        np.array_equal(after.overall, expected.overall)):
+                    mismatches.append(f"{name}: what-if re-scoring differs for sample profile {i}")
+            top = engine.rank(profile).page_indexes(0, 3)
+            gradient = engine.skill_gradient(profile, top)
+            for row, skill in enumerate(PROFILE_SKILLS):
+                raised = ScoringProfile(profile.personality, profile.work_values,
+                                        {**profile.skills, skill: min(5, profile.skills.get(skill, DEFAULT_SKILL_LEVEL) + 1)},
+                                        profile.interests)
+                if not np.array_equal(gradient[row], engine.rank(raised).overall[top] - engine.rank(profile).overall[top]):
+                    mismatches.append(f"{name}: skill gradient differs for {skill} on sample profile {i}")
+                    break
+
+    ranking = reference.rank(profiles[-1])
+    pages = [ranking.page(offset, 5) for offset in range(0, len(onet_jobs), 5)]
+    if sum(pages, []) != expected_ranks[-1]:
+        mismatches.append("paged ranking differs from the full ranking")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import careers
+
+    problems = check_backends(careers.onet_jobs)
+    if problems:
+        print("\n".join(problems))
+        raise SystemExit(1)
+    print(f"All backends ({', '.join(BACKENDS)}) match the reference on {len(careers.onet_jobs)} jobs")
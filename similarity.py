@@ -0,0 +1,268 @@
+"""
+Job-to-job similarity for the career catalog
+
+JobSimilarityIndex turns each job's skills, work values, interests and work styles into unit vectors
+(weighted like the overall match), keeps the job x job similarity matrix and the k most similar catalog
+jobs for every job. A neighbour lookup reads one precomputed row. When single job entries change, sync()
+updates only those rows of the matrix and the neighbour lists that can be affected. A catalog snapshot
+stores the built index, so workers loading one map it instead of rebuilding.
+
+Run `python similarity.py` to check incremental updates against full rebuilds.
+"""
+import copy
+import json
+import random
+import threading
+import numpy as np
+from typing import Dict, List, Tuple
+
+from scoring import COMPONENT_WEIGHTS, stored_state, top_k_indexes
+
+# Job fields compared, in scoring.COMPONENTS order so each is weighted like its share of the overall match
+SIMILARITY_FIELDS = ["skills", "work_values", "interests", "work_styles"]
+FIELD_WEIGHTS = dict(zip(SIMILARITY_FIELDS, COMPONENT_WEIGHTS))
+
+# Catalog neighbours kept per job
+DEFAULT_NEIGHBOURS = 5
+
+# Above this share of changed jobs, sync() rebuilds instead of updating row by row
+REBUILD_FRACTION = 0.25
+
+
+def job_signature(job: Dict) -> Tuple:
+    """Snapshot of the fields that similarity is computed from, compared to spot changed entries"""
+    return tuple(tuple(job.get(field, {}).items()) for field in SIMILARITY_FIELDS)
+
+
+class JobSimilarityIndex:
+    """Job x job similarity matrix with precomputed nearest catalog neighbours"""
+
+    # Arrays a catalog snapshot stores, so workers map them instead of each building the index
+    STORED_ARRAYS = ["vectors", "similarity", "neighbour_ids", "neighbour_scores"]
+
+    def __init__(self, onet_jobs: Dict, k: int = DEFAULT_NEIGHBOURS):
+        self.k = k
+        self._lock = threading.Lock()
+        stored = stored_state(onet_jobs, "similarity")
+        if stored is not None and stored[1]["k"] == k:
+            self._attach(onet_jobs, *stored)
+        else:
+            self._build(onet_jobs)
+
+    def _build(self, onet_jobs: Dict):
+        self.signatures = [job_signature(job) for job in onet_jobs.values()]
+        self.columns = {}
+        rows = [self._vector(job) for job in onet_jobs.values()]
+        vectors = np.zeros((len(rows), len(self.columns)))
+        for i, row in enumerate(rows):
+            vectors[i, list(row)] = list(row.values())
+        similarity = vectors @ vectors.T
+        neighbour_ids = np.full((len(rows), self.k), -1, dtype=np.intp)
+        neighbour_scores = np.full((len(rows), self.k), -np.inf)
+        for i in range(len(rows)):
+            neighbour_ids[i], neighbour_scores[i] = self._neighbour_row(similarity, i)
+        self._publish(list(onet_jobs.keys()), vectors, similarity, neighbour_ids, neighbour_scores)
+
+    def _attach(self, onet_jobs: Dict, arrays: Dict[str, np.ndarray], meta: Dict):
+        """Use a snapshot's stored index (read-only, copied only if sync() has to change it)"""
+        self.columns = {(field, key): column for column, (field, key) in enumerate(meta["columns"])}
+        # Signatures are only needed by sync(), and a snapshot catalog cannot change under us
+        self.signatures = None
+        self._source = onet_jobs
+        self._publish(list(onet_jobs.keys()), *(arrays[name] for name in self.STORED_ARRAYS))
+
+    def _publish(self, job_names: List[str], vectors: np.ndarray, similarity: np.ndarray,
+                 neighbour_ids: np.ndarray, neighbour_scores: np.ndarray):
+        self.vectors = vectors
+        self.similarity = similarity
+        self.job_names = job_names
+        self.job_index = {name: i for i, name in enumerate(job_names)}
+        # Each row lists a job's k nearest jobs, padded with -1 / -inf; the last score is the bar a
+        # changed job must clear to enter that row
+        self.neighbour_ids = neighbour_ids
+        self.neighbour_scores = neighbour_scores
+        # Swapped in one assignment so concurrent lookups never mix old and new state
+        self._lookup = (self.job_names, self.job_index, neighbour_ids, neighbour_scores)
+
+    def snapshot_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Arrays and metadata for a catalog snapshot to store"""
+        return ({name: getattr(self, name) for name in self.STORED_ARRAYS},
+                {"k": self.k, "columns": [list(column) for column in self.columns]})
+
+    def _vector(self, job: Dict) -> Dict[int, float]:
+        """Sparse (column -> value) vector, each field normalised to length sqrt(field weight)"""
+        vector = {}
+        for field in SIMILARITY_FIELDS:
+            importances = job.get(field, {})
+            norm = np.sqrt(sum(v * v for v in importances.values()))
+            if norm == 0:
+                continue
+            scale = np.sqrt(FIELD_WEIGHTS[field]) / norm
+            for key, importance in importances.items():
+                column = self.columns.setdefault((field, key), len(self.columns))
+                vector[column] = importance * scale
+        return vector
+
+    def _neighbour_row(self, similarity: np.ndarray, job_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = similarity[job_index].copy()
+        scores[job_index] = -np.inf
+        top = top_k_indexes(scores, min(self.k, len(scores) - 1))
+        ids = np.full(self.k, -1, dtype=np.intp)
+        ids[:len(top)] = top
+        row_scores = np.full(self.k, -np.inf)
+        row_scores[:len(top)] = scores[top]
+        return ids, row_scores
+
+    def neighbours(self, job_name: str) -> List[Dict]:
+        """The k most similar catalog jobs (name and 0-1 similarity), most similar first"""
+        job_names, job_index, neighbour_ids, neighbour_scores = self._lookup
+        i = job_index.get(job_name)
+        if i is None:
+            return []
+        return [{"job_name": job_names[j], "similarity": round(float(score), 4)}
+                for j, score in zip(neighbour_ids[i], neighbour_scores[i]) if j >= 0]
+
+    def derive(self, onet_jobs: Dict) -> "JobSimilarityIndex":
+        """
+        Index for an updated catalog, built incrementally from this one
+        This index is left untouched, so requests still reading it keep a consistent view.
+        """
+        with self._lock:
+            index = copy.copy(self)
+            index.columns = dict(self.columns)
+            # Read-only views make sync() copy the matrices before changing them
+            for name in ("vectors", "similarity"):
+                view = getattr(self, name).view()
+                view.flags.writeable = False
+                setattr(index, name, view)
+        index._lock = threading.Lock()
+        index.sync(onet_jobs)
+        return index
+
+    def sync(self, onet_jobs: Dict) -> Dict[str, List[str]]:
+        """
+        Bring the index in line with a catalog, updating only the jobs whose entries changed
+        Returns the added, updated and removed job names
+        """
+        with self._lock:
+            if self.signatures is None:
+                self.signatures = [job_signature(job) for job in self._source.values()]
+                self._source = None
+            signatures = {name: job_signature(job) for name, job in onet_jobs.items()}
+            removed = [name for name in self.job_names if name not in signatures]
+            added = [name for name in signatures if name not in self.job_index]
+            updated = [name for name in signatures if name in self.job_index
+                       and self.signatures[self.job_index[name]] != signatures[name]]
+            changes = {"added": added, "updated": updated, "removed": removed}
+
+            changed = len(added) + len(updated) + len(removed)
+            if changed == 0:
+                return changes
+            stored = stored_state(onet_jobs, "similarity")
+            if stored is not None and stored[1]["k"] == self.k:
+                # A snapshot carries its own built index; mapping it beats diverging into private copies
+                self._attach(onet_jobs, *stored)
+                return changes
+            if changed > REBUILD_FRACTION * max(len(self.job_names), 1):
+                self._build(onet_jobs)
+                return changes
+
+            # Neighbour rows are copied since lookups keep reading the old ones; the matrices are only read
+            # under the lock, so they are updated in place unless they are a snapshot's read-only mapping
+            job_names = list(self.job_names)
+            vectors, similarity = (array if array.flags.writeable else array.copy()
+                                   for array in (self.vectors, self.similarity))
+            neighbour_ids, neighbour_scores = self.neighbour_ids.copy(), self.neighbour_scores.copy()
+
+            # Jobs listing a removed or updated job as a neighbour must re-pick their neighbours
+            stale = [self.job_index[name] for name in removed + updated]
+            recompute = set(np.flatnonzero(np.isin(neighbour_ids, stale).any(axis=1)))
+
+            if removed:
+                dropped = set(removed)
+                keep = np.array([i for i, name in enumerate(job_names) if name not in dropped], dtype=np.intp)
+                remap = np.full(len(job_names), -1, dtype=np.intp)
+                remap[keep] = np.arange(len(keep))
+                vectors = vectors[keep]
+                similarity = similarity[np.ix_(keep, keep)]
+                neighbour_ids = np.where(neighbour_ids[keep] >= 0, remap[neighbour_ids[keep]], -1)
+                neighbour_scores = neighbour_scores[keep]
+                recompute = {remap[i] for i in recompute if remap[i] >= 0}
+                job_names = [job_names[i] for i in keep]
+
+            job_index = {name: i for i, name in enumerate(job_names)}
+            for name in added:
+                job_index[name] = len(job_names)
+                job_names.append(name)
+            if added:
+                vectors = np.vstack([vectors, np.zeros((len(added), vectors.shape[1]))])
+                similarity = np.pad(similarity, ((0, len(added)), (0, len(added))))
+                neighbour_ids = np.vstack([neighbour_ids, np.full((len(added), self.k), -1, dtype=np.intp)])
+                neighbour_scores = np.vstack([neighbour_scores, np.full((len(added), self.k), -np.inf)])
+
+            for name in added + updated:
+                i = job_index[name]
+                row = self._vector(onet_jobs[name])
+                if len(self.columns) > vectors.shape[1]:
+                    vectors = np.pad(vectors, ((0, 0), (0, len(self.columns) - vectors.shape[1])))
+                vectors[i] = 0.0
+                vectors[i, list(row)] = list(row.values())
+                scores = vectors @ vectors[i]
+                similarity[i, :] = scores
+                similarity[:, i] = scores
+                recompute.add(i)
+
+                # Jobs where the changed job now reaches the k-th place gain it as a neighbour
+                reached = np.flatnonzero(scores >= neighbour_scores[:, -1])
+                recompute.update(j for j in reached if j != i)
+
+            for i in recompute:
+                neighbour_ids[i], neighbour_scores[i] = self._neighbour_row(similarity, i)
+            self.signatures = [signatures[name] for name in job_names]
+            self._publish(job_names, vectors, similarity, neighbour_ids, neighbour_scores)
+            return changes
+
+
+def check_incremental(onet_jobs: Dict, edits: int = 50, seed: int = 0) -> List[str]:
+    """Apply random single-job edits, additions and removals, comparing sync() with a full rebuild"""
+    rng = random.Random(seed)
+    catalog = dict(onet_jobs)
+    index = JobSimilarityIndex(catalog)
+    mismatches = []
+    for step in range(edits):
+        name = rng.choice(list(catalog))
+        action = rng.choice(["update", "add", "remove"])
+        catalog = dict(catalog)
+        if action == "remove" and len(catalog) > index.k + 1:
+            del catalog[name]
+        else:
+            job = json.loads(json.dumps(catalog[name]))
+            field = rng.choice(SIMILARITY_FIELDS)
+            for key in job.get(field, {}):
+                job[field][key] = round(rng.uniform(1, 5), 1)
+            if rng.random() < 0.2:
+                job["skills"][f"new_skill_{step}"] = 4.0
+            catalog[name if action == "update" else f"{name} (variant {step})"] = job
+
+        index.sync(catalog)
+        rebuilt = JobSimilarityIndex(catalog)
+        if sorted(index.job_names) != sorted(rebuilt.job_names):
+            mismatches.append(f"step {step}: job names differ after {action}")
+            continue
+        for job_name in catalog:
+            got = [(n["job_name"], n["similarity"]) for n in index.neighbours(job_name)]
+            expected = [(n["job_name"], n["similarity"]) for n in rebuilt.neighbours(job_name)]
+            # Equal similarities may list in a different order, since added jobs sit at the end
+            if sorted(got, key=lambda n: (-n[1], n[0])) != sorted(expected, key=lambda n: (-n[1], n[0])):
+                mismatches.append(f"step {step}: neighbours of {job_name} differ after {action}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import careers
+
+    problems = check_incremental(careers.onet_jobs)
+    if problems:
+        print("\n".join(problems[:20]))
+        raise SystemExit(1)
+    print(f"Incremental neighbour updates match full rebuilds over {len(careers.onet_jobs)} jobs")
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# formai builds its OpenAI client and LLM cache at import: no key is needed offline, and tests keep no cache file
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.pop("LLM_CACHE_PATH", None)
+# Tests reload the catalog themselves (reload_catalog), not on a watcher thread's schedule
+os.environ["CATALOG_RELOAD_INTERVAL"] = "0"
+
+
+class FakeOpenAI:
+    """Stands in for AsyncOpenAI: reply(prompt, response_format) makes each completion, prompts records calls"""
+
+    def __init__(self, reply, delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def create(self, messages, response_format=None, **kwargs):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        content = self.reply(prompt, response_format)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture(scope="session")
+def formai_module():
+    """formai imported without the Firebase service account it connects with at import"""
+    with mock.patch("firebase_admin.credentials.Certificate"), mock.patch("firebase_admin.initialize_app"), \
+            mock.patch("firebase_admin.firestore.client"):
+        import formai
+    return formai
+
+
+@pytest.fixture
+def fake_llm():
+    """make(reply, cache=None, delay=0.0): an LLMClient answering through a FakeOpenAI (llm.client)"""
+    from llm_client import LLMClient
+
+    def make(reply, cache=None, delay: float = 0.0) -> LLMClient:
+        llm = LLMClient(api_key="test", http2=False, cache=cache)
+        llm.client = FakeOpenAI(reply, delay)
+        return llm
+    return make
+
+
+@pytest.fixture
+def reload_catalog(formai_module):
+    """reload(): swap in the catalog minus one job as formai's next generation; the full one returns afterwards"""
+    import careers
+    original = careers.onet_jobs
+    matcher = formai_module.ai_matcher
+
+    def reload() -> str:
+        removed = next(iter(original))
+        careers.onet_jobs = {name: job for name, job in original.items() if name != removed}
+        assert matcher.refresh_catalog()
+        return removed
+    yield reload
+    if careers.onet_jobs is not original:
+        careers.onet_jobs = original
+        matcher.refresh_catalog()
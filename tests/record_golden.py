@@ -0,0 +1,84 @@
+"""
+Record the golden matcher outputs that tests/test_golden_matches.py compares against
+
+Run it from a checkout of the baseline the goldens describe (commit cc12291):
+
+    git worktree add /tmp/baseline cc12291
+    cd /tmp/baseline && python /path/to/tests/record_golden.py /path/to/tests/golden/baseline_matches.json
+
+It records, for four survey submissions and four random profiles, analyze_person of form.CareerMatcher
+and insights_generator_new.CareerMatcher, and formai's top 5 jobs plus calculate_job_match for those and
+a few fixed jobs.
+"""
+import json
+import os
+import random
+import sys
+from dataclasses import asdict
+from unittest import mock
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pandas as pd
+
+with mock.patch("firebase_admin.credentials.Certificate"), mock.patch("firebase_admin.initialize_app"), \
+        mock.patch("firebase_admin.firestore.client"):
+    import form
+    import formai
+    import insights_generator_new
+
+BASELINE = "cc12291"
+FIXED_JOBS = ["Software Developer", "Registered Nurse", "Graphic Designer"]
+
+
+def golden_profiles(csv_matcher, submissions: int = 4, samples: int = 4, seed: int = 7):
+    profiles = []
+    for _, row in pd.read_csv("Pookie Concierge.csv").iterrows():
+        profile = csv_matcher.parse_csv_row(row)
+        if profile is not None:
+            profiles.append(asdict(profile))
+        if len(profiles) == submissions:
+            break
+    rng = random.Random(seed)
+    for i in range(samples):
+        profiles.append({
+            "name": f"Sample {i}", "email": f"sample{i}@example.com", "university": "Example University",
+            "personality": {k: rng.randint(1, 5) for k in ["openness", "conscientiousness", "extraversion",
+                                                          "agreeableness", "neuroticism"]},
+            "work_values": {k: rng.randint(1, 6) for k in ["income", "impact", "stability", "variety",
+                                                          "recognition", "autonomy"]},
+            "skills": {k: rng.randint(1, 5) for k in ["math", "problem_solving", "public_speaking", "creative",
+                                                     "working_with_people", "writing", "tech_savvy", "leadership",
+                                                     "networking", "programming", "empathy", "time_management",
+                                                     "attention_to_detail", "project_management", "research",
+                                                     "teamwork"]},
+            "interests": rng.sample(["investigative", "social", "artistic", "enterprising", "realistic",
+                                     "conventional"], rng.randint(0, 3)),
+            "preferred_career": "Software Developer"
+        })
+    return profiles
+
+
+def analysis(matcher, module, profile: dict) -> dict:
+    result = matcher.analyze_person(module.PersonProfile(**profile))
+    return {"matches": result["matches"], "top_match": result["top_match"]}
+
+
+if __name__ == "__main__":
+    csv_matcher = insights_generator_new.CareerMatcher()
+    form_matcher = form.CareerMatcher()
+    ai_matcher = formai.AICareerMatcher()
+    profiles = golden_profiles(csv_matcher)
+    golden = {"baseline": BASELINE, "profiles": profiles, "form": [], "insights_generator_new": [], "formai": []}
+    for profile in profiles:
+        golden["form"].append(analysis(form_matcher, form, profile))
+        golden["insights_generator_new"].append(analysis(csv_matcher, insights_generator_new, profile))
+        person = formai.PersonProfile(**profile)
+        top = ai_matcher.get_top_job_matches(person, 5)
+        jobs = top + [job for job in FIXED_JOBS if job not in top]
+        golden["formai"].append({"top_job_matches": top,
+                                 "matches": {job: ai_matcher.calculate_job_match(person, job) for job in jobs}})
+    with open(sys.argv[1], "w") as f:
+        json.dump(golden, f, indent=1, sort_keys=True)
+    print(f"Recorded {len(profiles)} profiles from {BASELINE} into {sys.argv[1]}")
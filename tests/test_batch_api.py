@@ -0,0 +1,43 @@
+"""/analyze-batch of both APIs: one shared request model, its limits and its input checks"""
+import pytest
+from fastapi.testclient import TestClient
+
+import form
+from scoring import INTERESTS, MAX_BATCH_PROFILES, MAX_BATCH_TOP_K, PROFILE_COLUMNS
+
+# The compact form of profile_request(): every answer 3, interested in "social" only
+MATRIX_ROW = [int(column == "social") if column in INTERESTS else 3 for column in PROFILE_COLUMNS]
+
+
+def profile_request(name: str = "Ann Lee") -> dict:
+    return {"name": name, "email": "ann@example.com", "university": "Example University",
+            "preferred_career": "Nurse", "interests": ["social"], "updates": False,
+            **{column: 3 for column in PROFILE_COLUMNS if column in form.PersonProfileRequest.model_fields}}
+
+
+@pytest.fixture(scope="module", params=["form", "formai"])
+def client(request):
+    if request.param == "form":
+        return TestClient(form.app)
+    return TestClient(request.getfixturevalue("formai_module").app)
+
+
+def test_profiles_and_matrix_rank_alike(client):
+    by_profile = client.post("/analyze-batch", json={"profiles": [profile_request()], "top_k": 2})
+    by_matrix = client.post("/analyze-batch", json={"profile_matrix": [MATRIX_ROW], "top_k": 2})
+    assert by_profile.status_code == by_matrix.status_code == 200
+    assert by_profile.json()["result"]["results"][0]["matches"] == by_matrix.json()["result"]["results"][0]["matches"]
+
+
+def test_exactly_one_input(client):
+    assert client.post("/analyze-batch", json={"top_k": 2}).status_code == 400
+    both = {"profiles": [profile_request()], "profile_matrix": [MATRIX_ROW]}
+    assert client.post("/analyze-batch", json=both).status_code == 400
+
+
+def test_limits(client):
+    assert client.post("/analyze-batch", json={"profiles": [profile_request()],
+                                               "top_k": MAX_BATCH_TOP_K + 1}).status_code == 422
+    rows = [MATRIX_ROW] * (MAX_BATCH_PROFILES + 1)
+    assert client.post("/analyze-batch", json={"profile_matrix": rows}).status_code == 422
+    assert client.post("/analyze-batch", json={"profile_matrix": rows[:MAX_BATCH_PROFILES]}).status_code == 200
@@ -0,0 +1,49 @@
+"""formai catalog hot reload: requests stay on the generation they started on, and shutdown stops the watcher"""
+from fastapi.testclient import TestClient
+
+from catalog import CatalogWatcher
+
+
+def test_request_keeps_its_generation_across_a_reload(formai_module, reload_catalog, monkeypatch):
+    matcher = formai_module.ai_matcher
+    before = matcher.catalog_state
+    listing = formai_module.jobs_listing
+    during = {}
+
+    def listing_after_reload(*args):
+        during["removed"] = reload_catalog()
+        during["draining"] = [(state["generation"], state["in_flight_requests"])
+                              for state in matcher.catalog_status()["draining"]]
+        return listing(*args)
+
+    monkeypatch.setattr(formai_module, "jobs_listing", listing_after_reload)
+    client = TestClient(formai_module.app)
+    pinned = client.get("/jobs", params={"limit": 7}).json()
+    # The reload swapped in a new generation while the request ran on the old one, which it kept
+    assert matcher.catalog_state.generation == before.generation + 1
+    assert during["draining"] == [(before.generation, 1)]
+    assert pinned["total_jobs"] == len(before.onet_jobs) and during["removed"] in pinned["available_jobs"]
+
+    monkeypatch.setattr(formai_module, "jobs_listing", listing)
+    after = client.get("/jobs", params={"limit": 7}).json()
+    assert after["total_jobs"] == len(before.onet_jobs) - 1
+    assert during["removed"] not in after["available_jobs"]
+    assert client.get("/catalog/version").json()["draining"] == []
+
+
+def test_shutdown_stops_watcher_and_closes_llm(formai_module, fake_llm, monkeypatch):
+    llm = fake_llm(lambda prompt, response_format: "")
+    closed = []
+
+    async def aclose():
+        closed.append(True)
+
+    monkeypatch.setattr(llm, "aclose", aclose)
+    monkeypatch.setattr(formai_module, "llm", llm)
+    watcher = CatalogWatcher(lambda reload_module: None, interval=60)
+    monkeypatch.setattr(formai_module.ai_matcher, "catalog_watcher", watcher)
+    watcher.start()
+    with TestClient(formai_module.app):
+        assert watcher._thread.is_alive()
+    watcher._thread.join(timeout=5)
+    assert not watcher._thread.is_alive() and closed == [True]
@@ -0,0 +1,94 @@
+"""formai endpoints that need no LLM: previews, listings, what-if and request validation"""
+import pytest
+from fastapi.testclient import TestClient
+
+from scoring import MAX_BATCH_TOP_K
+
+
+@pytest.fixture(scope="module")
+def client(formai_module):
+    return TestClient(formai_module.app)
+
+
+def test_quick_match_preview_pages(client):
+    first = client.get("/quick-match-preview", params={"name": "Ann", "math": 5})
+    second = client.get("/quick-match-preview", params={"name": "Ann", "math": 5, "offset": 3})
+    assert first.status_code == second.status_code == 200
+    names = [{match["job_name"] for match in page.json()["top_matches"]} for page in (first, second)]
+    assert len(names[0]) == len(names[1]) == 3 and not names[0] & names[1]
+
+
+def test_quick_match_preview_rejects_negative_offset(client):
+    assert client.get("/quick-match-preview", params={"name": "Ann", "offset": -3}).status_code == 422
+
+
+def test_jobs_default_page_without_facets(client, formai_module):
+    listing = client.get("/jobs").json()
+    total = len(formai_module.ai_matcher.onet_jobs)
+    assert listing["total_jobs"] == total
+    assert len(listing["available_jobs"]) == min(total, formai_module.DEFAULT_PAGE_SIZE)
+    assert listing["next_offset"] == (formai_module.DEFAULT_PAGE_SIZE if total > formai_module.DEFAULT_PAGE_SIZE else None)
+    assert "filter_values" not in listing
+
+
+def test_jobs_limit_is_capped(client, formai_module):
+    assert client.get("/jobs", params={"limit": formai_module.MAX_PAGE_SIZE}).status_code == 200
+    assert client.get("/jobs", params={"limit": formai_module.MAX_PAGE_SIZE + 1}).status_code == 422
+
+
+def test_jobs_facets_on_request(client):
+    listing = client.get("/jobs", params={"interest": "social", "limit": 2, "facets": 1}).json()
+    assert len(listing["available_jobs"]) == 2
+    assert sum(listing["filter_values"]["interest"].values()) == listing["total_jobs"]
+
+
+def test_root_lists_every_get_endpoint(client, formai_module):
+    listed = client.get("/").json()["endpoints"]
+    routes = {route.path for route in formai_module.app.routes
+              if "GET" in getattr(route, "methods", ()) and route.path not in ("/", "/docs", "/redoc", "/openapi.json",
+                                                                              "/docs/oauth2-redirect")}
+    assert routes <= set(listed)
+
+
+def what_if_request(formai_module, **fields) -> dict:
+    profile = {"name": "Ann Lee", "email": "ann@example.com", "university": "Example University",
+               "preferred_career": "Nurse", "interests": ["social"], "updates": False,
+               **{field: 3 for field, info in formai_module.PersonProfileRequest.model_fields.items()
+                  if info.annotation is int}}
+    return {"profile": profile, **fields}
+
+
+def test_what_if(client, formai_module):
+    response = client.post("/what-if", json=what_if_request(formai_module, deltas={"programming": 2}, top_n=5))
+    assert response.status_code == 200
+    result = response.json()["result"]
+    assert len(result["top_matches_before"]) == len(result["top_matches_after"]) == 5
+    assert result["applied_changes"] == {"programming": {"before": 3, "after": 5}}
+
+
+def test_what_if_without_changes(client, formai_module):
+    result = client.post("/what-if", json=what_if_request(formai_module, deltas={})).json()["result"]
+    assert len(result["top_matches_before"]) == 3
+    assert result["top_matches_after"] == result["top_matches_before"]
+    assert result["jobs_rescored"] == 0 and result["applied_changes"] == {}
+
+
+@pytest.mark.parametrize("top_n", [0, MAX_BATCH_TOP_K + 1])
+def test_what_if_rejects_out_of_range_top_n(client, formai_module, top_n):
+    request = what_if_request(formai_module, deltas={"programming": 1}, top_n=top_n)
+    assert client.post("/what-if", json=request).status_code == 422
+
+
+def test_jobs_revalidates_with_etag(client):
+    first = client.get("/jobs", params={"limit": 5})
+    etag = first.headers["etag"]
+    repeat = client.get("/jobs", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304 and repeat.content == b"" and repeat.headers["etag"] == etag
+    assert client.get("/jobs", params={"limit": 5}, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_jobs_etag_changes_after_reload(client, reload_catalog):
+    etag = client.get("/jobs", params={"limit": 5}).headers["etag"]
+    reload_catalog()
+    reloaded = client.get("/jobs", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert reloaded.status_code == 200 and reloaded.headers["etag"] != etag
@@ -0,0 +1,146 @@
+"""formai insight generation against a fake LLM: section validation, re-requests and fallbacks"""
+import asyncio
+import json
+
+import pytest
+
+SECTION_REPLIES = {
+    "ai_summary": "{{name}} is a strong fit.",
+    "action_plan": {"top_needs": ["Statistics"], "action_items": ["Take a statistics course"]},
+    "career_story": "I am {{name}}, and I love solving problems.",
+    "interview_insights": {"key_selling_points": ["Curiosity"], "story_examples": ["A class project"],
+                           "questions_to_ask": ["How is success measured?"]}
+}
+
+
+class FakeReplies:
+    """
+    Replies by request: structured calls get every requested section, with the sections in bad empty for
+    the first bad_calls of them; plain section calls fail when fail_plain is set. Batched replies leave out
+    the job slots in missing and write each slot into its summary. requested records the sections (or job
+    slots) of each structured call
+    """
+
+    def __init__(self, bad=(), bad_calls: int = 1, fail_plain: bool = False, missing=()):
+        self.bad = set(bad)
+        self.bad_calls = bad_calls
+        self.fail_plain = fail_plain
+        self.missing = set(missing)
+        self.requested = []
+
+    def sections(self, fields) -> dict:
+        bad = self.bad if len(self.requested) <= self.bad_calls else set()
+        return {field: "" if field in bad else SECTION_REPLIES[field] for field in fields}
+
+    def __call__(self, prompt: str, response_format) -> str:
+        if response_format is None:
+            if "keywords" in prompt:
+                return "analysis, data, modeling, research"
+            if self.fail_plain:
+                raise RuntimeError("API unavailable")
+            return "{{name}} plain section."
+        schema = response_format["json_schema"]["schema"]
+        if response_format["json_schema"]["name"] == "job_insights":
+            self.requested.append(list(schema["properties"]))
+            return json.dumps(self.sections(schema["properties"]))
+        if response_format["json_schema"]["name"] == "job_insights_batch":
+            self.requested.append(list(schema["properties"]))
+            return json.dumps({slot: {**self.sections(SECTION_REPLIES), "ai_summary": f"{{{{name}}}} fits {slot}."}
+                               for slot in schema["properties"] if slot not in self.missing})
+        return json.dumps(SECTION_REPLIES[response_format["json_schema"]["name"]])
+
+
+@pytest.fixture
+def matcher(formai_module):
+    return formai_module.ai_matcher
+
+
+@pytest.fixture
+def profile(formai_module):
+    return formai_module.PersonProfile(
+        name="Ann Lee", email="ann@example.com", university="Example University", preferred_career="Nurse",
+        personality={trait: 3 for trait in formai_module.PERSONALITY_TRAITS},
+        work_values={value: 3 for value in formai_module.WORK_VALUES},
+        skills={skill: 3 for skill in formai_module.PROFILE_SKILLS}, interests=["social"])
+
+
+def use_replies(monkeypatch, formai_module, fake_llm, replies: FakeReplies, **kwargs):
+    llm = fake_llm(replies, **kwargs)
+    monkeypatch.setattr(formai_module, "llm", llm)
+    return llm
+
+
+def generate(matcher, profile, mode: str) -> dict:
+    job_name = next(iter(matcher.onet_jobs))
+    match_data = matcher.calculate_job_match(profile, job_name)
+    return asyncio.run(matcher.generate_ai_insights(profile, job_name, match_data, mode=mode))
+
+
+def stats_delta(matcher, mode: str, before: dict) -> dict:
+    return {counter: count - before[counter] for counter, count in matcher.insight_stats[mode].items()}
+
+
+def test_only_the_invalid_section_is_rerequested(monkeypatch, formai_module, fake_llm, matcher, profile):
+    replies = FakeReplies(bad=["career_story"])
+    use_replies(monkeypatch, formai_module, fake_llm, replies)
+    before = dict(matcher.insight_stats["combined"])
+    insights = generate(matcher, profile, "combined")
+    assert replies.requested == [list(SECTION_REPLIES), ["career_story"]]
+    assert insights["career_story"] == "I am Ann Lee, and I love solving problems."
+    assert insights["ai_summary"] == "Ann Lee is a strong fit."
+    assert insights["action_plan"] == SECTION_REPLIES["action_plan"]
+    delta = stats_delta(matcher, "combined", before)
+    assert (delta["invalid_sections"], delta["rerequested_sections"], delta["fallback_sections"]) == (1, 1, 0)
+
+
+def test_section_still_invalid_falls_back_to_its_own_prompt(monkeypatch, formai_module, fake_llm, matcher,
+                                                           profile):
+    replies = FakeReplies(bad=["ai_summary"], bad_calls=2, fail_plain=True)
+    llm = use_replies(monkeypatch, formai_module, fake_llm, replies)
+    before = dict(matcher.insight_stats["combined"])
+    insights = generate(matcher, profile, "combined")
+    assert replies.requested == [list(SECTION_REPLIES), ["ai_summary"]]
+    # Then the four-call summary prompt, whose failure leaves the fixed fallback text
+    assert sum("Keep it concise but insightful." in prompt for prompt in llm.client.prompts) == 1
+    assert insights["ai_summary"].startswith("AI analysis temporarily unavailable")
+    assert insights["interview_insights"] == SECTION_REPLIES["interview_insights"]
+    delta = stats_delta(matcher, "combined", before)
+    assert (delta["invalid_sections"], delta["rerequested_sections"], delta["fallback_sections"]) == (2, 1, 1)
+
+
+def insights_for_jobs(matcher, profile, mode: str, count: int = 3):
+    job_names = list(matcher.onet_jobs)[:count]
+    return job_names, asyncio.run(matcher.insights_for_jobs(profile, job_names, mode=mode))[0]
+
+
+def test_batched_reply_is_split_per_job(monkeypatch, formai_module, fake_llm, matcher, profile):
+    replies = FakeReplies()
+    use_replies(monkeypatch, formai_module, fake_llm, replies)
+    job_names, results = insights_for_jobs(matcher, profile, "batched")
+    assert replies.requested == [["job_1", "job_2", "job_3"]]
+    assert [result["job_name"] for result in results] == job_names
+    assert [result["ai_summary"] for result in results] == [f"Ann Lee fits job_{i}." for i in (1, 2, 3)]
+    assert all(result["interview_insights"] == SECTION_REPLIES["interview_insights"] for result in results)
+
+
+def test_job_missing_from_batched_reply_is_rerequested(monkeypatch, formai_module, fake_llm, matcher, profile):
+    replies = FakeReplies(missing=["job_2"])
+    use_replies(monkeypatch, formai_module, fake_llm, replies)
+    before = dict(matcher.insight_stats["batched"])
+    job_names, results = insights_for_jobs(matcher, profile, "batched")
+    # Only the missing job gets a combined call, for all of its sections
+    assert replies.requested == [["job_1", "job_2", "job_3"], list(SECTION_REPLIES)]
+    assert [result["ai_summary"] for result in results] == \
+        ["Ann Lee fits job_1.", "Ann Lee is a strong fit.", "Ann Lee fits job_3."]
+    delta = stats_delta(matcher, "batched", before)
+    assert (delta["invalid_sections"], delta["rerequested_sections"], delta["fallback_sections"]) == (4, 4, 0)
+
+
+@pytest.mark.parametrize("mode", ["sections", "batched"])
+def test_concurrent_calls_are_capped(monkeypatch, formai_module, fake_llm, matcher, profile, mode):
+    llm = use_replies(monkeypatch, formai_module, fake_llm, FakeReplies(), delay=0.02)
+    monkeypatch.setattr(matcher, "insight_concurrency", 2)
+    monkeypatch.setattr(matcher, "insight_batch_size", 1)
+    insights_for_jobs(matcher, profile, mode)
+    assert llm.calls >= 3
+    assert llm.peak_in_flight == 2
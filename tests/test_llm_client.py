@@ -0,0 +1,61 @@
+"""LLMClient.complete against a fake OpenAI client: cache misses, hits for another student, invalid replies"""
+import asyncio
+
+import pytest
+
+from llm_cache import LLMCache
+
+PROMPT = "Create a focused action plan for {{name}} to become a Registered Nurse."
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm_cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def complete(llm, name: str, **kwargs) -> str:
+    return asyncio.run(llm.complete(PROMPT, max_tokens=300, temperature=0.6, tag="plan", values={"name": name},
+                                    jobs=["Registered Nurse"], **kwargs))
+
+
+def test_miss_stores_and_hit_fills_in_another_name(fake_llm, cache):
+    llm = fake_llm(lambda prompt, response_format: "{{name}} should shadow a Registered Nurse.", cache=cache)
+    assert complete(llm, "Nurse") == "Nurse should shadow a Registered Nurse."
+    assert cache.stats()["entries"] == 1
+    assert complete(llm, "Bob Lee") == "Bob Lee should shadow a Registered Nurse."
+    assert len(llm.client.prompts) == 1 and llm.by_tag["plan"]["cache_hits"] == 1
+    # The name is never sent, and a name that is also part of the job title leaves the title alone
+    assert "Registered Nurse" in llm.client.prompts[0] and "Bob" not in llm.client.prompts[0]
+
+
+def test_invalid_reply_is_not_cached(fake_llm, cache):
+    llm = fake_llm(lambda prompt, response_format: "not a plan", cache=cache)
+    assert complete(llm, "Ann", valid=lambda content: False) == "not a plan"
+    assert cache.stats()["entries"] == 0
+    complete(llm, "Ann")
+    assert len(llm.client.prompts) == 2 and cache.stats()["entries"] == 1
+
+
+def test_cache_is_opt_in(monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    assert LLMCache.from_env() is None
+
+
+def test_reply_stating_another_percentage_is_rerequested_and_not_cached(fake_llm, cache):
+    replies = iter(["{{name}} is a 75% match.", "{{name}} is a 70-80% match."])
+    llm = fake_llm(lambda prompt, response_format: next(replies), cache=cache)
+    prompt = "Summarize the fit of {{name}}, an overall 70-80% match, for Registered Nurse."
+    reply = asyncio.run(llm.complete(prompt, max_tokens=300, temperature=0.6, tag="summary", values={"name": "Ann"}))
+    assert reply == "Ann is a 70-80% match."
+    assert len(llm.client.prompts) == 2 and llm.by_tag["summary"]["unshareable"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_unshareable_replies_are_returned_uncached(fake_llm, cache):
+    llm = fake_llm(lambda prompt, response_format: "{{name}} scores {{overall_match}}%", cache=cache)
+    reply = asyncio.run(llm.complete(PROMPT, max_tokens=300, temperature=0.6, tag="plan", values={"name": "Ann"}))
+    assert reply == "Ann scores {{overall_match}}%"
+    assert len(llm.client.prompts) == 2 and llm.by_tag["plan"]["unshareable"] == 2
+    assert cache.stats()["entries"] == 0
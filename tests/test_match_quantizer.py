@@ -0,0 +1,67 @@
+"""Quantized insight prompt facts, and the replay that measures how often the prompts repeat"""
+import asyncio
+
+import pytest
+
+from insight_prompts import SECTION_PROMPTS, combined_prompt
+from insight_schema import SECTIONS
+from llm_cache import LLMCache
+from match_quantizer import MatchQuantizer, replay
+
+
+def match_data(overall: float, gap: float = 1.4) -> dict:
+    return {"overall_match": overall,
+            "breakdown": {"skills_match": 81.2, "values_match": 64.0, "interests_match": 100.0,
+                          "work_styles_match": 58.9},
+            "strengths": ["Strong Empathy (Level 5)"],
+            "improvements": [{"skill": "Programming", "current_level": 3.0, "required_level": 3.0 + gap}]}
+
+
+@pytest.mark.parametrize("score, band, stated", [(73.4, 10, "70-80%"), (0, 10, "0-10%"), (100, 10, "90-100%"),
+                                                 (99.9, 20, "80-100%"), (100, 30, "90-100%"), (42.5, 5, "40-45%")])
+def test_score_range(score, band, stated):
+    assert MatchQuantizer(score_band=band).score_range(score) == stated
+
+
+def test_banded_facts_state_no_exact_score():
+    facts = MatchQuantizer(score_band=10, gap_step=1).facts(match_data(73.4))
+    assert facts["overall_match"] == "70-80%" and facts["interests_match"] == "90-100%"
+    assert facts["gaps"] == ["Programming: Gap of 1-2 points"]
+    prompt = combined_prompt("Registered Nurse", facts, list(SECTIONS)).text
+    assert "73.4" not in prompt and "81.2" not in prompt and "{{name}}" in prompt
+
+
+def test_exact_facts():
+    facts = MatchQuantizer(score_band=0).facts(match_data(73.4))
+    assert facts["overall_match"] == "73.4%" and facts["gaps"] == ["Programming: Gap of 1.4 points"]
+
+
+def test_nearby_matches_send_identical_prompts():
+    quantizer = MatchQuantizer()
+    for section, build in SECTION_PROMPTS.items():
+        assert build("Nurse", quantizer.facts(match_data(73.4))).key() == \
+            build("Nurse", quantizer.facts(match_data(76.1, gap=1.1))).key()
+    assert SECTION_PROMPTS["ai_summary"]("Nurse", quantizer.facts(match_data(73.4))).key() != \
+        SECTION_PROMPTS["ai_summary"]("Nurse", quantizer.facts(match_data(83.4))).key()
+
+
+def test_replay_keys_are_the_cache_keys(fake_llm, tmp_path):
+    cache = LLMCache(str(tmp_path / "llm_cache.sqlite3"))
+    prompt = SECTION_PROMPTS["career_story"]("Nurse", MatchQuantizer().facts(match_data(73.4)))
+    llm = fake_llm(lambda text, response_format: "As {{name}}, I care for people.", cache=cache)
+    asyncio.run(llm.complete(prompt.text, max_tokens=prompt.max_tokens, temperature=prompt.temperature,
+                             response_format=prompt.response_format, values={"name": "Ann"}))
+    assert cache.get(prompt.key()) == "As {{name}}, I care for people."
+    cache.close()
+
+
+def test_replay_counts_repeated_requests():
+    profile_matches = [[("Nurse", match_data(73.4)), ("Teacher", match_data(61.0))],
+                       [("Nurse", match_data(76.1)), ("Teacher", match_data(64.0))],
+                       [("Nurse", match_data(93.0)), ("Teacher", match_data(64.0))]]
+    rates = replay(profile_matches, MatchQuantizer(), batch_size=2)
+    assert rates["combined"] == pytest.approx(3 / 6)
+    assert rates["batched"] == pytest.approx(1 / 3)
+    assert rates["ai_summary"] == pytest.approx(3 / 6)
+    # Exact scores repeat only when equal to the decimal: Teacher at 64.0
+    assert replay(profile_matches, MatchQuantizer(score_band=0))["combined"] == pytest.approx(1 / 6)
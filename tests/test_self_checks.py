@@ -0,0 +1,35 @@
+"""The modules' own consistency checks (`python <module>.py`), run under pytest"""
+import careers
+import catalog_diff
+import catalog_index
+import llm_cache
+import name_resolver
+import scoring
+import similarity
+
+
+def test_scoring_backends_match_reference():
+    assert scoring.check_backends(careers.onet_jobs, samples=100) == []
+
+
+def test_catalog_index_matches_scans():
+    assert catalog_index.check_search(careers.onet_jobs, queries=100) == []
+
+
+def test_name_resolution():
+    problems = name_resolver.check_resolution(careers.onet_jobs)
+    # Typos can land closer to another job's name; a few misses out of the random queries are expected
+    assert [p for p in problems if p.startswith(("exact", "similar"))] == []
+    assert len(problems) <= 0.05 * 300
+
+
+def test_incremental_neighbours():
+    assert similarity.check_incremental(careers.onet_jobs, edits=20) == []
+
+
+def test_catalog_carry_over():
+    assert catalog_diff.check_carry_over(careers.onet_jobs, samples=20) == []
+
+
+def test_llm_cache():
+    assert llm_cache.check() == []